@@ -15,26 +15,19 @@ from django.db.models import Q
 
 
 # Local app imports
+from project_profiling.models import ProjectProfile
 from scheduling.models import ProgressUpdate
 from authentication.utils.decorators import verified_email_required, role_required
 from .models import UserProfile
 from .forms import StyledPasswordChangeForm
-from scheduling.forms import ProjectTask
 
 User = get_user_model()
 
 
 def calculate_project_progress(project_id):
-    tasks = ProjectTask.objects.filter(project_id=project_id)
-    total_weight = sum([t.weight for t in tasks])
-    progress = 0
-
-    for t in tasks:
-        latest_update = t.updates.filter(status='A').order_by('-reviewed_at').first()
-        if latest_update:
-            progress += (t.weight / total_weight) * float(latest_update.progress_percent)
-
-    return round(progress, 2)
+    """Weighted progress % of a project, from the rollup stored on its row."""
+    progress = ProjectProfile.objects.filter(pk=project_id).values_list("progress", flat=True).first()
+    return round(float(progress or 0), 2)
 
 
 @login_required  # ensures only logged-in users can access
@@ -26,6 +26,25 @@ ALLOWED_HOSTS = []
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# .xlsx uploads above this size are streamed with openpyxl instead of loaded into pandas
+SCHEDULE_IMPORT_EXCEL_STREAM_BYTES = int(os.getenv('SCHEDULE_IMPORT_EXCEL_STREAM_BYTES', 10 * 1024 * 1024))
+
+# Parsed schedule uploads, keyed by file hash, so re-uploads skip parsing
+SCHEDULE_IMPORT_CACHE_DIR = os.getenv('SCHEDULE_IMPORT_CACHE_DIR', os.path.join(BASE_DIR, 'import_cache'))
+SCHEDULE_IMPORT_CACHE_MAX_BYTES = int(os.getenv('SCHEDULE_IMPORT_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+
+# Seconds after which a running import whose worker died is handed to another worker
+SCHEDULE_IMPORT_JOB_TIMEOUT = int(os.getenv('SCHEDULE_IMPORT_JOB_TIMEOUT', 30 * 60))
+
+# Hours a person can work per day, the limit resource leveling levels down to
+SCHEDULE_DAILY_CAPACITY_HOURS = float(os.getenv('SCHEDULE_DAILY_CAPACITY_HOURS', 8))
+
+# Schedule risk simulation: default iteration count, and the optimistic/pessimistic
+# durations assumed (as multiples of the likely one) for tasks without their own
+SCHEDULE_RISK_ITERATIONS = int(os.getenv('SCHEDULE_RISK_ITERATIONS', 10000))
+SCHEDULE_RISK_OPTIMISTIC_FACTOR = float(os.getenv('SCHEDULE_RISK_OPTIMISTIC_FACTOR', 0.8))
+SCHEDULE_RISK_PESSIMISTIC_FACTOR = float(os.getenv('SCHEDULE_RISK_PESSIMISTIC_FACTOR', 1.5))
+
 # Application definition
 
 INSTALLED_APPS = [
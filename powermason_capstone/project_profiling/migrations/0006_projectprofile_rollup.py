@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:19
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+
+
+def backfill_rollup(apps, schema_editor):
+    """Fill the new rollup fields from each project's tasks (one grouped aggregate)."""
+    ProjectProfile = apps.get_model("project_profiling", "ProjectProfile")
+    ProjectTask = apps.get_model("scheduling", "ProjectTask")
+
+    projects = []
+    for row in ProjectTask.objects.values("project").order_by().annotate(
+        total_weight=Sum("weight"),
+        earned_weight=Sum(F("weight") * F("progress") / 100),
+        task_count=Count("id"),
+        completed_task_count=Count("id", filter=Q(progress__gte=100)),
+    ):
+        total_weight = Decimal(row["total_weight"] or 0)
+        earned_weight = Decimal(row["earned_weight"] or 0)
+        projects.append(ProjectProfile(
+            id=row["project"],
+            total_weight=total_weight,
+            earned_weight=earned_weight.quantize(Decimal("0.0001")),
+            task_count=row["task_count"],
+            completed_task_count=row["completed_task_count"],
+            progress=(earned_weight * 100 / total_weight).quantize(Decimal("0.01")) if total_weight > 0 else 0,
+        ))
+    ProjectProfile.objects.bulk_update(
+        projects, ["total_weight", "earned_weight", "task_count", "completed_task_count", "progress"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0005_alter_projectprofile_project_manager'),
+        ('scheduling', '0014_projecttask_three_point_estimate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectprofile',
+            name='completed_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='projectprofile',
+            name='earned_weight',
+            field=models.DecimalField(decimal_places=4, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='projectprofile',
+            name='progress',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=5),
+        ),
+        migrations.AddField(
+            model_name='projectprofile',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='projectprofile',
+            name='total_weight',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
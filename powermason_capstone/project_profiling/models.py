@@ -120,6 +120,15 @@ class ProjectProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # ----------------------------
+    # 8. Progress rollup of the project's tasks, maintained by scheduling.rollup
+    # ----------------------------
+    progress = models.DecimalField(max_digits=5, decimal_places=2, default=0, editable=False)  # weighted %
+    total_weight = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
+    earned_weight = models.DecimalField(max_digits=14, decimal_places=4, default=0, editable=False)  # sum of weight * progress / 100
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_task_count = models.PositiveIntegerField(default=0, editable=False)
+
     def __str__(self):
         return f"{self.project_code or 'NoCode'} - {self.project_name}"
 
@@ -18,4 +18,6 @@ urlpatterns = [
     path('search/project-managers/', views.search_project_managers, name='search_project_managers'),
      # Project Dashboard
     path("<int:project_id>/dashboard/", views.project_dashboard, name="project_dashboard"),
+    path("<int:project_id>/dashboard/earned-value/", views.project_earned_value, name="project_earned_value"),
+    path("<int:project_id>/dashboard/progress-trend/", views.project_progress_trend, name="project_progress_trend"),
 ]
\ No newline at end of file
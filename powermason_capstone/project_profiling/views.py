@@ -5,11 +5,14 @@ from django.core.signing import BadSignature, SignatureExpired
 from authentication.utils.tokens import parse_dashboard_token, make_dashboard_token
 from django.utils import timezone
 from django.http import HttpResponse, JsonResponse
+from django.views.decorators.gzip import gzip_page
 from datetime import timedelta
 from django.db.models import Q
-from decimal import Decimal
 
+from scheduling.earned_value import cached_earned_value
 from scheduling.models import ProjectTask
+from scheduling.rollup import annotate_portfolio
+from scheduling.snapshots import progress_trend
 from authentication.models import UserProfile
 from authentication.utils.decorators import verified_email_required, role_required
 from .forms import ProjectProfileForm, GeneralContractorForm, DirectClientForm
@@ -25,17 +28,31 @@ def project_dashboard(request, project_id):
     # Progress list for template
     task_progress = [(task, task.progress) for task in tasks]
 
-    # Weighted total progress (use Decimal to avoid type errors)
-    total_weight = sum(task.weight for task in tasks) or Decimal("1")
-    total_progress = sum((task.progress * task.weight) for task in tasks) / total_weight
-
     context = {
         "project": project,
         "task_progress": [(task, round(progress, 2)) for task, progress in task_progress],
-        "total_progress": round(total_progress, 2),
+        # Weighted progress is kept up to date on the project row (scheduling.rollup)
+        "total_progress": project.progress,
     }
     return render(request, "progress/dashboard.html", context)
-    
+
+
+@login_required
+@gzip_page
+def project_earned_value(request, project_id):
+    """Planned/earned value S-curves with SPI and SV per working day, for the dashboard chart."""
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    return JsonResponse(cached_earned_value(project), json_dumps_params={"separators": (",", ":")})
+
+
+@login_required
+@gzip_page
+def project_progress_trend(request, project_id):
+    """Daily weighted progress over the last two years, from the progress snapshots."""
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    return JsonResponse(progress_trend(project), json_dumps_params={"separators": (",", ":")})
+
+
 @login_required
 def project_list_default(request):
     profile, _ = UserProfile.objects.get_or_create(user=request.user)
@@ -118,6 +135,7 @@ def project_list_signed_with_role(request, token, role):
         projects = ProjectProfile.objects.filter(
             Q(created_by=profile_from_token) | Q(assigned_to=profile_from_token)
         ).distinct()
+    projects = annotate_portfolio(projects.select_related("project_manager"))
 
     context = {
         'dashboard_token': token,
@@ -1,15 +1,41 @@
+from django import forms
 from django.contrib import admin
-from .models import ProjectTask
+from .forms import validate_dependencies
+from .models import Holiday, ProjectTask, WorkCalendar
+from .rollup import rebuild_project_totals
+from .schedule import recompute_durations
+
+
+class ProjectTaskAdminForm(forms.ModelForm):
+    class Meta:
+        model = ProjectTask
+        fields = "__all__"
+
+    def clean_dependencies(self):
+        return validate_dependencies(self.instance, self.cleaned_data["dependencies"])
 
-from django.contrib import admin
-from .models import ProjectTask
 
 @admin.register(ProjectTask)
 class ProjectTaskAdmin(admin.ModelAdmin):
+    form = ProjectTaskAdminForm
     list_display = ("id", "task_name", "project", "start_date", "end_date", "get_progress")
     search_fields = ("task_name", "project__project_name")
     list_filter = ("project", "assigned_to")
 
+    # Admin edits can change weight or progress directly, so the project rollup is rebuilt
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        rebuild_project_totals([obj.project_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        rebuild_project_totals([obj.project_id])
+
+    def delete_queryset(self, request, queryset):
+        project_ids = set(queryset.values_list("project_id", flat=True))
+        super().delete_queryset(request, queryset)
+        rebuild_project_totals(project_ids)
+
 
     def get_progress(self, obj):
         # Get latest approved update
@@ -18,4 +44,21 @@ class ProjectTaskAdmin(admin.ModelAdmin):
     
     get_progress.short_description = "Progress"
 
- 
\ No newline at end of file
+ 
+
+
+class HolidayInline(admin.TabularInline):
+    model = Holiday
+    extra = 1
+
+
+@admin.register(WorkCalendar)
+class WorkCalendarAdmin(admin.ModelAdmin):
+    list_display = ("project", "weekmask")
+    search_fields = ("project__project_name",)
+    inlines = [HolidayInline]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Task durations count working days, so they follow the calendar
+        recompute_durations(form.instance.project)
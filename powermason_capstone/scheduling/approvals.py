@@ -0,0 +1,110 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ProgressUpdate, ProjectTask
+from .rollup import adjust_project_totals, task_change
+from .schedule import UPDATE_BATCH_SIZE
+
+REVIEW_PAGE_SIZE = 50
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _lock_pending(update_ids):
+    """Lock the still-pending updates among ``update_ids`` (in id order, so concurrent batches can't deadlock)."""
+    return list(
+        ProgressUpdate.objects.select_for_update()
+        .filter(id__in=update_ids, status="P")
+        .order_by("id")
+        .values_list("id", "task_id", "progress_percent")
+    )
+
+
+def approve_updates(update_ids, reviewer):
+    """
+    Approve the pending updates among ``update_ids`` in one transaction.
+
+    The updates are locked first, so each is counted at most once however
+    many reviewers act on it, then their tasks, so no concurrent approval
+    can change a task's progress between the read and the write. Each task
+    gets the sum of its approved percentages (capped at 100) in one
+    ``bulk_update`` that also bumps ``updated_at``, the statuses change
+    in one UPDATE, and each project's rollup is adjusted once. Updates
+    that are no longer pending are skipped. Returns the number approved.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = _lock_pending(update_ids)
+        if not pending:
+            return 0
+
+        increments = defaultdict(int)
+        for _, task_id, percent in pending:
+            increments[task_id] += percent
+
+        tasks = list(
+            ProjectTask.objects.select_for_update()
+            .filter(id__in=increments)
+            .order_by("id")
+            .only("id", "project_id", "weight", "progress")
+        )
+        changes = defaultdict(lambda: defaultdict(int))
+        for task in tasks:
+            before = (task.weight, task.progress)
+            task.progress = min(task.progress + increments[task.id], 100)
+            task.updated_at = now  # bulk_update skips auto_now; cached curves key on it
+            for key, value in task_change(before, (task.weight, task.progress)).items():
+                changes[task.project_id][key] += value
+        ProjectTask.objects.bulk_update(tasks, ["progress", "updated_at"], batch_size=UPDATE_BATCH_SIZE)
+
+        ProgressUpdate.objects.filter(id__in=[row[0] for row in pending]).update(
+            status="A", reviewed_by=reviewer, reviewed_at=now
+        )
+        for project_id, deltas in changes.items():
+            adjust_project_totals(project_id, **deltas)
+    return len(pending)
+
+
+def reject_updates(update_ids, reviewer):
+    """Reject the pending updates among ``update_ids`` in one UPDATE; returns how many were rejected."""
+    with transaction.atomic():
+        pending = _lock_pending(update_ids)
+        ProgressUpdate.objects.filter(id__in=[row[0] for row in pending]).update(
+            status="R", reviewed_by=reviewer, reviewed_at=timezone.now()
+        )
+    return len(pending)
+
+
+def encode_cursor(update):
+    """Opaque, URL-safe position of ``update`` in the review queue: ``<created_at in µs>-<id>``."""
+    return f"{(update.created_at - EPOCH) // MICROSECOND}-{update.id}"
+
+
+def decode_cursor(cursor):
+    """``(created_at, id)`` from ``encode_cursor``; None for a missing or malformed cursor."""
+    try:
+        stamp, update_id = (int(part) for part in cursor.split("-"))
+    except (AttributeError, ValueError):
+        return None
+    return EPOCH + stamp * MICROSECOND, update_id
+
+
+def review_page(updates, after=None, size=REVIEW_PAGE_SIZE):
+    """
+    One page of ``updates``, oldest first, and the cursor of the next page
+    (None on the last). Keyset pagination on ``(created_at, id)``: a page
+    starts right after the ``after`` cursor instead of at an OFFSET, so
+    deep pages cost the same as the first and stay stable while other
+    reviewers clear updates.
+    """
+    position = decode_cursor(after)
+    if position:
+        created_at, update_id = position
+        updates = updates.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=update_id))
+    page = list(updates.order_by("created_at", "id")[:size + 1])
+    return page[:size], encode_cursor(page[size - 1]) if len(page) > size else None
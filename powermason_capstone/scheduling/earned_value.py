@@ -0,0 +1,135 @@
+import hashlib
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import ProgressUpdate, ProjectTask
+from .schedule import project_calendar
+
+# Bump when the payload layout changes so cached curves are dropped
+EARNED_VALUE_FORMAT = 1
+
+# Keys change whenever the inputs do, so entries only need to outlive the day they are for
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _cache_key(project, calendar, today):
+    """
+    Cache key of a project's curves from one indexed aggregate: the newest
+    ``updated_at`` catches edits and approvals (approving saves the task),
+    the task count catches deletes. The calendar and the day are part of
+    the key too, since they move the working days and the "as of" date.
+    """
+    state = ProjectTask.objects.filter(project=project).aggregate(latest=Max("updated_at"), count=Count("id"))
+    latest = state["latest"].isoformat() if state["latest"] else ""
+    holidays = ",".join(day.isoformat() for day in calendar.holidays)
+    key = f"{EARNED_VALUE_FORMAT}:{latest}:{state['count']}:{calendar.weekmask}:{holidays}:{today.isoformat()}"
+    return f"earned-value:{project.pk}:{hashlib.md5(key.encode()).hexdigest()}"
+
+
+def _earned(task_ids, percents):
+    """
+    Progress each approval actually added, given approvals sorted by task
+    then date: running totals per task are capped at 100% like
+    ``ProjectTask.progress``, and each approval earns its step of that.
+    """
+    first = np.r_[True, task_ids[1:] != task_ids[:-1]]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(len(task_ids)), 0))
+    totals = np.r_[0, np.cumsum(percents)]
+    capped = np.minimum(totals[1:] - totals[group_start], 100)
+    return np.where(first, capped, np.diff(capped, prepend=0))
+
+
+def earned_value_curves(project, today=None, calendar=None):
+    """
+    Planned and earned value of a project per working day, as percent of
+    its total task weight, plus SPI (EV / PV) and SV (EV - PV).
+
+    Planned value spreads each task's weight evenly over its working days
+    under the project calendar; earned value adds each approved progress
+    update's share of its task's weight on the first working day on or
+    after its approval. Both are built with one ``add.at``/``bincount``
+    pass over all tasks and approvals, from two queries. Series are
+    parallel arrays over ``dates``; EV, SPI and SV stop at ``as_of``.
+    """
+    today = today or timezone.localdate()
+    calendar = calendar or project_calendar(project)
+    tasks = list(ProjectTask.objects.filter(project=project).values_list("id", "start_date", "end_date", "weight"))
+    payload = {
+        "format": EARNED_VALUE_FORMAT,
+        "project": {"id": project.pk, "name": project.project_name},
+        "as_of": today,
+        "dates": [], "pv": [], "ev": [], "spi": [], "sv": [],
+        "current": {"pv": None, "ev": None, "spi": None, "sv": None},
+    }
+    if not tasks:
+        return payload
+
+    ids, starts, ends, weights = zip(*tasks)
+    weights = np.asarray(weights, dtype=float)
+    total_weight = weights.sum() or 1.0
+    origin = min(starts)
+
+    # Planned: a constant rate over each task's working days [first, last)
+    first = calendar.offsets(origin, starts)
+    last = np.maximum(calendar.offsets(origin, [end + timedelta(days=1) for end in ends]), first + 1)
+    rate = weights / (last - first)
+
+    # Earned: approvals sorted by task then date, capped per task at 100%
+    approvals = list(
+        ProgressUpdate.objects.filter(task__project=project, status="A")
+        .order_by("task_id", "reviewed_at", "created_at", "id")
+        .values_list("task_id", "progress_percent", "reviewed_at", "created_at")
+    )
+    if approvals:
+        task_ids, percents, reviewed, created = zip(*approvals)
+        task_ids = np.asarray(task_ids)
+        days = [timezone.localdate(when or fallback) for when, fallback in zip(reviewed, created)]
+        earned_on = np.maximum(calendar.offsets(origin, days), 0)
+        index = {task_id: i for i, task_id in enumerate(ids)}
+        earned = _earned(task_ids, np.asarray(percents, dtype=float)) * weights[[index[t] for t in task_ids]] / 100
+    else:
+        earned_on = np.zeros(0, dtype=int)
+        earned = np.zeros(0)
+
+    elapsed = int(calendar.offsets(origin, [today + timedelta(days=1)])[0])  # working days up to today
+    horizon = max(int(last.max()), int(earned_on.max(initial=-1)) + 1, elapsed, 1)
+
+    change = np.zeros(horizon + 1)
+    np.add.at(change, first, rate)
+    np.add.at(change, last, -rate)
+    pv = np.cumsum(np.cumsum(change)[:horizon]) * 100 / total_weight
+    ev = np.cumsum(np.bincount(earned_on, weights=earned, minlength=horizon))[:elapsed] * 100 / total_weight
+    planned = pv[:len(ev)]
+    spi = np.divide(ev, planned, out=np.full(len(ev), np.nan), where=planned > 0)
+
+    def series(values):
+        return [None if np.isnan(value) else round(value, 4) for value in values.tolist()]
+
+    payload.update({
+        "dates": list(calendar.end_dates(origin, np.arange(1, horizon + 1))),
+        "pv": series(pv),
+        "ev": series(ev),
+        "spi": series(spi),
+        "sv": series(ev - planned),
+    })
+    if len(ev):
+        payload["current"] = {
+            "pv": payload["pv"][len(ev) - 1], "ev": payload["ev"][-1], "spi": payload["spi"][-1], "sv": payload["sv"][-1],
+        }
+    return payload
+
+
+def cached_earned_value(project, today=None):
+    """``earned_value_curves``, recomputed only after the project's tasks, approvals or calendar change."""
+    today = today or timezone.localdate()
+    calendar = project_calendar(project)
+    key = _cache_key(project, calendar, today)
+    payload = cache.get(key)
+    if payload is None:
+        payload = earned_value_curves(project, today, calendar)
+        cache.set(key, payload, CACHE_TIMEOUT)
+    return payload
@@ -1,12 +1,36 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
 from .models import ProjectTask, ProgressUpdate, ProgressFile
 from authentication.models import UserProfile  # adjust if your user model is elsewhere
 from datetime import timedelta
+from project_profiling.models import ProjectProfile
+
+from .rollup import rebuild_project_totals
+from .schedule import UPDATE_BATCH_SIZE, project_calendar, rank_new_dependency
+from .utils.cpm import CycleError
+from .utils.workdays import WorkingCalendar
+
+
+def validate_dependencies(task, dependencies):
+    """Form-level cycle check for a task's chosen predecessors; returns them."""
+    if task.pk:
+        for predecessor in dependencies:
+            try:
+                rank_new_dependency(predecessor.pk, task.pk, commit=False)
+            except CycleError:
+                raise forms.ValidationError(
+                    f"“{predecessor.task_name}” already depends on this task; linking them would create a cycle."
+                )
+    return dependencies
+
 
 class ProjectTaskForm(forms.ModelForm):
     class Meta:
         model = ProjectTask
-        fields = ["scope", "assigned_to", "task_name", "start_date", "end_date", "duration_days", "manhours","weight"]
+        fields = ["scope", "assigned_to", "task_name", "start_date", "end_date", "duration_days",
+                  "optimistic_days", "pessimistic_days", "manhours", "weight", "dependencies"]
 
         labels = {
             "assigned_to": "Assign To",
@@ -15,8 +39,11 @@ class ProjectTaskForm(forms.ModelForm):
             "start_date": "Start Date",
             "end_date": "End",
             "duration_days": "Days",
+            "optimistic_days": "Optimistic Days",
+            "pessimistic_days": "Pessimistic Days",
             "manhours": "Manhours",
             "weight": "Weight (%)",
+            "dependencies": "Predecessors",
         }
         widgets = {
             "start_date": forms.DateInput(attrs={"type": "date", "id": "id_start_date"}),
@@ -28,14 +55,37 @@ class ProjectTaskForm(forms.ModelForm):
             }),
         }
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, project=None, **kwargs):
         super().__init__(*args, **kwargs)
+        if project is None and self.instance.pk:
+            project = self.instance.project
+        self.calendar = project_calendar(project) if project else None
+        if self.calendar:
+            # Lets the page count working days the same way as clean()
+            self.fields["duration_days"].widget.attrs.update({
+                "data-weekmask": self.calendar.weekmask,
+                "data-holidays": ",".join(day.isoformat() for day in self.calendar.holidays),
+            })
         # Show only Project Managers
         self.fields["assigned_to"].queryset = UserProfile.objects.filter(role="PM")
         self.fields["assigned_to"].widget.attrs.update({
             "class": "select2 w-full",  # for searchable dropdown
             "data-placeholder": "Search Project Manager...",
         })
+        # Predecessors are picked when editing, from the same project
+        if self.instance.pk:
+            self.fields["dependencies"].queryset = ProjectTask.objects.filter(
+                project_id=self.instance.project_id
+            ).exclude(pk=self.instance.pk).order_by("topo_rank", "start_date", "id")
+            self.fields["dependencies"].widget.attrs.update({
+                "class": "select2 w-full",
+                "data-placeholder": "Search tasks...",
+            })
+        else:
+            del self.fields["dependencies"]
+
+    def clean_dependencies(self):
+        return validate_dependencies(self.instance, self.cleaned_data["dependencies"])
 
     def clean(self):
         cleaned_data = super().clean()
@@ -46,11 +96,107 @@ class ProjectTaskForm(forms.ModelForm):
             if end < start:
                 self.add_error("end_date", "End date cannot be earlier than start date.")
             else:
-                # auto-calc days (end - start + 1)
-                cleaned_data["duration_days"] = (end - start).days + 1
+                # working days under the project calendar, ends included
+                calendar = self.calendar or WorkingCalendar()
+                cleaned_data["duration_days"] = calendar.duration(start, end)
 
+        # The risk estimates bracket the likely duration
+        duration = cleaned_data.get("duration_days")
+        optimistic = cleaned_data.get("optimistic_days")
+        pessimistic = cleaned_data.get("pessimistic_days")
+        if duration is not None and optimistic is not None and optimistic > duration:
+            self.add_error("optimistic_days", "Optimistic days cannot exceed the task's days.")
+        if duration is not None and pessimistic is not None and pessimistic < duration:
+            self.add_error("pessimistic_days", "Pessimistic days cannot be less than the task's days.")
+
+        return cleaned_data
+
+class TaskBulkEditForm(forms.Form):
+    """
+    Field changes applied to many selected tasks at once. Blank fields are
+    left alone; ``unassign`` clears the assignee and ``clear_scope`` the scope.
+    """
+    assigned_to = forms.ModelChoiceField(queryset=UserProfile.objects.filter(role="PM"), required=False)
+    unassign = forms.BooleanField(required=False)
+    scope = forms.CharField(max_length=255, required=False)
+    clear_scope = forms.BooleanField(required=False)
+    weight = forms.DecimalField(max_digits=5, decimal_places=2, min_value=0, max_value=100, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("unassign") and cleaned_data.get("assigned_to"):
+            raise ValidationError("Choose an assignee or unassign, not both.")
+        if cleaned_data.get("clear_scope") and cleaned_data.get("scope"):
+            raise ValidationError("Enter a scope or clear it, not both.")
+        if not self.changes():
+            raise ValidationError("Nothing to change: fill in at least one field.")
         return cleaned_data
 
+    def changes(self):
+        """The edited fields and their new values."""
+        data = getattr(self, "cleaned_data", {})
+        changes = {}
+        if data.get("unassign"):
+            changes["assigned_to"] = None
+        elif data.get("assigned_to"):
+            changes["assigned_to"] = data["assigned_to"]
+        if data.get("clear_scope"):
+            changes["scope"] = None
+        elif data.get("scope"):
+            changes["scope"] = data["scope"].strip()
+        if data.get("weight") is not None:
+            changes["weight"] = data["weight"]
+        return changes
+
+    def save(self, project, task_ids):
+        """
+        Apply the changes to ``project``'s tasks in ``task_ids`` in one
+        transaction. The rows are locked and read in one query and each
+        changed row is validated; if any row fails (or isn't a task of
+        the project) nothing is saved. Otherwise everything goes out in
+        one ``bulk_update``.
+
+        Returns ``(updated_count, errors)`` where ``errors`` lists
+        ``{"task_id", "task_name", "errors": {field: [messages]}}`` rows.
+        """
+        changes = self.changes()
+        ids = []
+        errors = []
+        for value in task_ids:
+            try:
+                ids.append(int(value))
+            except (TypeError, ValueError):
+                errors.append({"task_id": value, "task_name": None, "errors": {"task_ids": ["Not a task id."]}})
+        # The assignee was checked once by the form; per-row checks skip the FK lookup
+        exclude = [f.name for f in ProjectTask._meta.fields if f.name not in changes or f.name == "assigned_to"]
+
+        with transaction.atomic():
+            tasks = ProjectTask.objects.select_for_update().filter(project=project, id__in=ids).in_bulk()
+            now = timezone.now()
+            for task_id in ids:
+                task = tasks.get(task_id)
+                if task is None:
+                    errors.append({"task_id": task_id, "task_name": None,
+                                   "errors": {"task_ids": ["Not a task of this project."]}})
+                    continue
+                for field, value in changes.items():
+                    setattr(task, field, value)
+                task.updated_at = now
+                try:
+                    task.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+                except ValidationError as e:
+                    errors.append({"task_id": task_id, "task_name": task.task_name, "errors": e.message_dict})
+
+            if errors:
+                return 0, errors
+            ProjectTask.objects.bulk_update(
+                tasks.values(), [*changes, "updated_at"], batch_size=UPDATE_BATCH_SIZE
+            )
+            if "weight" in changes:
+                rebuild_project_totals([project.pk])
+        return len(tasks), []
+
+
 class ProgressUpdateForm(forms.ModelForm):
     class Meta:
         model = ProgressUpdate
@@ -68,4 +214,26 @@ class ProgressUpdateForm(forms.ModelForm):
                 "placeholder": "Additional notes or remarks...",
                 "rows": 3
             }),
-        }
\ No newline at end of file
+        }
+
+class ReviewQueueFilterForm(forms.Form):
+    """Optional filters of the pending progress updates; the choices only list who and what has some."""
+    project = forms.ModelChoiceField(
+        queryset=ProjectProfile.objects.filter(tasks__updates__status="P").distinct().order_by("project_name"),
+        required=False,
+    )
+    reporter = forms.ModelChoiceField(
+        queryset=UserProfile.objects.filter(updates_made__status="P").distinct().order_by("full_name"),
+        required=False,
+    )
+    min_age = forms.IntegerField(min_value=0, required=False, label="Waiting at least (days)")
+
+    def filter(self, updates):
+        data = self.cleaned_data
+        if data.get("project"):
+            updates = updates.filter(task__project=data["project"])
+        if data.get("reporter"):
+            updates = updates.filter(reported_by=data["reporter"])
+        if data.get("min_age") is not None:
+            updates = updates.filter(created_at__lte=timezone.now() - timedelta(days=data["min_age"]))
+        return updates
@@ -0,0 +1,65 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import quote_etag
+
+from .models import ProjectTask
+from .schedule import project_edges
+
+# Bump when the payload layout changes so clients drop cached copies
+GANTT_FORMAT = 1
+
+
+def gantt_etag(project):
+    """
+    ETag of a project's Gantt data from one indexed aggregate: the newest
+    ``updated_at`` catches edits (dependency changes touch the successor
+    too) and the task count catches deletes.
+    """
+    state = ProjectTask.objects.filter(project=project).aggregate(latest=Max("updated_at"), count=Count("id"))
+    latest = state["latest"].isoformat() if state["latest"] else ""
+    key = f"{GANTT_FORMAT}:{project.pk}:{latest}:{state['count']}"
+    return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+
+def gantt_payload(project):
+    """
+    A project's tasks and links for a Gantt chart, in two queries.
+
+    Task fields are parallel arrays in precedence order (``topo_rank``).
+    Dates are day offsets from ``origin``; ``days`` counts the end day.
+    Links are ``[predecessor, successor]`` positions in those arrays.
+    """
+    rows = list(
+        ProjectTask.objects.filter(project=project)
+        .order_by("topo_rank", "start_date", "id")
+        .values_list("id", "task_name", "scope", "assigned_to_id", "start_date", "end_date",
+                     "progress", "weight", "total_float")
+    )
+    origin = min((row[4] for row in rows), default=None)
+    index = {row[0]: i for i, row in enumerate(rows)}
+    links = [
+        [index[predecessor], index[successor]]
+        for predecessor, successor in project_edges(project)
+        if predecessor in index and successor in index
+    ]
+
+    columns = list(zip(*rows)) or [()] * 9
+    ids, names, scopes, assignees, starts, ends, progress, weights, floats = columns
+    return {
+        "format": GANTT_FORMAT,
+        "project": {"id": project.pk, "name": project.project_name},
+        "origin": origin,
+        "tasks": {
+            "id": list(ids),
+            "name": list(names),
+            "scope": list(scopes),
+            "assigned_to": list(assignees),
+            "start": [start.toordinal() - origin.toordinal() for start in starts],
+            "days": [end.toordinal() - start.toordinal() + 1 for start, end in zip(starts, ends)],
+            "progress": [float(value) for value in progress],
+            "weight": [float(value) for value in weights],
+            "critical": [value is not None and value <= 0 for value in floats],
+        },
+        "links": links,
+    }
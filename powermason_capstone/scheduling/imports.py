@@ -0,0 +1,483 @@
+import mmap
+import os
+import re
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from authentication.models import UserProfile
+from project_profiling.models import ProjectProfile
+from .models import ProgressReport, ProjectTask, ScheduleImportJob, StagedTask
+from .rollup import adjust_project_totals
+from .schedule import Dependency, project_calendar, schedule_new_tasks
+from .utils.cpm import CycleError
+from .utils.import_cache import ImportCache
+from .utils.excel_reader import PARSER_VERSION as EXCEL_PARSER_VERSION, iter_tasks_streaming, read_tasks
+from .utils.pdf_reader import PARSER_VERSION as PDF_PARSER_VERSION, iter_project_tasks, new_project_info
+from .utils.report_reader import iter_report_rows
+
+REPORT_BATCH_SIZE = 500
+TASK_BATCH_SIZE = 500
+
+
+def parse_excel(file):
+    """Large .xlsx files are streamed row by row; everything else is read in one pass."""
+    if file.name.endswith(".xlsx") and file.size > settings.SCHEDULE_IMPORT_EXCEL_STREAM_BYTES:
+        return list(iter_tasks_streaming(file))
+    return read_tasks(file)
+
+
+def _disk_path(upload):
+    """Path of the upload's bytes on local disk, if it has one."""
+    if hasattr(upload, "temporary_file_path"):  # TemporaryUploadedFile
+        return upload.temporary_file_path()
+    try:
+        return upload.path  # FieldFile on FileSystemStorage
+    except (AttributeError, NotImplementedError, ValueError):
+        return None
+
+
+@contextmanager
+def pdf_source(upload):
+    """
+    Open ``upload`` for pdfplumber without copying it to a temp file.
+
+    Uploads Django kept in memory are read from their buffer; anything on
+    disk (large spooled uploads, stored job files) is memory-mapped. The map
+    and file handle are closed however parsing ends. Yields
+    ``(source, path)``; ``path`` is None for in-memory uploads.
+    """
+    path = _disk_path(upload)
+    if path is None:
+        upload.seek(0)
+        yield upload.file, None
+        return
+
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped, path
+
+
+def _parse_pdf_upload(upload, on_progress=None):
+    # Tasks are pulled page by page; header fields fill in as they're found
+    imported_data = new_project_info()
+    with pdf_source(upload) as (source, _):
+        for task in iter_project_tasks(source, imported_data, on_page=on_progress):
+            imported_data["tasks"].append(task)
+    return imported_data
+
+
+def _parse_excel_upload(upload, on_progress=None):
+    return {"tasks": parse_excel(upload)}
+
+
+def parse_schedule_upload(upload, on_progress=None):
+    """
+    Parse an uploaded PDF/Excel schedule, reusing the cached result when the
+    same file was parsed before by the same parser version.
+
+    ``on_progress(done, total)`` is forwarded to parsers that can report it.
+    """
+    if upload.name.endswith(".pdf"):
+        parser, version = _parse_pdf_upload, PDF_PARSER_VERSION
+    elif upload.name.endswith((".xls", ".xlsx")):
+        parser, version = _parse_excel_upload, EXCEL_PARSER_VERSION
+    else:
+        return None
+
+    cache = ImportCache(settings.SCHEDULE_IMPORT_CACHE_DIR, settings.SCHEDULE_IMPORT_CACHE_MAX_BYTES)
+    key = cache.key_for(upload, version)
+    imported_data = cache.get(key)
+    if imported_data is None:
+        imported_data = parser(upload, on_progress)
+        cache.set(key, imported_data)
+    return imported_data
+
+
+def claim_next_import_job():
+    """
+    Mark the oldest queued job as running and return it, or None. A job
+    still running after ``SCHEDULE_IMPORT_JOB_TIMEOUT`` seconds lost its
+    worker and is claimed again.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.SCHEDULE_IMPORT_JOB_TIMEOUT)
+    with transaction.atomic():
+        job = (
+            ScheduleImportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="Q") | Q(status="R", started_at__lt=stale))
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "R"
+        job.progress = 0
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "progress", "started_at"])
+    return job
+
+
+def _owns_claim(job):
+    """Lock ``job`` and tell whether it is still this worker's claim (it was not timed out and claimed again)."""
+    return ScheduleImportJob.objects.select_for_update().filter(pk=job.pk, started_at=job.started_at).exists()
+
+
+def run_import_job(job):
+    """
+    Parse a claimed job's file and store the result (or the error) on it,
+    then delete the upload. Nothing is stored if the job was claimed again
+    meanwhile.
+    """
+    def on_progress(done, total):
+        percent = int(done * 100 / total) if total else 100
+        if percent != job.progress:
+            job.progress = percent
+            ScheduleImportJob.objects.filter(pk=job.pk).update(progress=percent)
+
+    upload = job.file.name
+    try:
+        with job.file.open("rb"):
+            imported_data = parse_schedule_upload(job.file, on_progress)
+        if imported_data is None:
+            raise ValueError(f"Unsupported file type: {job.file_name}")
+        with transaction.atomic():
+            if not _owns_claim(job):
+                return job
+            job.task_count = stage_tasks(job, imported_data.pop("tasks", []))
+            job.status = "D"
+            job.progress = 100
+            job.result = imported_data  # header fields; the rows are staged
+            job.file = ""
+            job.finished_at = timezone.now()
+            job.save()
+    except Exception as exc:
+        with transaction.atomic():
+            if not _owns_claim(job):
+                return job
+            job.status = "F"
+            job.error = str(exc) or exc.__class__.__name__
+            job.file = ""
+            job.finished_at = timezone.now()
+            job.save()
+
+    if upload:
+        job.file.storage.delete(upload)  # done or failed, the upload is no longer needed
+    return job
+
+
+@transaction.atomic
+def stage_tasks(job, tasks):
+    """Store parsed task dicts as the job's StagedTask rows (replacing any from an earlier run), in batches."""
+    job.staged_tasks.all().delete()
+    staged = StagedTask.objects.bulk_create(
+        (
+            StagedTask(
+                job=job,
+                row=row,
+                task_name=(task.get("task_name") or "")[:255],
+                start_date=parse_date(task["start_date"]) if task.get("start_date") else None,
+                end_date=parse_date(task["end_date"]) if task.get("end_date") else None,
+                duration_days=task.get("duration_days"),
+                manhours=task.get("manhours"),
+                scope=task.get("scope"),
+                predecessors=(task.get("predecessors") or "")[:255],
+                source_row=task.get("source_row"),
+            )
+            for row, task in enumerate(tasks)
+        ),
+        batch_size=TASK_BATCH_SIZE,
+    )
+    return len(staged)
+
+
+def _decimal(value, default=None):
+    try:
+        return Decimal(value) if value not in (None, "") else default
+    except InvalidOperation:
+        return default
+
+
+def _date(value, default=None):
+    try:
+        parsed = parse_date(value) if value else None
+    except ValueError:
+        parsed = None
+    return parsed or default
+
+
+def _id(value):
+    value = "" if value is None else str(value)
+    return int(value) if value.isdigit() else None
+
+
+# Per-row fields the import preview can override
+OVERRIDE_FIELDS = (
+    "task_name", "start_date", "end_date", "duration_days", "manhours", "weight", "scope", "assigned_to", "predecessors",
+)
+
+# A predecessor reference that is a (1-based) row number, e.g. "12" or "12.0" from a numeric cell
+ROW_REFERENCE = re.compile(r"(\d+)(?:\.0*)?")
+
+
+def _references(predecessors):
+    """
+    Split a predecessors cell into references: on commas and semicolons,
+    and on whitespace too when every piece is a row number ("3 5"), so
+    task names with spaces stay whole.
+    """
+    for part in re.split(r"[,;]", predecessors or ""):
+        pieces = part.split()
+        if len(pieces) > 1 and all(ROW_REFERENCE.fullmatch(piece) for piece in pieces):
+            yield from pieces
+        elif pieces:
+            yield " ".join(pieces)
+
+
+def resolve_predecessors(rows, removed_rows=(), removed_names=()):
+    """
+    Turn each row's predecessor references into links between rows.
+
+    ``rows`` is a list of ``(row, task_name, predecessors)`` with ``row``
+    the number the file gives the task (see ``StagedTask.source_row``; None
+    if it has none) and ``predecessors`` the references, separated by
+    commas, semicolons or, between row numbers, spaces. A number refers to
+    a row; anything else to a task name (case-insensitive), taking the
+    nearest row above with that name, else the nearest below. References to ``removed_rows`` or
+    ``removed_names`` are dropped along with those rows.
+
+    Returns ``(links, unresolved)``: ``(predecessor, successor)`` index
+    pairs into ``rows`` and ``(row, reference)`` pairs that match nothing.
+    """
+    by_row = {row: i for i, (row, _, _) in enumerate(rows) if row is not None}
+    by_name = {}
+    for i, (_, name, _) in enumerate(rows):
+        by_name.setdefault(name.casefold(), []).append(i)  # indexes ascend
+    removed_names = {name.casefold() for name in removed_names}
+
+    links = set()
+    unresolved = []
+    for i, (row, _, predecessors) in enumerate(rows):
+        for reference in _references(predecessors):
+            number = ROW_REFERENCE.fullmatch(reference)
+            if number:
+                predecessor = by_row.get(int(number.group(1)))
+                dropped = int(number.group(1)) in removed_rows
+            else:
+                matches = by_name.get(reference.casefold(), ())
+                above = bisect_left(matches, i)
+                predecessor = matches[above - 1] if above else next((j for j in matches if j != i), None)
+                dropped = reference.casefold() in removed_names
+            if predecessor is not None:
+                links.add((predecessor, i))
+            elif not dropped:
+                unresolved.append((row, reference))
+    return sorted(links), unresolved
+
+
+def save_staged_tasks(job, overrides, removed=(), global_scope=None, global_assignee=None):
+    """
+    Turn a job's staged rows into ProjectTasks, applying the preview's edits.
+
+    ``overrides`` maps a staged row number to the fields edited for it in
+    the preview (see ``OVERRIDE_FIELDS``); anything not overridden keeps
+    its parsed value. Rows in ``removed`` are dropped. ``global_scope`` and
+    ``global_assignee`` fill in rows without a scope/assignee of their own.
+
+    The staged rows are read in one query, every assignee is looked up in
+    a single ``in_bulk``, the new tasks get their critical-path fields
+    before they are inserted, and the insert, the project rollup update
+    and the staging cleanup run in one transaction, so the query count
+    doesn't grow with the row count.
+    Durations are recounted in working days of the project calendar, and a
+    row with a start and a duration but no end gets its end from it.
+    Predecessor references are resolved against the kept rows (see
+    ``resolve_predecessors``) and the links written to the dependency
+    table with one ``bulk_create`` after the tasks, which are inserted
+    with their ranks and schedule already accounting for them.
+    Returns the number of tasks created; a job that was already confirmed
+    has nothing staged and returns 0.
+
+    Raises ValueError, saving nothing, when a kept row has no start or end
+    date, names a predecessor that matches no row, or the predecessors
+    form a cycle.
+    """
+    overrides = {_id(row): fields for row, fields in overrides.items()}
+    removed = {_id(row) for row in removed}
+    global_scope = global_scope or None
+    global_assignee = _id(global_assignee)
+
+    with transaction.atomic():
+        # Lock the job so a double submit can't save its rows twice
+        ScheduleImportJob.objects.select_for_update().get(pk=job.pk)
+
+        staged_rows = list(job.staged_tasks.all())
+        # Row numbers the file gives its tasks; rows staged before they were recorded fall back to position
+        numbered = any(staged.source_row is not None for staged in staged_rows)
+        number = {staged.row: staged.source_row if numbered else staged.row + 1 for staged in staged_rows}
+
+        rows = []
+        removed_names = []
+        for staged in staged_rows:
+            if staged.row in removed:
+                removed_names.append(staged.task_name)
+                continue
+            override = overrides.get(staged.row, {})
+            rows.append((staged, override, _id(override.get("assigned_to")) or global_assignee))
+        assignees = UserProfile.objects.in_bulk({assignee for _, _, assignee in rows if assignee})
+
+        tasks = []
+        for staged, override, assignee in rows:
+            tasks.append(ProjectTask(
+                project_id=job.project_id,
+                task_name=(override.get("task_name") or staged.task_name).strip()[:255],
+                start_date=_date(override.get("start_date"), staged.start_date),
+                end_date=_date(override.get("end_date"), staged.end_date),
+                duration_days=_decimal(override.get("duration_days"), staged.duration_days),
+                manhours=_decimal(override.get("manhours"), staged.manhours),
+                weight=_decimal(override.get("weight"), Decimal("0")),
+                scope=override.get("scope", staged.scope) or global_scope,
+                assigned_to=assignees.get(assignee),
+            ))
+
+        # Durations in working days, and ends for rows given only a duration, in one pass each
+        calendar = project_calendar(job.project)
+        open_ended = [task for task in tasks if task.start_date and not task.end_date and task.duration_days]
+        if open_ended:
+            ends = calendar.end_dates([task.start_date for task in open_ended], [task.duration_days for task in open_ended])
+            for task, end in zip(open_ended, ends):
+                task.end_date = end
+        dated = [task for task in tasks if task.start_date and task.end_date]
+        if dated:
+            durations = calendar.durations([task.start_date for task in dated], [task.end_date for task in dated])
+            for task, days in zip(dated, durations):
+                task.duration_days = Decimal(int(days))
+
+        missing_dates = [
+            number[staged.row] or task.task_name for (staged, _, _), task in zip(rows, tasks)
+            if not (task.start_date and task.end_date)
+        ]
+        if missing_dates:
+            raise ValueError(
+                "Rows without a start or end date: " + ", ".join(map(str, missing_dates))
+            )
+
+        links, unresolved = resolve_predecessors(
+            [
+                (number[staged.row], task.task_name, override.get("predecessors", staged.predecessors))
+                for (staged, override, _), task in zip(rows, tasks)
+            ],
+            removed_rows={number.get(row) for row in removed} - {None},
+            removed_names=removed_names,
+        )
+        if unresolved:
+            raise ValueError(
+                "Unknown predecessors: " + ", ".join(f"row {row}: {reference!r}" for row, reference in unresolved)
+            )
+
+        try:
+            schedule_new_tasks(job.project, tasks, links)
+        except CycleError as e:
+            raise ValueError(
+                "Circular predecessors between rows: " + ", ".join(str(number[rows[i][0].row] or tasks[i].task_name) for i in sorted(e.task_ids))
+            ) from None
+        ProjectTask.objects.bulk_create(tasks, batch_size=TASK_BATCH_SIZE)
+        adjust_project_totals(job.project_id, weight=sum(task.weight for task in tasks), tasks=len(tasks))
+        Dependency.objects.bulk_create(
+            [Dependency(to_projecttask_id=tasks[i].id, from_projecttask_id=tasks[j].id) for i, j in links],
+            batch_size=TASK_BATCH_SIZE,
+        )
+        job.staged_tasks.all().delete()
+    return len(tasks)
+
+
+def _percent(value):
+    return Decimal(value).quantize(Decimal("0.0001"))
+
+
+def ingest_progress_workbook(file, project=None):
+    """
+    Upsert the daily/weekly accomplishment rows of one workbook into
+    ProgressReport and return how many of the workbook's rows were written.
+
+    Rows are matched to a project by their PROJ ID (``project_code``) unless
+    ``project`` is given. Re-ingesting a file updates the existing
+    (project, type, date) rows instead of adding new ones; a date the
+    workbook repeats keeps its last row. Running totals continue from the
+    latest stored report before the file's first date, and stored reports
+    after that date are rewritten too, since their totals build on the
+    file's rows.
+    """
+    source_file = os.path.basename(getattr(file, "name", str(file)))
+    projects = {}
+    grouped = {}
+    for row in iter_report_rows(file):
+        if project is None:
+            code = row["proj_id"]
+            if code not in projects:
+                projects[code] = ProjectProfile.objects.filter(project_code__iexact=code).first() if code else None
+            if projects[code] is None:
+                raise ValueError(f"No project with code {code!r} for {source_file}; pass a project explicitly.")
+            row_project = projects[code]
+        else:
+            row_project = project
+        grouped.setdefault((row_project, row["report_type"]), []).append(row)
+
+    with transaction.atomic():
+        reports = []
+        written = 0
+        for (row_project, report_type), rows in grouped.items():
+            by_date = {row["report_date"]: row for row in rows}  # one upsert can't touch a row twice
+            first = min(by_date)
+            written += len(by_date)
+            stored = ProgressReport.objects.filter(project=row_project, report_type=report_type)
+            previous = (
+                stored.filter(report_date__lt=first)
+                .order_by("-report_date")
+                .values_list("accomplished_to_date", flat=True)
+                .first()
+            )
+
+            # The chain from the first date on: later stored reports plus the file's rows
+            chain = {
+                report["report_date"]: report
+                for report in stored.filter(report_date__gte=first).values(
+                    "report_date", "accomplished_this_period", "accomplished_amount", "source_file"
+                )
+            }
+            for day, row in by_date.items():
+                amount = row["accomplished_amount"]
+                chain[day] = {
+                    "report_date": day,
+                    "accomplished_this_period": _percent(row["accomplished_this_period"]),
+                    "accomplished_amount": None if amount is None else Decimal(amount).quantize(Decimal("0.01")),
+                    "source_file": source_file,
+                }
+
+            to_date = previous or Decimal("0")
+            for day in sorted(chain):
+                before, to_date = to_date, to_date + chain[day]["accomplished_this_period"]
+                reports.append(ProgressReport(
+                    project=row_project,
+                    report_type=report_type,
+                    accomplished_before=before,
+                    accomplished_to_date=to_date,
+                    **chain[day],
+                ))
+
+        ProgressReport.objects.bulk_create(
+            reports,
+            batch_size=REPORT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["project", "report_type", "report_date"],
+            update_fields=[
+                "accomplished_this_period", "accomplished_before", "accomplished_to_date",
+                "accomplished_amount", "source_file",
+            ],
+        )
+    return written
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from scheduling.utils.excel_reader import iter_tasks_streaming, read_tasks
+from scheduling.utils.synthetic import build_schedule_xlsx
+
+
+def legacy_parse_excel(file):
+    """The pre-vectorization importer (whole sheet + iterrows), kept for comparison."""
+    df = pd.read_excel(file)
+    tasks = []
+    for _, row in df.iterrows():
+        tasks.append({
+            "task_name": row.get("Task"),
+            "start_date": row.get("Start"),
+            "end_date": row.get("End"),
+            "duration_days": row.get("Days"),
+            "manhours": row.get("MH"),
+            "scope": row.get("Scope"),
+        })
+    return tasks
+
+
+class Command(BaseCommand):
+    help = "Time the Excel task importers on a synthetic workbook."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50_000)
+        parser.add_argument("--xlsx", help="Benchmark an existing workbook instead of a generated one")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = options["xlsx"]
+            if not path:
+                path = os.path.join(tmp, "schedule.xlsx")
+                build_schedule_xlsx(path, options["rows"])
+
+            paths = [
+                ("legacy (iterrows)", legacy_parse_excel),
+                ("vectorized", read_tasks),
+                ("streaming", lambda f: list(iter_tasks_streaming(f))),
+            ]
+            timings = []
+            for label, parse in paths:
+                started = time.perf_counter()
+                tasks = parse(path)
+                timings.append((label, time.perf_counter() - started, len(tasks)))
+
+        baseline = timings[0][1]
+        for label, seconds, count in timings:
+            self.stdout.write(f"{label:<18} {seconds:7.2f}s  {count} tasks  {baseline / seconds:5.2f}x")
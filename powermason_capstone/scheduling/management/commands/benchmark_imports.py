@@ -0,0 +1,144 @@
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduling.utils.excel_reader import iter_tasks_streaming, read_tasks
+from scheduling.utils.pdf_reader import extract_project_info
+from scheduling.utils.synthetic import build_schedule_pdf, build_schedule_xlsx
+
+# Import path -> (file kind, parser); each parser returns the task list
+IMPORT_PATHS = {
+    "pdf": ("pdf", lambda path: extract_project_info(path)["tasks"]),
+    "xlsx": ("xlsx", read_tasks),
+    "xlsx-streaming": ("xlsx", lambda path: list(iter_tasks_streaming(path))),
+}
+
+BUILDERS = {"pdf": build_schedule_pdf, "xlsx": build_schedule_xlsx}
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_case(name, path):
+    """
+    Parse ``path`` once in a fresh child process and report its cost.
+
+    Running each case in its own process keeps peak RSS per case: the
+    high-water mark of one parse can't leak into the next. ``parse_rss_mb``
+    is the growth over the forked baseline (Django and the parsers already
+    imported).
+    """
+    _, parse = IMPORT_PATHS[name]
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    tasks = parse(path)
+    seconds = time.perf_counter() - started
+    return {
+        "seconds": round(seconds, 4),
+        "tasks": len(tasks),
+        "tasks_per_sec": round(len(tasks) / seconds, 1) if seconds else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "parse_rss_mb": round(_peak_rss_mb() - baseline, 1),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every schedule import path on synthetic PDF/XLSX files and "
+        "write the results as JSON for comparison between commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000],
+                            help="Task counts to generate (default: 100 1000 10000)")
+        parser.add_argument("--paths", nargs="+", choices=list(IMPORT_PATHS), default=list(IMPORT_PATHS))
+        parser.add_argument("--repeat", type=int, default=1,
+                            help="Runs per case; the fastest is kept")
+        parser.add_argument("--output", default="import_benchmark.json")
+        parser.add_argument("--compare", help="Earlier results file to report changes against")
+        parser.add_argument("--threshold", type=float, default=10.0,
+                            help="Percent slowdown flagged as a regression when comparing")
+
+    def handle(self, *args, **options):
+        paths = options["paths"]
+
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in options["sizes"]:
+                files = {}
+                for kind in sorted({IMPORT_PATHS[name][0] for name in paths}):
+                    files[kind] = BUILDERS[kind](os.path.join(tmp, f"schedule-{size}.{kind}"), size)
+
+                for name in paths:
+                    path = files[IMPORT_PATHS[name][0]]
+                    runs = [self._measure(name, path) for _ in range(options["repeat"])]
+                    best = min(runs, key=lambda run: run["seconds"])
+                    best.update(path=name, size=size, file_bytes=os.path.getsize(path))
+                    results.append(best)
+                    self.stdout.write(
+                        f"{name:<15} {size:>6} tasks  {best['seconds']:8.3f}s  "
+                        f"{best['tasks_per_sec'] or 0:9.1f} tasks/s  +{best['parse_rss_mb']:.1f} MB"
+                    )
+
+        report = {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        }
+        with open(options["output"], "w") as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+        if options["compare"]:
+            self._compare(options["compare"], results, options["threshold"])
+
+    def _measure(self, name, path):
+        # fork keeps Django settings and imports; one child per run isolates memory
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("fork")) as executor:
+            return executor.submit(_run_case, name, path).result()
+
+    def _compare(self, previous_path, results, threshold):
+        try:
+            with open(previous_path) as fh:
+                previous = json.load(fh)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {previous_path}: {e}")
+
+        before = {(r["path"], r["size"]): r for r in previous.get("results", [])}
+        self.stdout.write(f"\nAgainst {previous_path} (commit {previous.get('commit') or '?'}):")
+        for result in results:
+            old = before.get((result["path"], result["size"]))
+            if not old or not old["seconds"]:
+                continue
+            change = (result["seconds"] - old["seconds"]) * 100 / old["seconds"]
+            line = (
+                f"{result['path']:<15} {result['size']:>6} tasks  {old['seconds']:8.3f}s -> "
+                f"{result['seconds']:8.3f}s  {change:+6.1f}%  "
+                f"memory +{old['parse_rss_mb']:.1f} -> +{result['parse_rss_mb']:.1f} MB"
+            )
+            if change > threshold:
+                self.stdout.write(self.style.ERROR(f"{line}  REGRESSION"))
+            else:
+                self.stdout.write(line)
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+
+from scheduling.imports import pdf_source
+from scheduling.utils.pdf_reader import extract_project_info, iter_project_tasks, new_project_info
+from scheduling.utils.synthetic import ROWS_PER_PAGE, build_schedule_pdf
+
+
+def _timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def _parse_via_temp_copy(upload):
+    """The old task_create path: copy the upload to a temp file, parse it, delete it."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        for chunk in upload.chunks():
+            tmp.write(chunk)
+        tmp_path = tmp.name
+    try:
+        return extract_project_info(tmp_path)
+    finally:
+        os.remove(tmp_path)
+
+
+def _parse_in_place(upload):
+    project_info = new_project_info()
+    with pdf_source(upload) as (source, _):
+        project_info["tasks"].extend(iter_project_tasks(source, project_info))
+    return project_info
+
+
+class Command(BaseCommand):
+    help = "Time PDF schedule parsing on a synthetic schedule: temp copy vs in place."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=220)
+        parser.add_argument("--pdf", help="Benchmark an existing PDF instead of a generated one")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = options["pdf"]
+            if not pdf_path:
+                pdf_path = os.path.join(tmp, "schedule.pdf")
+                build_schedule_pdf(pdf_path, options["pages"] * ROWS_PER_PAGE)
+
+            with open(pdf_path, "rb") as fh:
+                content = fh.read()
+            copied, copy_time = _timed(_parse_via_temp_copy, SimpleUploadedFile("s.pdf", content))
+            direct, direct_time = _timed(_parse_in_place, SimpleUploadedFile("s.pdf", content))
+            if copied != direct:
+                self.stderr.write(self.style.ERROR("In-place result differs from temp-copy result."))
+            self.stdout.write(f"tasks:      {len(direct['tasks'])}")
+            self.stdout.write(f"temp copy:  {copy_time:.3f}s ({len(content) / 1024:.0f} KiB written and re-read)")
+            self.stdout.write(f"in place:   {direct_time:.3f}s (0 KiB written, {copy_time - direct_time:+.3f}s saved)")
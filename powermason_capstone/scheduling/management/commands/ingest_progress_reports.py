@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from project_profiling.models import ProjectProfile
+from scheduling.imports import ingest_progress_workbook
+
+
+class Command(BaseCommand):
+    help = "Load daily/weekly accomplishment workbooks (.xlsx) into ProgressReport."
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+")
+        parser.add_argument("--project", type=int, help="Project id to use instead of the workbook's PROJ ID")
+
+    def handle(self, *args, **options):
+        project = None
+        if options["project"]:
+            try:
+                project = ProjectProfile.objects.get(id=options["project"])
+            except ProjectProfile.DoesNotExist:
+                raise CommandError(f"Project {options['project']} does not exist.")
+
+        for path in options["files"]:
+            try:
+                count = ingest_progress_workbook(path, project=project)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(f"{path}: {count} report row(s) upserted"))
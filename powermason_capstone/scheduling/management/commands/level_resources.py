@@ -0,0 +1,38 @@
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.management.base import BaseCommand
+
+from scheduling.schedule import propose_leveling
+
+
+class Command(BaseCommand):
+    help = (
+        "Propose task date shifts, within each task's float, that keep every "
+        "assignee's daily manhours across projects under capacity. Nothing is saved."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("projects", nargs="*", type=int, help="Project ids (default: all with assigned work)")
+        parser.add_argument("--capacity", type=float, default=settings.SCHEDULE_DAILY_CAPACITY_HOURS,
+                            help="Hours per person per day")
+        parser.add_argument("--output", help="Write the full proposal as JSON to this file")
+
+    def handle(self, *args, **options):
+        proposal = propose_leveling(options["capacity"], options["projects"] or None)
+
+        for project in proposal["skipped_projects"]:
+            self.stderr.write(f"Project {project['project_id']} skipped: circular dependencies")
+        for resource in proposal["resources"]:
+            self.stdout.write(
+                f"assignee {resource['assigned_to']}: peak {resource['peak_before']}h -> {resource['peak_after']}h, "
+                f"{resource['overloaded_days_before']} -> {resource['overloaded_days_after']} day(s) and "
+                f"{resource['overtime_hours_before']} -> {resource['overtime_hours_after']}h over capacity"
+            )
+        self.stdout.write(f"{len(proposal['changes'])} task(s) to move")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(proposal, fh, cls=DjangoJSONEncoder, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
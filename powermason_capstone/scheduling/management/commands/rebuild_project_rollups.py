@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from scheduling.rollup import rebuild_project_totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the progress, weight and task counts stored on every project "
+        "(or on the given projects) from their tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("projects", nargs="*", type=int, help="Project ids (default: all)")
+
+    def handle(self, *args, **options):
+        changed = rebuild_project_totals(options["projects"] or None)
+        self.stdout.write(f"{changed} project(s) updated")
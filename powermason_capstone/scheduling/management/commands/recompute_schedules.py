@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from project_profiling.models import ProjectProfile
+from scheduling.schedule import rank_project, recompute_durations, recompute_schedule
+from scheduling.utils.cpm import CycleError
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored working-day durations, critical-path fields and dependency ranks "
+        "of every task (or of the given projects)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("projects", nargs="*", type=int, help="Project ids (default: all)")
+
+    def handle(self, *args, **options):
+        projects = ProjectProfile.objects.all()
+        if options["projects"]:
+            projects = projects.filter(id__in=options["projects"])
+
+        for project in projects.iterator():
+            try:
+                recompute_durations(project)
+                rank_project(project)
+                updated = recompute_schedule(project)
+            except CycleError as exc:
+                self.stderr.write(f"{project}: {exc}")
+                continue
+            self.stdout.write(f"{project}: {len(updated)} task(s) updated")
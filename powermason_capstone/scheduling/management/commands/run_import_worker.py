@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from scheduling.imports import claim_next_import_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = "Process queued schedule imports (PDF/Excel uploads from the task form)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process the queue once and exit")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_next_import_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["sleep"])
+                continue
+
+            self.stdout.write(f"Importing {job.file_name} (job {job.pk})...")
+            run_import_job(job)
+            if job.status == "D":
+                self.stdout.write(self.style.SUCCESS(f"  {job.task_count} task(s) parsed"))
+            else:
+                self.stdout.write(self.style.ERROR(f"  failed: {job.error}"))
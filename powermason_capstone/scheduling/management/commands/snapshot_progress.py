@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduling.snapshots import take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Record today's progress of every task (or of the given projects) that changed since its last "
+        "snapshot. Run once a day, e.g. from cron after the day's approvals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("projects", nargs="*", type=int, help="Project ids (default: all)")
+        parser.add_argument("--date", help="Day to record the values under (YYYY-MM-DD, default: today)")
+
+    def handle(self, *args, **options):
+        day = None
+        if options["date"]:
+            try:
+                day = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        written = take_snapshots(day, options["projects"] or None)
+        self.stdout.write(f"{written} snapshot(s) written")
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:05
+
+import datetime
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    ProgressReport's free-text CharFields become typed columns. Nothing wrote
+    to the old columns, so they are replaced rather than converted.
+    """
+
+    dependencies = [
+        ('project_profiling', '0005_alter_projectprofile_project_manager'),
+        ('scheduling', '0006_scheduleimportjob'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='progressreport',
+            name='report_date',
+        ),
+        migrations.RemoveField(
+            model_name='progressreport',
+            name='accomplished_to_date',
+        ),
+        migrations.RemoveField(
+            model_name='progressreport',
+            name='accomplished_before',
+        ),
+        migrations.RemoveField(
+            model_name='progressreport',
+            name='accomplished_this_period',
+        ),
+        migrations.AddField(
+            model_name='progressreport',
+            name='report_type',
+            field=models.CharField(choices=[('D', 'Daily Accomplishment'), ('W', 'Weekly Progress')], default='W', max_length=1),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='progressreport',
+            name='report_date',
+            field=models.DateField(default=datetime.date(1970, 1, 1)),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='progressreport',
+            name='accomplished_this_period',
+            field=models.DecimalField(decimal_places=4, default=Decimal('0'), max_digits=9),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='progressreport',
+            name='accomplished_before',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='progressreport',
+            name='accomplished_to_date',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='progressreport',
+            name='accomplished_amount',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True),
+        ),
+        migrations.AddField(
+            model_name='progressreport',
+            name='source_file',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='progressreport',
+            constraint=models.UniqueConstraint(fields=('project', 'report_type', 'report_date'), name='unique_progress_report_per_day'),
+        ),
+        migrations.AddIndex(
+            model_name='progressreport',
+            index=models.Index(fields=['project', 'report_date'], name='scheduling__project_9f1987_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0007_typed_progressreport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StagedTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row', models.PositiveIntegerField()),
+                ('task_name', models.CharField(max_length=255)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('duration_days', models.DecimalField(blank=True, decimal_places=1, max_digits=6, null=True)),
+                ('manhours', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('scope', models.CharField(blank=True, max_length=255, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='staged_tasks', to='scheduling.scheduleimportjob')),
+            ],
+            options={
+                'ordering': ['row'],
+                'constraints': [models.UniqueConstraint(fields=('job', 'row'), name='unique_staged_task_row')],
+            },
+        ),
+    ]
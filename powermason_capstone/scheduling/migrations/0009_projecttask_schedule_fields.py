@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0008_stagedtask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projecttask',
+            name='early_finish',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='projecttask',
+            name='early_start',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='projecttask',
+            name='late_finish',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='projecttask',
+            name='late_start',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='projecttask',
+            name='total_float',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+def rank_tasks(apps, schema_editor):
+    """Backfill topo_rank with each task's longest chain of predecessors (Kahn's algorithm)."""
+    ProjectTask = apps.get_model("scheduling", "ProjectTask")
+    Dependency = ProjectTask.dependencies.through
+
+    successors = {}
+    indegree = dict.fromkeys(ProjectTask.objects.values_list("id", flat=True), 0)
+    for predecessor, successor in Dependency.objects.values_list("to_projecttask_id", "from_projecttask_id"):
+        successors.setdefault(predecessor, []).append(successor)
+        indegree[successor] += 1
+
+    rank = dict.fromkeys(indegree, 0)
+    order = [task_id for task_id, count in indegree.items() if count == 0]
+    for task_id in order:  # grows while iterating; tasks on a cycle keep rank 0
+        for successor in successors.get(task_id, ()):
+            rank[successor] = max(rank[successor], rank[task_id] + 1)
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                order.append(successor)
+
+    ProjectTask.objects.bulk_update(
+        [ProjectTask(id=task_id, topo_rank=value) for task_id, value in rank.items() if value],
+        ["topo_rank"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0009_projecttask_schedule_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projecttask',
+            name='topo_rank',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='projecttask',
+            index=models.Index(fields=['project', 'topo_rank'], name='task_project_rank_idx'),
+        ),
+        migrations.RunPython(rank_tasks, migrations.RunPython.noop),
+    ]
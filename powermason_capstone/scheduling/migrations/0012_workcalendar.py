@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:03
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0005_alter_projectprofile_project_manager'),
+        ('scheduling', '0011_projecttask_task_project_updated_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekmask', models.CharField(default='1111110', help_text='Working days Monday to Sunday, e.g. 1111110 = Monday to Saturday', max_length=7, validators=[django.core.validators.RegexValidator('^(?!0{7})[01]{7}$', 'Seven 0/1 flags, Monday to Sunday, with at least one working day.')])),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='work_calendar', to='project_profiling.projectprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('calendar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='scheduling.workcalendar')),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('calendar', 'date'), name='unique_calendar_holiday')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0012_workcalendar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stagedtask',
+            name='predecessors',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
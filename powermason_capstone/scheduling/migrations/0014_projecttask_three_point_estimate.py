@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0013_stagedtask_predecessors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projecttask',
+            name='optimistic_days',
+            field=models.DecimalField(blank=True, decimal_places=1, max_digits=6, null=True),
+        ),
+        migrations.AddField(
+            model_name='projecttask',
+            name='pessimistic_days',
+            field=models.DecimalField(blank=True, decimal_places=1, max_digits=6, null=True),
+        ),
+    ]
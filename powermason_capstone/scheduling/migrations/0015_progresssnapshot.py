@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0006_projectprofile_rollup'),
+        ('scheduling', '0014_projecttask_three_point_estimate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgressSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('weight', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('progress', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_snapshots', to='project_profiling.projectprofile')),
+                ('task', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='scheduling.projecttask')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'date'], name='snapshot_project_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('task', 'date'), name='unique_task_snapshot_per_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_alter_userprofile_uuid'),
+        ('scheduling', '0015_progresssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='progressupdate',
+            index=models.Index(fields=['status', 'created_at'], name='scheduling__status_b972f9_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0016_progressupdate_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stagedtask',
+            name='source_row',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import RegexValidator
 from project_profiling.models import ProjectProfile  # link to your existing project profiles
 from authentication.models import UserProfile       # link to users
+from .utils.workdays import DEFAULT_WEEKMASK, WorkingCalendar
 
 class ProjectTask(models.Model):
     project = models.ForeignKey(
@@ -19,25 +22,64 @@ class ProjectTask(models.Model):
     end_date = models.DateField()
     duration_days = models.DecimalField(max_digits=6, decimal_places=1, null=True, blank=True)  # e.g., 3.0
     manhours = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)      # e.g., 120.0
+    # Three-point estimate for schedule risk, in working days; duration_days is the most likely
+    optimistic_days = models.DecimalField(max_digits=6, decimal_places=1, null=True, blank=True)
+    pessimistic_days = models.DecimalField(max_digits=6, decimal_places=1, null=True, blank=True)
 
     weight = models.DecimalField(max_digits=5, decimal_places=2, help_text="Weight contribution to project (%)")
     progress = models.DecimalField(max_digits=5, decimal_places=2, default=0, help_text="Current approved progress % for this task")
     dependencies = models.ManyToManyField("self", symmetrical=False, blank=True)
 
+    # Critical-path results, maintained by scheduling.schedule
+    early_start = models.DateField(null=True, blank=True, editable=False)
+    early_finish = models.DateField(null=True, blank=True, editable=False)
+    late_start = models.DateField(null=True, blank=True, editable=False)
+    late_finish = models.DateField(null=True, blank=True, editable=False)
+    total_float = models.IntegerField(null=True, blank=True, editable=False)  # days
+
+    # Dependency level: always higher than every predecessor's, so ordering
+    # by it lists tasks in a valid precedence order
+    topo_rank = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["project", "topo_rank"], name="task_project_rank_idx"),
+            models.Index(fields=["project", "updated_at"], name="task_project_updated_idx"),
+        ]
+
     def __str__(self):
         return f"{self.task_name} ({self.project.project_name})"
 
 class ProgressReport(models.Model):
+    REPORT_TYPES = [
+        ('D', 'Daily Accomplishment'),
+        ('W', 'Weekly Progress'),
+    ]
+
     project = models.ForeignKey(ProjectProfile, on_delete=models.CASCADE, related_name="progress_reports")
-    report_date = models.CharField(max_length=50, null=True, blank=True)  # can change to DateField if your PDF always has proper dates
-    accomplished_to_date = models.CharField(max_length=50, null=True, blank=True)
-    accomplished_before = models.CharField(max_length=50, null=True, blank=True)
-    accomplished_this_period = models.CharField(max_length=50, null=True, blank=True)
+    report_type = models.CharField(max_length=1, choices=REPORT_TYPES)
+    report_date = models.DateField()
+
+    # Percent of the project accomplished (e.g., 0.5181 = 0.5181%)
+    accomplished_this_period = models.DecimalField(max_digits=9, decimal_places=4)
+    accomplished_before = models.DecimalField(max_digits=9, decimal_places=4, null=True, blank=True)
+    accomplished_to_date = models.DecimalField(max_digits=9, decimal_places=4, null=True, blank=True)
+    accomplished_amount = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)  # pesos (weekly) or MH (daily)
+
+    source_file = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["project", "report_type", "report_date"], name="unique_progress_report_per_day"),
+        ]
+        indexes = [
+            models.Index(fields=["project", "report_date"]),
+        ]
+
     def __str__(self):
         return f"{self.project.project_code} - {self.report_date}"
     
@@ -61,6 +103,11 @@ class ProgressUpdate(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),  # the review queue
+        ]
+
     def __str__(self):
         return f"{self.task.task_name} - {self.progress_percent}% ({self.get_status_display()})"
 
@@ -76,6 +123,33 @@ class ProgressFile(models.Model):
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
 
+class ProgressSnapshot(models.Model):
+    """
+    A task's weight and approved progress at the end of a day, written by
+    the snapshot_progress command only when they changed since the task's
+    previous row. Rows are never updated afterwards, so a task's value on
+    any day is its latest row on or before it. A deleted task gets a final
+    row with zero weight.
+    """
+    project = models.ForeignKey(ProjectProfile, on_delete=models.CASCADE, related_name="progress_snapshots")
+    # No constraint: history outlives the task
+    task = models.ForeignKey(ProjectTask, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    date = models.DateField()
+    weight = models.DecimalField(max_digits=5, decimal_places=2)
+    progress = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["task", "date"], name="unique_task_snapshot_per_day"),
+        ]
+        indexes = [
+            models.Index(fields=["project", "date"], name="snapshot_project_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} - {self.date}: {self.progress}%"
+
+
 class SystemReport(models.Model):
     REPORT_TYPES = [
         ('D', 'Daily'),
@@ -88,3 +162,102 @@ class SystemReport(models.Model):
     report_type = models.CharField(max_length=1, choices=REPORT_TYPES)
     file = models.FileField(upload_to="auto_reports/")
     generated_at = models.DateTimeField(auto_now_add=True)
+
+
+class ScheduleImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('Q', 'Queued'),
+        ('R', 'Running'),
+        ('D', 'Done'),
+        ('F', 'Failed'),
+    ]
+
+    project = models.ForeignKey(ProjectProfile, on_delete=models.CASCADE, related_name="import_jobs")
+    submitted_by = models.ForeignKey(UserProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name="import_jobs")
+
+    file = models.FileField(upload_to="schedule_imports/", blank=True)
+    file_name = models.CharField(max_length=255)
+
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='Q')
+    progress = models.PositiveSmallIntegerField(default=0)  # percent of pages parsed
+    task_count = models.PositiveIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)  # same shape as extract_project_info()
+    error = models.TextField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.get_status_display()})"
+
+
+class StagedTask(models.Model):
+    """
+    One parsed row of a finished import, waiting for the user to confirm it.
+
+    Rows are keyed by the import job; confirming copies them into
+    ProjectTask with the user's overrides and deletes them.
+    """
+    job = models.ForeignKey(ScheduleImportJob, on_delete=models.CASCADE, related_name="staged_tasks")
+    row = models.PositiveIntegerField()  # position in the parsed file
+    # Number the file gives the row (sheet row, or ITEM number in a PDF); row-number predecessors refer to it
+    source_row = models.PositiveIntegerField(null=True, blank=True)
+
+    task_name = models.CharField(max_length=255)
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    duration_days = models.DecimalField(max_digits=6, decimal_places=1, null=True, blank=True)
+    manhours = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    scope = models.CharField(max_length=255, blank=True, null=True)
+    # Predecessor rows (1-based) or task names as written in the file, e.g. "3, 5" or "Excavation"
+    predecessors = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["job", "row"], name="unique_staged_task_row"),
+        ]
+        ordering = ["row"]
+
+    def __str__(self):
+        return f"{self.task_name} (import {self.job_id})"
+
+
+class WorkCalendar(models.Model):
+    """
+    A project's working days, used for task durations. Projects without
+    one work the default six-day week with no holidays.
+    """
+    project = models.OneToOneField(ProjectProfile, on_delete=models.CASCADE, related_name="work_calendar")
+    weekmask = models.CharField(
+        max_length=7,
+        default=DEFAULT_WEEKMASK,
+        validators=[RegexValidator(r"^(?!0{7})[01]{7}$", "Seven 0/1 flags, Monday to Sunday, with at least one working day.")],
+        help_text="Working days Monday to Sunday, e.g. 1111110 = Monday to Saturday",
+    )
+
+    def __str__(self):
+        return f"Calendar for {self.project.project_name}"
+
+    def as_calendar(self):
+        return WorkingCalendar(self.weekmask, self.holidays.values_list("date", flat=True))
+
+
+class Holiday(models.Model):
+    calendar = models.ForeignKey(WorkCalendar, on_delete=models.CASCADE, related_name="holidays")
+    date = models.DateField()
+    name = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["calendar", "date"], name="unique_calendar_holiday"),
+        ]
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.date} {self.name}".strip()
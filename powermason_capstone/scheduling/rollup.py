@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Case, CharField, Count, DateField, DecimalField, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Cast
+from django.db.models.lookups import GreaterThan
+
+from project_profiling.models import ProjectProfile
+from .models import ProjectTask
+from .schedule import UPDATE_BATCH_SIZE
+
+# ProjectProfile fields holding the rollup of its tasks
+ROLLUP_FIELDS = ("progress", "total_weight", "earned_weight", "task_count", "completed_task_count")
+
+ZERO = Decimal("0")
+CENT = Decimal("0.01")
+
+
+def task_totals(weight, progress, sign=1):
+    """
+    One task's share of its project's rollup, as keyword deltas for
+    ``adjust_project_totals``; ``sign=-1`` takes it back out.
+    """
+    return {
+        "weight": sign * weight,
+        "earned": sign * weight * progress / 100,
+        "tasks": sign,
+        "completed": sign if progress >= 100 else 0,
+    }
+
+
+def task_change(before, after):
+    """Deltas for a task whose ``(weight, progress)`` went from ``before`` to ``after``."""
+    old, new = task_totals(*before, sign=-1), task_totals(*after)
+    return {key: old[key] + new[key] for key in new}
+
+
+def adjust_project_totals(project_id, weight=ZERO, earned=ZERO, tasks=0, completed=0):
+    """
+    Shift a project's stored rollup by the given deltas in one UPDATE.
+    The new values are computed from the row's current ones (F
+    expressions), so concurrent writers can't lose each other's changes.
+    """
+    total_weight = F("total_weight") + weight
+    earned_weight = F("earned_weight") + earned
+    # Divide as floats: SQLite keeps whole-valued decimals as integers and would truncate
+    ratio = Cast(earned_weight, FloatField()) * 100 / Cast(total_weight, FloatField())
+    ProjectProfile.objects.filter(pk=project_id).update(
+        total_weight=total_weight,
+        earned_weight=earned_weight,
+        task_count=F("task_count") + tasks,
+        completed_task_count=F("completed_task_count") + completed,
+        progress=Case(
+            When(GreaterThan(total_weight, 0), then=ratio),
+            default=Value(ZERO),
+            output_field=DecimalField(max_digits=5, decimal_places=2),
+        ),
+    )
+
+
+def rebuild_project_totals(project_ids=None):
+    """
+    Recompute the rollup of ``project_ids`` (every project by default)
+    from their tasks: one grouped aggregate and one ``bulk_update``, with
+    the project rows locked so approvals wait. For bulk task writes and
+    repairs; returns the number of projects whose values changed.
+    """
+    with transaction.atomic():
+        projects = ProjectProfile.objects.select_for_update().only("id", *ROLLUP_FIELDS)
+        if project_ids is not None:
+            projects = projects.filter(pk__in=project_ids)
+        projects = list(projects)
+
+        tasks = ProjectTask.objects.filter(project__in=[project.pk for project in projects])
+        totals = {
+            row["project"]: row
+            for row in tasks.values("project").order_by().annotate(
+                total_weight=Sum("weight"),
+                earned_weight=Sum(F("weight") * F("progress") / 100),
+                task_count=Count("id"),
+                completed_task_count=Count("id", filter=Q(progress__gte=100)),
+            )
+        }
+
+        changed = []
+        for project in projects:
+            row = totals.get(project.pk, {})
+            total_weight = Decimal(row.get("total_weight") or 0)
+            earned_weight = Decimal(row.get("earned_weight") or 0)
+            values = {
+                "total_weight": total_weight,
+                "earned_weight": earned_weight.quantize(Decimal("0.0001")),
+                "task_count": row.get("task_count", 0),
+                "completed_task_count": row.get("completed_task_count", 0),
+                "progress": (earned_weight * 100 / total_weight).quantize(CENT) if total_weight > 0 else ZERO,
+            }
+            if any(getattr(project, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(project, field, value)
+                changed.append(project)
+
+        ProjectProfile.objects.bulk_update(changed, ROLLUP_FIELDS, batch_size=UPDATE_BATCH_SIZE)
+    return len(changed)
+
+
+def annotate_portfolio(projects, today=None):
+    """
+    Annotate a ProjectProfile queryset, computed from the tasks in the
+    same SQL statement: ``weighted_progress`` (percent of task weight
+    earned), ``overdue_tasks`` (unfinished tasks past their end date) and
+    ``next_milestone_name`` / ``next_milestone_date`` (the unfinished task
+    due soonest from today). Tasks have no milestone flag, so the next
+    deadline stands in for one. The task sums are conditional aggregates
+    over one join; the milestone comes from correlated subqueries.
+    """
+    today = today or timezone.localdate()
+    weight = Sum("tasks__weight")
+    earned = Sum(F("tasks__weight") * F("tasks__progress"))
+    upcoming = ProjectTask.objects.filter(
+        project=OuterRef("pk"), progress__lt=100, end_date__gte=today
+    ).order_by("end_date", "topo_rank", "id")
+    return projects.annotate(
+        weighted_progress=Case(
+            # Floats for the same reason as in adjust_project_totals
+            When(GreaterThan(weight, 0), then=Cast(earned, FloatField()) / Cast(weight, FloatField())),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        overdue_tasks=Count("tasks", filter=Q(tasks__end_date__lt=today, tasks__progress__lt=100)),
+        next_milestone_name=Subquery(upcoming.values("task_name")[:1], output_field=CharField()),
+        next_milestone_date=Subquery(upcoming.values("end_date")[:1], output_field=DateField()),
+    )
@@ -0,0 +1,519 @@
+from datetime import date
+from itertools import chain
+
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+
+from .models import ProjectTask, WorkCalendar
+from .utils.cpm import CycleError, compute_schedule, topological_order
+from .utils.leveling import LevelingTask, daily_peaks, level_resources
+from .utils.risk import simulate_schedule
+from .utils.workdays import WorkingCalendar
+
+# Dependency rows: from_projecttask depends on (comes after) to_projecttask
+Dependency = ProjectTask.dependencies.through
+
+# Stored CPM results, in TaskTiming order
+SCHEDULE_FIELDS = ("early_start", "early_finish", "late_start", "late_finish", "total_float")
+
+UPDATE_BATCH_SIZE = 500
+
+
+def project_edges(project):
+    """(predecessor_id, successor_id) pairs for the project's tasks, in one query."""
+    return Dependency.objects.filter(from_projecttask__project=project).values_list(
+        "to_projecttask_id", "from_projecttask_id"
+    )
+
+
+def load_schedule(project):
+    """
+    Critical-path schedule of a project, from two queries: the task dates
+    and the dependency edges. Raises CycleError on circular dependencies.
+    """
+    tasks = ProjectTask.objects.filter(project=project).values_list("id", "start_date", "end_date")
+    return compute_schedule(tasks, project_edges(project))
+
+
+def project_calendar(project):
+    """The project's WorkingCalendar (the default six-day week if it has none), in one query."""
+    rows = list(WorkCalendar.objects.filter(project=project).values_list("weekmask", "holidays__date"))
+    if not rows:
+        return WorkingCalendar()
+    return WorkingCalendar(rows[0][0], [day for _, day in rows if day is not None])
+
+
+def recompute_durations(project, calendar=None):
+    """
+    Reset every task's ``duration_days`` to its working days under the
+    project calendar, in one array pass; saves only the rows that change
+    and returns their ids.
+    """
+    rows = list(ProjectTask.objects.filter(project=project).values_list("id", "start_date", "end_date", "duration_days"))
+    if not rows:
+        return set()
+    calendar = calendar or project_calendar(project)
+    ids, starts, ends, current = zip(*rows)
+    durations = calendar.durations(starts, ends)
+    changed = [
+        ProjectTask(id=task_id, duration_days=Decimal(days))
+        for task_id, days, old in zip(ids, durations.tolist(), current)
+        if old != days
+    ]
+    ProjectTask.objects.bulk_update(changed, ["duration_days"], batch_size=UPDATE_BATCH_SIZE)
+    return {task.id for task in changed}
+
+
+def rank_project(project, new_edges=()):
+    """
+    Recompute the ``topo_rank`` of every task in a project from its whole
+    dependency graph (plus ``new_edges`` not yet saved), for bulk link
+    writes where checking edge by edge would cost a query chain each.
+    Each rank is the task's longest chain of predecessors. Raises
+    CycleError before saving anything. Returns the updated task ids.
+    """
+    rows = dict(ProjectTask.objects.filter(project=project).values_list("id", "topo_rank"))
+    ids = list(rows)
+    index = {task_id: i for i, task_id in enumerate(ids)}
+    successors = [[] for _ in ids]
+    for predecessor, successor in chain(project_edges(project), new_edges):
+        if predecessor in index and successor in index:
+            successors[index[predecessor]].append(index[successor])
+    try:
+        order = topological_order(len(ids), successors)
+    except CycleError as e:
+        raise CycleError([ids[i] for i in e.task_ids]) from None
+
+    rank = [0] * len(ids)
+    for i in order:
+        for j in successors[i]:
+            rank[j] = max(rank[j], rank[i] + 1)
+
+    changed = [ProjectTask(id=task_id, topo_rank=rank[i]) for i, task_id in enumerate(ids) if rows[task_id] != rank[i]]
+    ProjectTask.objects.bulk_update(changed, ["topo_rank"], batch_size=UPDATE_BATCH_SIZE)
+    return {task.id for task in changed}
+
+
+def rank_new_dependency(predecessor_id, successor_id, commit=True):
+    """
+    Check a new link before it is saved and keep ``topo_rank`` valid.
+
+    Ranks already order the graph, so a link from a lower-ranked task
+    costs one query. Otherwise the successor and everything after it that
+    ranks too low is raised, one dependency level per query; the search
+    never leaves tasks ranked at or below the new ranks, and reaching the
+    predecessor again means the link would close a cycle (CycleError,
+    nothing saved). With ``commit=False`` only the check runs. Returns the
+    raised task ids.
+    """
+    if predecessor_id == successor_id:
+        raise CycleError([predecessor_id])
+    ranks = dict(ProjectTask.objects.filter(id__in=(predecessor_id, successor_id)).values_list("id", "topo_rank"))
+    if ranks[predecessor_id] < ranks[successor_id]:
+        return set()
+
+    raised = {successor_id: ranks[predecessor_id] + 1}
+    frontier = {successor_id}
+    while frontier:
+        level = {}
+        for task_id, successor, rank in Dependency.objects.filter(to_projecttask_id__in=frontier).values_list(
+            "to_projecttask_id", "from_projecttask_id", "from_projecttask__topo_rank"
+        ):
+            needed = raised[task_id] + 1
+            if needed > level.get(successor, raised.get(successor, rank)):
+                if successor == predecessor_id:
+                    raise CycleError([predecessor_id, successor_id])
+                level[successor] = needed
+        raised.update(level)
+        frontier = set(level)
+
+    if commit:
+        ProjectTask.objects.bulk_update(
+            [ProjectTask(id=task_id, topo_rank=rank) for task_id, rank in raised.items()],
+            ["topo_rank"], batch_size=UPDATE_BATCH_SIZE,
+        )
+    return set(raised)
+
+
+def _save(values):
+    """bulk_update the stored schedule fields from ``{task_id: field tuple}``."""
+    ProjectTask.objects.bulk_update(
+        [ProjectTask(id=task_id, **dict(zip(SCHEDULE_FIELDS, fields))) for task_id, fields in values.items()],
+        SCHEDULE_FIELDS,
+        batch_size=UPDATE_BATCH_SIZE,
+    )
+    return set(values)
+
+
+def _project_rows(project):
+    return list(
+        ProjectTask.objects.filter(project=project).values_list("id", "start_date", "end_date", *SCHEDULE_FIELDS)
+    )
+
+
+def _changed(rows, schedule):
+    """Stored rows whose schedule fields differ from ``schedule``."""
+    changed = {}
+    for row in rows:
+        fields = tuple(schedule[row[0]])[:len(SCHEDULE_FIELDS)]
+        if fields != row[3:]:
+            changed[row[0]] = fields
+    return changed
+
+
+def recompute_schedule(project):
+    """
+    Run the full critical-path pass for a project and save the computed
+    fields of the tasks whose values changed. Returns the updated task ids.
+    """
+    rows = _project_rows(project)
+    schedule = compute_schedule((row[:3] for row in rows), project_edges(project))
+    return _save(_changed(rows, schedule))
+
+
+def schedule_new_tasks(project, tasks, links=()):
+    """
+    Fill in the schedule fields and ``topo_rank`` of unsaved ``tasks`` so
+    they are inserted already computed, and save the existing tasks whose
+    values move because of them, e.g. when the project finish changes.
+
+    ``links`` are ``(predecessor, successor)`` index pairs into ``tasks``
+    for the links the caller saves along with them; new tasks have no
+    links to existing ones. Raises CycleError (with those indexes) before
+    saving anything when the links are circular. Returns the updated
+    existing task ids.
+    """
+    successors = [[] for _ in tasks]
+    for i, j in links:
+        successors[i].append(j)
+    rank = [0] * len(tasks)
+    for i in topological_order(len(tasks), successors):
+        for j in successors[i]:
+            rank[j] = max(rank[j], rank[i] + 1)
+
+    rows = _project_rows(project)
+    keys = [("new", i) for i in range(len(tasks))]
+    schedule = compute_schedule(
+        chain((row[:3] for row in rows), ((key, t.start_date, t.end_date) for key, t in zip(keys, tasks))),
+        chain(project_edges(project), ((keys[i], keys[j]) for i, j in links)),
+    )
+    for key, task, task_rank in zip(keys, tasks, rank):
+        for field, value in zip(SCHEDULE_FIELDS, schedule[key]):
+            setattr(task, field, value)
+        task.topo_rank = task_rank
+    return _save(_changed(rows, schedule))
+
+
+def _duration(start, end):
+    return max(end.toordinal() - start.toordinal(), 0) + 1
+
+
+def repropagate(task):
+    """
+    Update stored schedule fields after ``task``'s dates changed.
+
+    Early dates can only move downstream, so the forward pass reruns over
+    the task's successor subgraph alone, loaded one dependency level per
+    query. Late dates of that subgraph are recomputed backwards from the
+    project finish; where a late start moved, the change is pushed up to
+    the predecessors it affects, stopping as soon as nothing changes.
+    Only rows whose values changed are saved, with ``bulk_update``.
+
+    Falls back to ``recompute_schedule`` when the project finish moves
+    (every late date shifts) or the tasks involved were never computed.
+    Returns the updated task ids. Raises CycleError on circular links.
+    """
+    project_id = task.project_id
+    links = Dependency.objects.filter(
+        to_projecttask__project_id=project_id, from_projecttask__project_id=project_id
+    )
+
+    # Successor subgraph, one level per query
+    downstream = {task.id}
+    edges = []
+    frontier = {task.id}
+    while frontier:
+        level = list(links.filter(to_projecttask_id__in=frontier).values_list("to_projecttask_id", "from_projecttask_id"))
+        edges.extend(level)
+        frontier = {successor for _, successor in level} - downstream
+        downstream |= frontier
+
+    rows = {
+        row[0]: row
+        for row in ProjectTask.objects.filter(id__in=downstream).values_list("id", "start_date", "end_date", *SCHEDULE_FIELDS)
+    }
+    outside = list(
+        links.filter(from_projecttask_id__in=downstream).exclude(to_projecttask_id__in=downstream)
+        .values_list("from_projecttask_id", "to_projecttask__early_finish")
+    )
+    if any(None in row for row in rows.values()) or any(finish is None for _, finish in outside):
+        return recompute_schedule(task.project)
+
+    # Forward pass over the subgraph; outside predecessors keep their early finish
+    ids = list(rows)
+    index = {task_id: i for i, task_id in enumerate(ids)}
+    successors = [[] for _ in ids]
+    for predecessor, successor in edges:
+        successors[index[predecessor]].append(index[successor])
+    try:
+        order = topological_order(len(ids), successors)
+    except CycleError as e:
+        raise CycleError([ids[i] for i in e.task_ids]) from None
+
+    duration = [_duration(rows[task_id][1], rows[task_id][2]) for task_id in ids]
+    es = [rows[task_id][1].toordinal() for task_id in ids]
+    for successor, finish in outside:
+        i = index[successor]
+        es[i] = max(es[i], finish.toordinal() + 1)
+    ef = [0] * len(ids)
+    for i in order:
+        finish = ef[i] = es[i] + duration[i]
+        for j in successors[i]:
+            es[j] = max(es[j], finish)
+
+    # The project finish must not move, or every late date shifts
+    rest_finish = ProjectTask.objects.filter(project_id=project_id).exclude(id__in=downstream).aggregate(
+        finish=Max("early_finish")
+    )["finish"]
+    rest_finish = rest_finish.toordinal() + 1 if rest_finish else 0
+    old_finish = max([rest_finish] + [row[4].toordinal() + 1 for row in rows.values()])
+    project_finish = max([rest_finish] + ef)
+    if project_finish != old_finish:
+        return recompute_schedule(task.project)
+
+    # Backward pass over the subgraph (it is closed under successors)
+    ls = [0] * len(ids)
+    lf = [0] * len(ids)
+    for i in reversed(order):
+        late = min((ls[j] for j in successors[i]), default=project_finish)
+        lf[i] = late
+        ls[i] = late - duration[i]
+
+    changed = {}
+    late_start = {}
+    for i, task_id in enumerate(ids):
+        fields = (
+            date.fromordinal(es[i]), date.fromordinal(ef[i] - 1),
+            date.fromordinal(ls[i]), date.fromordinal(lf[i] - 1), ls[i] - es[i],
+        )
+        if fields != rows[task_id][3:]:
+            changed[task_id] = fields
+        late_start[task_id] = ls[i]
+    frontier = {task_id for task_id, fields in changed.items() if fields[2] != rows[task_id][5]}
+
+    # Push moved late starts up to the predecessors outside the subgraph
+    while frontier:
+        predecessors = set(
+            links.filter(from_projecttask_id__in=frontier).exclude(to_projecttask_id__in=downstream)
+            .values_list("to_projecttask_id", flat=True)
+        )
+        if not predecessors:
+            break
+        latest = {}
+        for predecessor, successor, successor_start in links.filter(to_projecttask_id__in=predecessors).values_list(
+            "to_projecttask_id", "from_projecttask_id", "from_projecttask__late_start"
+        ):
+            start = late_start.get(successor, successor_start.toordinal() if successor_start else project_finish)
+            latest[predecessor] = min(latest.get(predecessor, project_finish), start)
+
+        frontier = set()
+        for task_id, start, end, *fields in ProjectTask.objects.filter(id__in=predecessors).values_list(
+            "id", "start_date", "end_date", *SCHEDULE_FIELDS
+        ):
+            if None in fields:
+                return recompute_schedule(task.project)
+            early_start = fields[0].toordinal()
+            late = latest.get(task_id, project_finish)
+            new_late_start = late - _duration(start, end)
+            if new_late_start == late_start.get(task_id, fields[2].toordinal()):
+                continue
+            late_start[task_id] = new_late_start
+            changed[task_id] = (
+                fields[0], fields[1],
+                date.fromordinal(new_late_start), date.fromordinal(late - 1), new_late_start - early_start,
+            )
+            frontier.add(task_id)
+
+    return _save(changed)
+
+
+def propose_leveling(capacity, project_ids=None):
+    """
+    Level assignee workloads across projects and return the proposed
+    schedule changes; nothing is saved.
+
+    Loads the tasks of every project with assigned work (or of
+    ``project_ids``) and their dependencies in two queries, runs the
+    critical-path pass per project for each task's float, and spreads
+    each task's manhours evenly over its days as its assignee's load.
+    Shifts are measured from each task's critical-path early start, so
+    the diff holds only the moves leveling makes. Projects with circular
+    dependencies are skipped and listed.
+    """
+    if project_ids is None:
+        project_ids = (
+            ProjectTask.objects.filter(assigned_to__isnull=False, manhours__gt=0)
+            .values("project_id").distinct()
+        )
+    rows = list(ProjectTask.objects.filter(project_id__in=project_ids).values_list(
+        "id", "project_id", "task_name", "assigned_to_id", "start_date", "end_date", "manhours"
+    ))
+    edges = list(Dependency.objects.filter(from_projecttask__project_id__in=project_ids).values_list(
+        "to_projecttask_id", "from_projecttask_id"
+    ))
+
+    by_project = {}
+    project_of = {}
+    for row in rows:
+        by_project.setdefault(row[1], []).append(row)
+        project_of[row[0]] = row[1]
+    predecessors = {}
+    edges_by_project = {}
+    for predecessor, successor in edges:
+        predecessors.setdefault(successor, []).append(predecessor)
+        edges_by_project.setdefault(project_of.get(successor), []).append((predecessor, successor))
+
+    leveling_tasks = []
+    skipped = []
+    for project_id, project_rows in by_project.items():
+        try:
+            schedule = compute_schedule(
+                ((row[0], row[4], row[5]) for row in project_rows), edges_by_project.get(project_id, ())
+            )
+        except CycleError as e:
+            skipped.append({"project_id": project_id, "task_ids": e.task_ids})
+            continue
+        for task_id, _, _, assignee, _, _, manhours in project_rows:
+            i = schedule.index[task_id]
+            duration = schedule.duration[i]
+            leveling_tasks.append(LevelingTask(
+                id=task_id,
+                resource=assignee,
+                early_start=schedule.es[i],
+                late_start=schedule.ls[i],
+                duration=duration,
+                daily_hours=float(manhours) / duration if assignee and manhours else 0.0,
+            ))
+
+    starts, overloads = level_resources(leveling_tasks, predecessors, capacity)
+    before = daily_peaks(leveling_tasks, {task.id: task.early_start for task in leveling_tasks}, capacity)
+    after = daily_peaks(leveling_tasks, starts, capacity)
+
+    info = {row[0]: row for row in rows}
+    changes = []
+    for task in leveling_tasks:
+        start = starts[task.id]
+        if start == task.early_start:
+            continue
+        task_id, project_id, task_name, assignee, start_date, end_date, _ = info[task.id]
+        changes.append({
+            "id": task_id,
+            "project_id": project_id,
+            "task_name": task_name,
+            "assigned_to": assignee,
+            "start_date": start_date,
+            "end_date": end_date,
+            "early_start": date.fromordinal(task.early_start),
+            "proposed_start": date.fromordinal(start),
+            "proposed_end": date.fromordinal(start + task.duration - 1),
+            "shift_days": start - task.early_start,
+        })
+    changes.sort(key=lambda change: (change["project_id"], change["proposed_start"], change["id"]))
+
+    return {
+        "capacity": capacity,
+        "changes": changes,
+        "resources": [
+            {
+                "assigned_to": resource,
+                "peak_before": round(before[resource][0], 2),
+                "peak_after": round(peak, 2),
+                "overloaded_days_before": before[resource][1],
+                "overloaded_days_after": days,
+                "overtime_hours_before": round(before[resource][2], 2),
+                "overtime_hours_after": round(overtime, 2),
+            }
+            for resource, (peak, days, overtime) in sorted(after.items())
+        ],
+        "overloads": [
+            {"assigned_to": resource, "date": date.fromordinal(day), "hours": round(hours, 2)}
+            for resource, day, hours in sorted(overloads)
+        ],
+        "skipped_projects": skipped,
+    }
+
+
+def simulate_risk(project, iterations=None, percentiles=(50, 80, 90), seed=None):
+    """
+    Monte Carlo schedule risk for a project: completion-date percentiles
+    and each task's criticality index (share of iterations it was on the
+    critical path).
+
+    Durations are drawn from each task's optimistic/likely/pessimistic
+    working days; ``duration_days`` is the likely one (or the working
+    days between its dates), and missing bounds default to the
+    ``SCHEDULE_RISK_*_FACTOR`` multiples of it. Start dates stay
+    no-earlier-than constraints, as in the deterministic pass. Three
+    queries: tasks, links and calendar. Raises CycleError on circular
+    dependencies.
+    """
+    iterations = iterations or settings.SCHEDULE_RISK_ITERATIONS
+    rows = list(ProjectTask.objects.filter(project=project).values_list(
+        "id", "task_name", "start_date", "end_date", "duration_days", "optimistic_days", "pessimistic_days"
+    ))
+    if not rows:
+        return {"iterations": iterations, "deterministic_finish": None, "on_time_probability": None,
+                "percentiles": {}, "tasks": []}
+
+    ids, names, starts, ends, likely, optimistic, pessimistic = zip(*rows)
+    index = {task_id: i for i, task_id in enumerate(ids)}
+    edges = [
+        (index[predecessor], index[successor])
+        for predecessor, successor in project_edges(project)
+        if predecessor in index and successor in index
+    ]
+
+    calendar = project_calendar(project)
+    origin = min(starts)
+    offsets = calendar.offsets(origin, starts)
+    likely = np.where(
+        [days is None for days in likely], calendar.durations(starts, ends), [float(days or 0) for days in likely]
+    )
+    optimistic = np.minimum(
+        [likely[i] * settings.SCHEDULE_RISK_OPTIMISTIC_FACTOR if days is None else float(days)
+         for i, days in enumerate(optimistic)],
+        likely,
+    )
+    pessimistic = np.maximum(
+        [likely[i] * settings.SCHEDULE_RISK_PESSIMISTIC_FACTOR if days is None else float(days)
+         for i, days in enumerate(pessimistic)],
+        likely,
+    )
+
+    try:
+        simulation = simulate_schedule(
+            offsets, optimistic, likely, pessimistic, edges, iterations, rng=np.random.default_rng(seed)
+        )
+    except CycleError as e:
+        raise CycleError([ids[i] for i in e.task_ids]) from None
+    # One iteration with every estimate at its likely value is the deterministic schedule
+    planned_finish = simulate_schedule(offsets, likely, likely, likely, edges, 1).finishes[0]
+
+    finishes = np.percentile(simulation.finishes, percentiles)
+    finish_dates = calendar.end_dates(origin, np.concatenate(([planned_finish], finishes)))
+    return {
+        "iterations": iterations,
+        "deterministic_finish": finish_dates[0],
+        "on_time_probability": float(np.mean(simulation.finishes <= planned_finish + 1e-9)),
+        "percentiles": {f"P{p:g}": day for p, day in zip(percentiles, finish_dates[1:])},
+        "tasks": sorted(
+            (
+                {"id": task_id, "task_name": name, "criticality": round(float(value), 4)}
+                for task_id, name, value in zip(ids, names, simulation.criticality)
+            ),
+            key=lambda task: -task["criticality"],
+        ),
+    }
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import ProgressSnapshot, ProjectTask
+
+SNAPSHOT_BATCH_SIZE = 1000
+
+# Days of history the dashboard trend line covers
+TREND_DAYS = 2 * 365
+
+
+def latest_snapshots(project_ids=None):
+    """Each task's most recent snapshot, as ``{task_id: (project_id, weight, progress)}``."""
+    snapshots = ProgressSnapshot.objects.all()
+    if project_ids is not None:
+        snapshots = snapshots.filter(project__in=project_ids)
+    newest = ProgressSnapshot.objects.filter(task_id=OuterRef("task_id")).order_by("-date").values("date")[:1]
+    rows = snapshots.filter(date=Subquery(newest)).values_list("task_id", "project_id", "weight", "progress")
+    return {task_id: values for task_id, *values in rows.iterator(chunk_size=SNAPSHOT_BATCH_SIZE)}
+
+
+def take_snapshots(day=None, project_ids=None):
+    """
+    Record ``day``'s (today's) weight and progress of every task (of
+    ``project_ids``) that differs from its latest snapshot, plus a
+    zero-weight row for each task deleted since. Rows already written for
+    ``day`` are overwritten, so running twice a day keeps the later
+    values. Returns the number of rows written.
+    """
+    day = day or timezone.localdate()
+    tasks = ProjectTask.objects.all()
+    if project_ids is not None:
+        tasks = tasks.filter(project__in=project_ids)
+    latest = latest_snapshots(project_ids)
+
+    rows = []
+    for task_id, project_id, weight, progress in tasks.values_list("id", "project_id", "weight", "progress").iterator(
+        chunk_size=SNAPSHOT_BATCH_SIZE
+    ):
+        previous = latest.pop(task_id, None)
+        if previous is None or previous[1:] != [weight, progress]:
+            rows.append(ProgressSnapshot(project_id=project_id, task_id=task_id, date=day, weight=weight, progress=progress))
+    # Tasks left over were deleted since their last snapshot
+    rows += [
+        ProgressSnapshot(project_id=project_id, task_id=task_id, date=day, weight=Decimal(0), progress=progress)
+        for task_id, (project_id, weight, progress) in latest.items()
+        if weight
+    ]
+
+    ProgressSnapshot.objects.bulk_create(
+        rows,
+        batch_size=SNAPSHOT_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["task", "date"],
+        update_fields=["weight", "progress"],
+    )
+    return len(rows)
+
+
+def progress_trend(project, end=None, days=TREND_DAYS):
+    """
+    A project's weighted progress (percent) at the end of each of the
+    ``days`` days up to ``end`` (today), rebuilt from its snapshots.
+
+    One range scan of the (project, date) index reads every row up to
+    ``end``; older rows give the starting state. Each row's change from
+    the task's previous row is added on its day with ``bincount``, and
+    running sums give the weight and earned weight of every day.
+    """
+    end = end or timezone.localdate()
+    start = end - timedelta(days=days - 1)
+    rows = list(
+        ProgressSnapshot.objects.filter(project=project, date__lte=end)
+        .order_by("date")
+        .values_list("task_id", "date", "weight", "progress")
+    )
+    payload = {
+        "project": {"id": project.pk, "name": project.project_name},
+        "dates": [start + timedelta(days=i) for i in range(days)],
+        "progress": [0.0] * days,
+    }
+    if not rows:
+        return payload
+
+    task_ids, dates, weights, progress = zip(*rows)
+    task_ids = np.asarray(task_ids)
+    weights = np.asarray(weights, dtype=float)
+    earned = weights * np.asarray(progress, dtype=float) / 100
+    day = np.maximum((np.asarray(dates, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(int), 0)
+
+    # Changes from each task's previous row (its first row counts in full)
+    order = np.lexsort((day, task_ids))
+    first = np.r_[True, task_ids[order][1:] != task_ids[order][:-1]]
+    weight_change = np.where(first, weights[order], np.diff(weights[order], prepend=0))
+    earned_change = np.where(first, earned[order], np.diff(earned[order], prepend=0))
+
+    total = np.cumsum(np.bincount(day[order], weights=weight_change, minlength=days))
+    done = np.cumsum(np.bincount(day[order], weights=earned_change, minlength=days))
+    percent = np.divide(done * 100, total, out=np.zeros(days), where=total > 1e-9)  # float sums of removed weight
+    payload["progress"] = np.round(percent, 2).tolist()
+    return payload
@@ -1,3 +1,1219 @@
-from django.test import TestCase
+import io
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from allauth.account.models import EmailAddress
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import Workbook
+
+from authentication.utils.tokens import make_dashboard_token
+from project_profiling.models import ProjectProfile
+from scheduling.imports import (
+    claim_next_import_job, ingest_progress_workbook, pdf_source, run_import_job, save_staged_tasks, stage_tasks,
+)
+from scheduling.approvals import approve_updates
+from scheduling.earned_value import cached_earned_value, earned_value_curves
+from scheduling.rollup import annotate_portfolio, rebuild_project_totals
+from scheduling.snapshots import TREND_DAYS, progress_trend, take_snapshots
+from scheduling.models import Holiday, ProgressFile, ProgressReport, ProgressSnapshot, ProgressUpdate, ProjectTask, ScheduleImportJob, WorkCalendar
+from scheduling.forms import ProjectTaskForm
+from scheduling.schedule import (
+    SCHEDULE_FIELDS, Dependency, load_schedule, propose_leveling, rank_project, recompute_durations,
+    recompute_schedule, repropagate,
+)
+from scheduling.utils.cpm import CycleError, compute_schedule
+from scheduling.utils.excel_reader import iter_tasks_streaming, read_tasks
+from scheduling.utils.import_cache import ImportCache
+from scheduling.utils.leveling import LevelingTask, level_resources
+from scheduling.utils.risk import simulate_schedule
+from scheduling.utils.workdays import WorkingCalendar
+
+from scheduling.utils.pdf_reader import MAX_LAYOUTS, _layouts, find_layout, iter_line_tasks, iter_row_tasks, new_project_info
+
+
+class PdfLineParsingTests(SimpleTestCase):
+    LINES = [
+        "POWERMASON CONSTRUCTION",
+        "PROJ ID P2408-1 SC 168DSC",
+        "PROJECT Electrical and Auxiliary Works",
+        "LOCATION Supreme Court, Ermita, Manila",
+        "SCOPE Electrical Works",
+        "Conduit pipes laying 2-Aug-24 2-Aug-24 1.0 40.0",
+        "Wiring installation 3-Aug-24 5-Aug-2024 2.0 120.0",
+        "RTC 181 Court Room",
+    ]
+
+    def test_headers_and_tasks(self):
+        info = new_project_info()
+        tasks = list(iter_line_tasks(self.LINES, info))
+
+        self.assertEqual(info["proj_id"], "P2408-1")
+        self.assertEqual(info["project"], "Electrical and Auxiliary Works")
+        self.assertEqual(info["location"], "Supreme Court, Ermita, Manila")
+        self.assertEqual(len(tasks), 2)
+        self.assertEqual(tasks[1], {
+            "task_name": "Wiring installation",
+            "start_date": "2024-08-03",
+            "end_date": "2024-08-05",
+            "duration_days": 2.0,
+            "manhours": 120.0,
+            "scope": "Electrical Works",
+        })
+
+    def test_headers_not_rematched_on_later_pages(self):
+        info = new_project_info()
+        list(iter_line_tasks(self.LINES, info))
+        list(iter_line_tasks(["PROJECT Something Else"], info))
+        self.assertEqual(info["project"], "Electrical and Auxiliary Works")
+
+
+class PdfColumnLayoutTests(SimpleTestCase):
+    # Word positions as pdfplumber reports them for the P2408-1 template
+    HEADER = [(56, 77, "ITEM"), (195, 233, "ACTIVITY"), (348, 374, "START"),
+              (406, 424, "END"), (454, 476, "DAYS"), (505, 520, "MH"), (538, 556, "WK")]
+    ROWS = [
+        [(60, 72, "1.0"), (96, 140, "Conduit"), (142, 170, "laying"), (345, 381, "2-Aug-24"),
+         (399, 435, "2-Aug-24"), (469, 482, "1.0"), (513, 518, "4"), (518, 530, "0.0")],
+        # Days digits split across the DAYS/MH gap, MH left blank
+        [(96, 140, "Purchase"), (339, 381, "12-Aug-24"), (399, 435, "2-Sep-24"),
+         (464, 469, "1"), (469, 482, "7.0")],
+    ]
+
+    def test_rows_are_sliced_by_header_columns(self):
+        info = new_project_info()
+        tasks = list(iter_row_tasks([[self.HEADER, self.ROWS[0]], [self.ROWS[1]]], info))
+
+        self.assertEqual([t["task_name"] for t in tasks], ["Conduit laying", "Purchase"])
+        self.assertEqual([t.get("source_row") for t in tasks], [1, None])  # ITEM "1.0"; none on the second row
+        self.assertEqual(tasks[0]["manhours"], 40.0)
+        self.assertEqual((tasks[1]["duration_days"], tasks[1]["manhours"]), (17.0, None))
+
+    def test_optional_predecessor_column(self):
+        header = self.HEADER[:-1] + [(538, 566, "Predecessors"), (590, 608, "WK")]
+        row = self.ROWS[0] + [(545, 552, "1,"), (554, 560, "3")]
+        tasks = list(iter_row_tasks([[header, row, self.ROWS[1]]], new_project_info()))
+
+        self.assertEqual([t["predecessors"] for t in tasks], ["1, 3", None])
+        self.assertEqual(tasks[0]["manhours"], 40.0)
+        self.assertNotIn("predecessors", list(iter_row_tasks([[self.HEADER, self.ROWS[0]]], new_project_info()))[0])
+
+    def test_layout_is_cached_by_fingerprint(self):
+        shifted = [(x0 + 0.4, x1 + 0.4, text) for x0, x1, text in self.HEADER]
+        self.assertIs(find_layout(self.HEADER), find_layout(shifted))
+        self.assertIsNone(find_layout(self.ROWS[0]))
+
+    def test_layout_cache_is_shared_safely_between_threads(self):
+        headers = [
+            [(x0 + 8 * i, x1 + 8 * i, text) for x0, x1, text in self.HEADER]
+            for i in range(MAX_LAYOUTS * 2)
+        ]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            layouts = list(pool.map(find_layout, headers * 20))
+
+        self.assertTrue(all(layouts))
+        self.assertLessEqual(len(_layouts), MAX_LAYOUTS)
+
+
+class ExcelReaderTests(SimpleTestCase):
+    def workbook(self):
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(["Item", "Task", "Start", "End", "Days", "MH", "Predecessors", "Notes"])
+        sheet.append([1, " Conduit laying ", datetime(2024, 8, 2), datetime(2024, 8, 3), 2, 40.5, None, "x"])
+        sheet.append([2, None, None, None, None, None, None, "blank row"])
+        sheet.append([3, "Wiring", "not a date", datetime(2024, 8, 5), "n/a", 8, 2, None])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    EXPECTED = [
+        {"task_name": "Conduit laying", "start_date": "2024-08-02", "end_date": "2024-08-03",
+         "duration_days": 2.0, "manhours": 40.5, "scope": None, "predecessors": None, "source_row": 2},
+        # Sheet row 3 is blank, so Wiring keeps its own row number
+        {"task_name": "Wiring", "start_date": None, "end_date": "2024-08-05",
+         "duration_days": None, "manhours": 8.0, "scope": None, "predecessors": "2", "source_row": 4},
+    ]
+
+    def test_vectorized_reader(self):
+        self.assertEqual(read_tasks(self.workbook()), self.EXPECTED)
+
+    def test_streaming_reader_matches(self):
+        self.assertEqual(list(iter_tasks_streaming(self.workbook())), self.EXPECTED)
+
+
+class PdfSourceTests(SimpleTestCase):
+    def test_in_memory_upload_is_read_from_its_buffer(self):
+        upload = SimpleUploadedFile("s.pdf", b"%PDF-1.4 data")
+        with pdf_source(upload) as (source, path):
+            self.assertIsNone(path)
+            self.assertEqual(source.read(), b"%PDF-1.4 data")
+
+    def test_spooled_upload_is_memory_mapped(self):
+        upload = TemporaryUploadedFile("s.pdf", "application/pdf", 0, None)
+        self.addCleanup(upload.close)
+        upload.write(b"%PDF-1.4 data")
+        upload.flush()
+        with pdf_source(upload) as (source, path):
+            self.assertEqual(path, upload.temporary_file_path())
+            self.assertEqual(source[:8], b"%PDF-1.4")
+        self.assertTrue(source.closed)
+
+
+class ImportCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_key_depends_on_content_and_parser_version(self):
+        a = SimpleUploadedFile("a.pdf", b"same bytes")
+        b = SimpleUploadedFile("b.pdf", b"same bytes")
+        self.assertEqual(ImportCache.key_for(a, "pdf-1"), ImportCache.key_for(b, "pdf-1"))
+        self.assertNotEqual(ImportCache.key_for(a, "pdf-1"), ImportCache.key_for(a, "pdf-2"))
+        self.assertEqual(a.read(), b"same bytes")  # upload rewound for the parser
+
+    def test_round_trip_survives_new_instance(self):
+        ImportCache(self.tmp.name, 10_000).set("k", {"tasks": [{"task_name": "A"}]})
+        self.assertEqual(ImportCache(self.tmp.name, 10_000).get("k"), {"tasks": [{"task_name": "A"}]})
+        self.assertIsNone(ImportCache(self.tmp.name, 10_000).get("missing"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ImportCache(self.tmp.name, 10_000)
+        payload = {"tasks": ["x" * 3000]}
+        cache.set("old", payload)
+        cache.set("used", payload)
+        past = time.time() - 60
+        os.utime(os.path.join(self.tmp.name, "old.json"), (past, past))
+        os.utime(os.path.join(self.tmp.name, "used.json"), (past - 60, past - 60))
+        cache.get("used")
+
+        cache.set("new", payload)
+        cache.set("newer", payload)
+
+        self.assertIsNone(cache.get("old"))
+        self.assertIsNotNone(cache.get("used"))
+
+
+class ImportJobTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=tmp.name,
+            SCHEDULE_IMPORT_CACHE_DIR=os.path.join(tmp.name, "cache"),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+
+    def test_worker_processes_oldest_job_first(self):
+        first = ScheduleImportJob.objects.create(
+            project=self.project, file=SimpleUploadedFile("notes.txt", b"x"), file_name="notes.txt"
+        )
+        ScheduleImportJob.objects.create(
+            project=self.project, file=SimpleUploadedFile("later.txt", b"y"), file_name="later.txt"
+        )
+
+        job = claim_next_import_job()
+        self.assertEqual(job.pk, first.pk)
+        self.assertEqual(job.status, "R")
+
+        run_import_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "F")
+        self.assertIn("Unsupported", job.error)
+
+    def test_empty_queue(self):
+        self.assertIsNone(claim_next_import_job())
+
+    def test_upload_is_deleted_when_the_job_finishes(self):
+        ScheduleImportJob.objects.create(
+            project=self.project, file=SimpleUploadedFile("notes.txt", b"x"), file_name="notes.txt"
+        )
+        job = claim_next_import_job()
+        path = job.file.path
+
+        run_import_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "F")
+        self.assertFalse(job.file)
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(SCHEDULE_IMPORT_JOB_TIMEOUT=60)
+    def test_stale_running_job_is_claimed_again(self):
+        stuck = ScheduleImportJob.objects.create(
+            project=self.project, file=SimpleUploadedFile("notes.txt", b"x"), file_name="notes.txt",
+            status="R", started_at=timezone.now() - timedelta(minutes=5),
+        )
+        ScheduleImportJob.objects.create(
+            project=self.project, file_name="busy.txt", status="R", started_at=timezone.now()
+        )
+        dead_worker = ScheduleImportJob.objects.get(pk=stuck.pk)
+
+        job = claim_next_import_job()
+        self.assertEqual(job.pk, stuck.pk)
+        self.assertGreater(job.started_at, dead_worker.started_at)
+        self.assertIsNone(claim_next_import_job())
+
+        # The first worker coming back late must not overwrite the new claim
+        run_import_job(dead_worker)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "R")
+        self.assertTrue(os.path.exists(job.file.path))
+
+
+class StagedImportTests(TestCase):
+    def setUp(self):
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        self.job = ScheduleImportJob.objects.create(project=self.project, file_name="s.xlsx", status="D")
+        stage_tasks(self.job, [
+            {"task_name": f"Task {i}", "start_date": "2024-08-01", "end_date": "2024-08-02",
+             "duration_days": 2.0, "manhours": 16.0, "scope": None}
+            for i in range(200)
+        ])
+        self.pm = User.objects.create(username="pm").userprofile
+
+    def save(self, **edits):
+        overrides = {i: {"weight": "0.5"} for i in range(200)}
+        for name, value in edits.items():
+            field, row = name.rsplit("_", 1)
+            overrides[int(row)][field] = value
+        return save_staged_tasks(
+            self.job, overrides, removed=["1"], global_scope="Electrical", global_assignee=str(self.pm.id)
+        )
+
+    def test_confirm_applies_overrides_in_a_few_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            saved = self.save(task_name_0="Renamed", end_date_0="2024-08-09", scope_2="Civil", assigned_to_3="")
+
+        self.assertEqual(saved, 199)
+        # Lock, staged rows, assignees, calendar, schedule inputs, project rollup,
+        # cleanup (+ savepoint); the number of INSERT batches depends on the backend
+        other = [q for q in queries.captured_queries if not q["sql"].startswith("INSERT")]
+        self.assertLessEqual(len(other), 10)
+        tasks = {t.task_name: t for t in ProjectTask.objects.filter(project=self.project)}
+        self.assertNotIn("Task 1", tasks)
+        self.assertEqual(str(tasks["Renamed"].end_date), "2024-08-09")
+        self.assertEqual(tasks["Task 2"].scope, "Civil")
+        self.assertEqual(tasks["Task 4"].scope, "Electrical")
+        self.assertEqual(tasks["Task 3"].assigned_to, self.pm)
+        self.assertEqual(tasks["Task 4"].weight, Decimal("0.5"))
+        self.assertEqual(tasks["Task 4"].early_start, date(2024, 8, 1))
+        self.assertFalse(self.job.staged_tasks.exists())
+
+    def test_second_confirm_saves_nothing(self):
+        self.save()
+        self.assertEqual(self.save(), 0)
+        self.assertEqual(ProjectTask.objects.filter(project=self.project).count(), 199)
+
+    def test_missing_dates_save_nothing(self):
+        self.job.staged_tasks.filter(row=5).update(start_date=None)
+        with self.assertRaises(ValueError):
+            self.save()
+        self.assertFalse(ProjectTask.objects.exists())
+        self.assertEqual(self.job.staged_tasks.count(), 200)
+
+    def test_durations_follow_project_calendar(self):
+        calendar = WorkCalendar.objects.create(project=self.project)  # Monday to Saturday
+        Holiday.objects.create(calendar=calendar, date=date(2024, 8, 2))
+        self.job.staged_tasks.filter(row=5).update(end_date=None, duration_days=3)
+
+        self.save(end_date_0="2024-08-09")
+
+        tasks = {t.task_name: t for t in ProjectTask.objects.filter(project=self.project)}
+        # Aug 1-9 without Friday the 2nd and Sunday the 4th
+        self.assertEqual(tasks["Task 0"].duration_days, 7)
+        # Three working days from Thursday Aug 1: the 1st, 3rd and 5th
+        self.assertEqual(tasks["Task 5"].end_date, date(2024, 8, 5))
+        self.assertEqual(tasks["Task 4"].duration_days, 1)
+
+    def test_predecessors_by_row_and_name(self):
+        self.job.staged_tasks.filter(row=3).update(predecessors="1; task 2")
+        self.job.staged_tasks.filter(row=4).update(predecessors="2")  # row 2 is removed
+
+        with CaptureQueriesContext(connection) as queries:
+            self.save(predecessors_5="Task 3")
+
+        self.assertLessEqual(len([q for q in queries.captured_queries if not q["sql"].startswith("INSERT")]), 10)
+        tasks = {t.task_name: t for t in ProjectTask.objects.filter(project=self.project)}
+        links = set(Dependency.objects.values_list("to_projecttask__task_name", "from_projecttask__task_name"))
+        self.assertEqual(links, {("Task 0", "Task 3"), ("Task 2", "Task 3"), ("Task 3", "Task 5")})
+        self.assertEqual((tasks["Task 3"].topo_rank, tasks["Task 5"].topo_rank), (1, 2))
+        self.assertEqual(tasks["Task 5"].early_start, date(2024, 8, 5))
+        self.assertEqual(tasks["Task 5"].total_float, 0)
+
+    def test_predecessors_refer_to_file_rows(self):
+        # The file skips sheet rows 3 and 6 (a blank and a section header), so
+        # from the third task on its row number is not its position
+        self.job.staged_tasks.all().delete()
+        stage_tasks(self.job, [
+            {"task_name": name, "start_date": "2024-08-01", "end_date": "2024-08-02",
+             "source_row": row, "predecessors": predecessors}
+            for name, row, predecessors in (
+                ("Excavation", 2, None), ("Forms", 4, None), ("Pour footing", 5, "2 4"), ("Columns", 7, "5"),
+                ("Backfill", 8, "pour footing"),  # a name with a space stays whole
+            )
+        ])
+        save_staged_tasks(self.job, {})
+
+        links = set(Dependency.objects.values_list("to_projecttask__task_name", "from_projecttask__task_name"))
+        self.assertEqual(links, {
+            ("Excavation", "Pour footing"), ("Forms", "Pour footing"), ("Pour footing", "Columns"),
+            ("Pour footing", "Backfill"),
+        })
+
+    def test_bad_predecessors_save_nothing(self):
+        for edits in ({"predecessors_3": "Missing task"}, {"predecessors_3": "5", "predecessors_4": "4"}):
+            with self.subTest(edits=edits), self.assertRaises(ValueError):
+                self.save(**edits)
+        self.assertFalse(ProjectTask.objects.exists())
+        self.assertEqual(self.job.staged_tasks.count(), 200)
+
+
+class WorkingCalendarTests(TestCase):
+    def test_counts_and_offsets_are_vectorized(self):
+        calendar = WorkingCalendar("1111100", holidays=[date(2024, 8, 7)])
+        starts = [date(2024, 8, 5), date(2024, 8, 9), date(2024, 8, 10)]
+
+        self.assertEqual(list(calendar.durations(starts, [date(2024, 8, 11)] * 3)), [4, 1, 0])
+        self.assertEqual(
+            list(calendar.end_dates(starts, [3, 2, Decimal("0.5")])),
+            [date(2024, 8, 8), date(2024, 8, 12), date(2024, 8, 12)],
+        )
+
+    def test_form_counts_working_days(self):
+        project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        WorkCalendar.objects.create(project=project, weekmask="1111100")
+        form = ProjectTaskForm(project=project, data={
+            "task_name": "Slab", "start_date": "2024-08-01", "end_date": "2024-08-14", "weight": "1",
+        })
+
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["duration_days"], 10)
+
+        task = form.save(commit=False)
+        task.project = project
+        task.save()
+        task.duration_days = 99
+        task.save()
+        self.assertEqual(recompute_durations(project), {task.id})
+        task.refresh_from_db()
+        self.assertEqual(task.duration_days, 10)
+
+
+class CriticalPathTests(SimpleTestCase):
+    #   A (2 days) -> B (3 days) -> D (1 day)
+    #   A          -> C (1 day)  -> D
+    TASKS = [
+        ("A", date(2024, 8, 1), date(2024, 8, 2)),
+        ("B", date(2024, 8, 1), date(2024, 8, 3)),
+        ("C", date(2024, 8, 1), date(2024, 8, 1)),
+        ("D", date(2024, 8, 1), date(2024, 8, 1)),
+    ]
+    EDGES = [("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")]
+
+    def test_forward_and_backward_pass(self):
+        schedule = compute_schedule(self.TASKS, self.EDGES)
+
+        self.assertEqual(schedule.critical_path, ["A", "B", "D"])
+        self.assertEqual(schedule.project_finish, date(2024, 8, 6))
+        c = schedule["C"]
+        self.assertEqual((c.early_start, c.early_finish), (date(2024, 8, 3), date(2024, 8, 3)))
+        self.assertEqual((c.late_start, c.late_finish), (date(2024, 8, 5), date(2024, 8, 5)))
+        self.assertEqual(c.total_float, 2)
+        self.assertFalse(c.critical)
+
+    def test_recorded_start_is_kept_as_constraint(self):
+        tasks = self.TASKS[:3] + [("D", date(2024, 8, 10), date(2024, 8, 10))]
+        schedule = compute_schedule(tasks, self.EDGES)
+        self.assertEqual(schedule["D"].early_start, date(2024, 8, 10))
+        self.assertEqual(schedule.critical_path, ["D"])
+
+    def test_cycle(self):
+        with self.assertRaises(CycleError) as raised:
+            compute_schedule(self.TASKS, self.EDGES + [("D", "A")])
+        self.assertEqual(sorted(raised.exception.task_ids), ["A", "B", "C", "D"])
+
+
+class LoadScheduleTests(TestCase):
+    def test_two_queries(self):
+        project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        a, b = ProjectTask.objects.bulk_create([
+            ProjectTask(project=project, task_name=name, start_date=date(2024, 8, 1),
+                        end_date=date(2024, 8, 2), weight=50)
+            for name in ("A", "B")
+        ])
+        b.dependencies.add(a)
+
+        with self.assertNumQueries(2):
+            schedule = load_schedule(project)
+        self.assertEqual(schedule[b.id].early_start, date(2024, 8, 3))
+        self.assertEqual(schedule.critical_path, [a.id, b.id])
+
+
+class RepropagateTests(TestCase):
+    def setUp(self):
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+
+    def create(self, *names, start=date(2024, 8, 1), days=1):
+        return ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name=name, start_date=start,
+                        end_date=start + timedelta(days=days - 1), weight=1)
+            for name in names
+        ])
+
+    def assert_matches_full_pass(self):
+        schedule = load_schedule(self.project)
+        for task in ProjectTask.objects.filter(project=self.project):
+            stored = tuple(getattr(task, field) for field in SCHEDULE_FIELDS)
+            self.assertEqual(stored, tuple(schedule[task.id])[:5], task.task_name)
+
+    def test_edit_touches_only_affected_tasks(self):
+        a, b, c = self.create("A", "B", "C")
+        (x,) = self.create("X", days=30)  # sets the project finish
+        b.dependencies.add(a)
+        c.dependencies.add(b)
+        recompute_schedule(self.project)
+
+        b.end_date = date(2024, 8, 4)
+        b.save()
+        updated = repropagate(b)
+
+        self.assertEqual(updated, {a.id, b.id, c.id})
+        self.assert_matches_full_pass()
+
+    def test_random_edits_match_full_pass(self):
+        rng = random.Random(7)
+        tasks = self.create(*(f"T{i}" for i in range(60)))
+        for i, task in enumerate(tasks[1:], start=1):
+            task.dependencies.add(*rng.sample(tasks[:i], min(i, 2)))
+        recompute_schedule(self.project)
+
+        for _ in range(15):
+            task = rng.choice(tasks)
+            task.start_date = date(2024, 8, 1) + timedelta(days=rng.randint(0, 10))
+            task.end_date = task.start_date + timedelta(days=rng.randint(0, 5))
+            task.save()
+            repropagate(task)
+            self.assert_matches_full_pass()
+
+
+class DependencyRankTests(TestCase):
+    def setUp(self):
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+
+    def create(self, *names):
+        return ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name=name, start_date=date(2024, 8, 1),
+                        end_date=date(2024, 8, 1), weight=1)
+            for name in names
+        ])
+
+    def ranks(self):
+        return dict(ProjectTask.objects.filter(project=self.project).values_list("task_name", "topo_rank"))
+
+    def test_links_raise_successor_ranks(self):
+        a, b, c = self.create("A", "B", "C")
+        c.dependencies.add(b)
+        b.dependencies.add(a)
+        self.assertEqual(self.ranks(), {"A": 0, "B": 1, "C": 2})
+
+        # Already ordered: one query, nothing raised
+        with self.assertNumQueries(1 + 3):  # + the add's existing-link lookup, insert and updated_at touch
+            c.dependencies.add(a)
+
+    def test_cycles_are_refused(self):
+        a, b, c = self.create("A", "B", "C")
+        b.dependencies.add(a)
+        c.dependencies.add(b)
+
+        # add() has no savepoint of its own, so each refusal gets one here
+        with self.assertRaises(CycleError), transaction.atomic():
+            a.dependencies.add(c)
+        with self.assertRaises(CycleError), transaction.atomic():
+            c.projecttask_set.add(a)  # reverse side: a depends on c
+        with self.assertRaises(CycleError), transaction.atomic():
+            a.dependencies.add(a)
+        self.assertEqual(Dependency.objects.count(), 2)
+
+    def test_form_reports_cycle(self):
+        a, b = self.create("A", "B")
+        b.dependencies.add(a)
+        form = ProjectTaskForm(instance=a, data={
+            "task_name": "A", "start_date": "2024-08-01", "end_date": "2024-08-01",
+            "weight": "1", "dependencies": [b.id],
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn("dependencies", form.errors)
+
+    def test_random_links_keep_a_topological_order(self):
+        rng = random.Random(3)
+        tasks = self.create(*(f"T{i}" for i in range(40)))
+        refused = 0
+        for _ in range(120):
+            x, y = rng.sample(tasks, 2)
+            try:
+                with transaction.atomic():
+                    y.dependencies.add(x)
+            except CycleError:
+                refused += 1
+
+        ranks = dict(ProjectTask.objects.filter(project=self.project).values_list("id", "topo_rank"))
+        for successor, predecessor in Dependency.objects.values_list("from_projecttask_id", "to_projecttask_id"):
+            self.assertLess(ranks[predecessor], ranks[successor])
+        self.assertGreater(refused, 0)
+        load_schedule(self.project)  # no cycle slipped through
+
+        rank_project(self.project)
+        for successor, predecessor in Dependency.objects.values_list(
+            "from_projecttask__topo_rank", "to_projecttask__topo_rank"
+        ):
+            self.assertLess(predecessor, successor)
+
+
+def sign_in(client, role="PM"):
+    """Log a verified user with ``role`` into ``client``; returns their dashboard token."""
+    user = User.objects.create(username=role.lower(), email=f"{role.lower()}@example.com")
+    EmailAddress.objects.create(user=user, email=user.email, verified=True, primary=True)
+    profile = user.userprofile
+    profile.role = role
+    profile.save()
+    client.force_login(user)
+    return make_dashboard_token(profile)
+
+
+class GanttDataTests(TestCase):
+    def setUp(self):
+        token = sign_in(self.client)
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        self.a, self.b = ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name=name, start_date=date(2024, 8, day),
+                        end_date=date(2024, 8, day + 1), weight=50)
+            for name, day in (("Excavation", 1), ("Footing", 3))
+        ])
+        self.b.dependencies.add(self.a)
+        self.url = f"/scheduling/{self.project.id}/{token}/PM/tasks/gantt/"
+
+    def test_columnar_payload(self):
+        response = self.client.get(self.url)
+
+        data = response.json()
+        self.assertEqual(data["origin"], "2024-08-01")
+        self.assertEqual(data["tasks"]["name"], ["Excavation", "Footing"])
+        self.assertEqual(data["tasks"]["start"], [0, 2])
+        self.assertEqual(data["tasks"]["days"], [2, 2])
+        self.assertEqual(data["links"], [[0, 1]])
+
+    def test_unchanged_schedule_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.b.dependencies.remove(self.a)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["links"], [])
+
+        etag = response["ETag"]
+        self.a.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class BulkEditTests(TestCase):
+    def setUp(self):
+        token = sign_in(self.client)
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        self.tasks = ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name=f"T{i}", start_date=date(2024, 8, 1),
+                        end_date=date(2024, 8, 1), weight=1)
+            for i in range(5)
+        ])
+        self.engineer = User.objects.create(username="engineer").userprofile
+        self.engineer.role = "PM"
+        self.engineer.save()
+        self.url = f"/scheduling/{self.project.id}/{token}/PM/tasks/bulk-edit/"
+
+    def post(self, task_ids, **fields):
+        return self.client.post(self.url, {"task_ids": task_ids, **fields}, HTTP_ACCEPT="application/json")
+
+    def test_applies_changes_to_selected_tasks(self):
+        selected = [task.id for task in self.tasks[:3]]
+        # The task list posts its selection as one comma-separated field
+        response = self.post(",".join(map(str, selected)), scope="Electrical", weight="12.5", assigned_to=self.engineer.id)
+
+        self.assertEqual(response.json(), {"updated": 3, "errors": []})
+        changed = ProjectTask.objects.filter(scope="Electrical", weight=Decimal("12.5"), assigned_to=self.engineer)
+        self.assertEqual(sorted(changed.values_list("id", flat=True)), selected)
+        self.assertTrue(all(task.updated_at > self.tasks[0].updated_at for task in changed))
+
+    def test_any_bad_row_saves_nothing(self):
+        other = ProjectProfile.objects.create(
+            project_source="GC", project_name="Other", project_type="COM", location="Cebu"
+        )
+        (foreign,) = ProjectTask.objects.bulk_create([
+            ProjectTask(project=other, task_name="X", start_date=date(2024, 8, 1), end_date=date(2024, 8, 1), weight=1)
+        ])
+        response = self.post([self.tasks[0].id, foreign.id, "abc"], scope="Civil")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([row["task_id"] for row in response.json()["errors"]], ["abc", foreign.id])
+        self.assertFalse(ProjectTask.objects.filter(scope="Civil").exists())
+
+    def test_form_errors_and_html_redirect(self):
+        self.assertEqual(self.post([self.tasks[0].id], weight="150").status_code, 400)
+        self.assertIn("Nothing to change", str(self.post([self.tasks[0].id]).json()))
+
+        response = self.client.post(self.url, {"task_ids": [self.tasks[0].id], "unassign": "on"})
+        self.assertEqual(response.status_code, 302)
+
+    def test_clear_scope(self):
+        selected = [task.id for task in self.tasks[:2]]
+        self.post(selected, scope="Electrical")
+        self.assertEqual(self.post(selected, scope="").status_code, 400)  # blank leaves it alone
+        self.assertEqual(self.post(selected, scope="Civil", clear_scope="on").status_code, 400)
+
+        self.assertEqual(self.post(selected, clear_scope="on").json(), {"updated": 2, "errors": []})
+        self.assertFalse(ProjectTask.objects.filter(id__in=selected).exclude(scope=None).exists())
+
+
+class EarnedValueTests(TestCase):
+    def setUp(self):
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        # Monday to Wednesday, then Thursday to Saturday (a six-day week)
+        self.a, self.b = ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name="Excavation", start_date=date(2024, 8, 5),
+                        end_date=date(2024, 8, 7), weight=60),
+            ProjectTask(project=self.project, task_name="Footing", start_date=date(2024, 8, 8),
+                        end_date=date(2024, 8, 10), weight=40),
+        ])
+        approvals = [(self.a, 50, 6), (self.a, 70, 7), (self.b, 50, 11)]  # the second caps Excavation at 100%
+        ProgressUpdate.objects.bulk_create(
+            ProgressUpdate(task=task, progress_percent=percent, status="A",
+                           reviewed_at=timezone.make_aware(datetime(2024, 8, day, 10)))
+            for task, percent, day in approvals
+        )
+
+    def test_curves(self):
+        data = earned_value_curves(self.project, today=date(2024, 8, 8))
+
+        self.assertEqual(data["dates"][-2:], [date(2024, 8, 10), date(2024, 8, 12)])  # Sunday skipped
+        self.assertEqual(data["pv"], [20, 40, 60, 73.3333, 86.6667, 100, 100])
+        # Footing's Sunday approval counts from Monday, after "as of"
+        self.assertEqual(data["ev"], [0, 30, 60, 60])
+        self.assertEqual(data["spi"], [0, 0.75, 1, 0.8182])
+        self.assertEqual(data["current"], {"pv": 73.3333, "ev": 60, "spi": 0.8182, "sv": -13.3333})
+
+    def test_cached_until_tasks_change(self):
+        today = date(2024, 8, 12)
+        first = cached_earned_value(self.project, today)
+        with self.assertNumQueries(2):  # calendar and task state
+            self.assertEqual(cached_earned_value(self.project, today), first)
+
+        self.b.end_date = date(2024, 8, 12)
+        self.b.save()
+        self.assertNotEqual(cached_earned_value(self.project, today)["pv"], first["pv"])
+
+    def test_dashboard_endpoint(self):
+        sign_in(self.client)
+        response = self.client.get(f"/projects/{self.project.id}/dashboard/earned-value/")
+        self.assertEqual(response.json()["ev"][:3], [0, 30, 60])
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.token = sign_in(self.client)
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        self.a, self.b = ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name=name, start_date=date(2024, 8, 5),
+                        end_date=date(2024, 8, 7), weight=weight, progress=progress)
+            for name, weight, progress in (("Excavation", 60, 50), ("Footing", 40, 0))
+        ])
+        rebuild_project_totals([self.project.id])
+        self.url = f"/scheduling/{self.project.id}/{self.token}/PM/tasks/"
+
+    def rollup(self):
+        self.project.refresh_from_db()
+        return (self.project.progress, self.project.total_weight, self.project.task_count,
+                self.project.completed_task_count)
+
+    def test_rebuild(self):
+        self.assertEqual(self.rollup(), (Decimal("30"), Decimal("100"), 2, 0))
+        self.assertEqual(rebuild_project_totals([self.project.id]), 0)  # already current
+
+        ProjectTask.objects.filter(pk=self.a.pk).update(progress=100)
+        out = io.StringIO()
+        call_command("rebuild_project_rollups", str(self.project.id), stdout=out)
+        self.assertEqual(out.getvalue().strip(), "1 project(s) updated")
+        self.assertEqual(self.rollup(), (Decimal("60"), Decimal("100"), 2, 1))
+
+    def test_approval_adjusts_in_place(self):
+        update = ProgressUpdate.objects.create(task=self.a, progress_percent=80)
+        sign_in(self.client, role="OM")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(f"/scheduling/progress/approve/{update.id}/")
+
+        # Capped at 100%: Excavation earns its last 50%
+        self.assertEqual(self.rollup(), (Decimal("60"), Decimal("100"), 2, 1))
+        self.assertFalse(any("SUM" in q["sql"].upper() for q in queries.captured_queries))
+
+    def test_task_views_keep_rollup_current(self):
+        self.client.post(self.url + f"{self.b.id}/update/", {
+            "task_name": "Footing", "start_date": "2024-08-05", "end_date": "2024-08-07",
+            "weight": "20", "manhours": "0", "scope": "",
+        })
+        self.assertEqual(self.rollup(), (Decimal("37.5"), Decimal("80"), 2, 0))
+
+        self.client.post(self.url + f"{self.a.id}/delete/")
+        self.assertEqual(self.rollup(), (Decimal("0"), Decimal("20"), 1, 0))
+
+        self.client.post(self.url + "bulk-delete/", {"task_ids": [self.b.id]})
+        self.assertEqual(self.rollup(), (Decimal("0"), Decimal("0"), 0, 0))
+
+    def test_task_edit_keeps_progress_approved_meanwhile(self):
+        update = ProgressUpdate.objects.create(task=self.b, progress_percent=30)
+        is_valid = ProjectTaskForm.is_valid
+
+        def approve_then_validate(form):
+            approve_updates([update.id], None)  # commits after the view read the task
+            return is_valid(form)
+
+        with mock.patch.object(ProjectTaskForm, "is_valid", approve_then_validate):
+            self.client.post(self.url + f"{self.b.id}/update/", {
+                "task_name": "Footing", "start_date": "2024-08-05", "end_date": "2024-08-07",
+                "weight": "40", "manhours": "0", "scope": "",
+            })
+
+        self.b.refresh_from_db()
+        self.assertEqual(self.b.progress, 30)
+        self.assertEqual(self.rollup(), (Decimal("42"), Decimal("100"), 2, 0))
+
+
+class SubmitProgressTests(TestCase):
+    def setUp(self):
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        self.task = ProjectTask.objects.create(
+            project=self.project, task_name="Excavation", start_date=date(2024, 8, 5), end_date=date(2024, 8, 7), weight=50
+        )
+
+    def submit(self, role):
+        token = sign_in(self.client, role=role)
+        return self.client.post(f"/scheduling/{token}/task/{self.task.id}/submit-progress/{role}/", {"progress_percent": "10"})
+
+    def test_project_managers_can_submit(self):
+        response = self.submit("PM")
+        self.assertRedirects(response, f"/projects/{self.project.id}/dashboard/", fetch_redirect_response=False)
+        self.assertEqual(ProgressUpdate.objects.count(), 1)
+
+    def test_other_roles_are_turned_away(self):
+        response = self.submit("VO")
+        self.assertRedirects(response, "/unauthorized/", fetch_redirect_response=False)
+        self.assertFalse(ProgressUpdate.objects.exists())
+
+
+class ApprovalTests(TestCase):
+    def setUp(self):
+        sign_in(self.client, role="OM")
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        self.a, self.b = ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name=name, start_date=date(2024, 8, 5),
+                        end_date=date(2024, 8, 7), weight=50)
+            for name in ("Excavation", "Footing")
+        ])
+        rebuild_project_totals([self.project.id])
+
+    def submit(self, *updates):
+        return [ProgressUpdate.objects.create(task=task, progress_percent=percent).id for task, percent in updates]
+
+    def batch(self, update_ids, action="approve"):
+        return self.client.post(
+            "/scheduling/progress/review/batch/",
+            {"update_ids": ",".join(map(str, update_ids)), "action": action},
+            HTTP_ACCEPT="application/json",
+        )
+
+    def test_batch_approve_sums_increments_per_task(self):
+        ids = self.submit((self.a, 60), (self.a, 70), (self.b, 20))
+        touched = ProjectTask.objects.get(pk=self.b.pk).updated_at
+
+        response = self.batch(ids + [ids[0], 999])
+        self.assertEqual(response.json(), {"action": "approve", "reviewed": 3, "skipped": 1})
+
+        self.a.refresh_from_db()
+        self.b.refresh_from_db()
+        self.assertEqual((self.a.progress, self.b.progress), (100, 20))  # capped
+        self.assertGreater(self.b.updated_at, touched)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.progress, self.project.completed_task_count), (60, 1))
+        self.assertFalse(ProgressUpdate.objects.exclude(status="A").exists())
+
+        # Approving again changes nothing
+        self.assertEqual(self.batch(ids).json()["reviewed"], 0)
+        self.b.refresh_from_db()
+        self.assertEqual(self.b.progress, 20)
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        ids = self.submit((self.a, 1), (self.b, 1))
+        with CaptureQueriesContext(connection) as small:
+            self.batch(ids)
+        ids = self.submit(*[(task, 1) for task in (self.a, self.b) for _ in range(100)])
+        with CaptureQueriesContext(connection) as large:
+            self.batch(ids)
+        self.assertEqual(len(large), len(small))
+        self.a.refresh_from_db()
+        self.assertEqual(self.a.progress, 100)  # 1 + 100 x 1, capped
+
+    def test_non_reviewers_are_refused(self):
+        ids = self.submit((self.a, 10), (self.b, 20))
+        sign_in(self.client, role="PM")
+
+        self.assertRedirects(self.batch(ids), "/unauthorized/", fetch_redirect_response=False)
+        self.client.post(f"/scheduling/progress/approve/{ids[0]}/")
+        self.assertFalse(ProgressUpdate.objects.exclude(status="P").exists())
+        self.assertEqual(ProjectTask.objects.get(pk=self.a.pk).progress, 0)
+
+    def test_reject_and_single_review(self):
+        first, second, third = self.submit((self.a, 10), (self.a, 20), (self.b, 30))
+        self.assertEqual(self.batch([first, second], "reject").json()["reviewed"], 2)
+
+        self.client.get(f"/scheduling/progress/approve/{third}/")  # only POST reviews
+        self.assertEqual(ProgressUpdate.objects.get(pk=third).status, "P")
+        self.client.post(f"/scheduling/progress/approve/{third}/")
+        self.client.post(f"/scheduling/progress/reject/{third}/")  # already approved
+
+        self.assertEqual(list(ProgressUpdate.objects.order_by("id").values_list("status", flat=True)), ["R", "R", "A"])
+        self.assertEqual(ProjectTask.objects.get(pk=self.a.pk).progress, 0)
+        self.assertEqual(self.batch([first], "finish").status_code, 400)
+
+
+class ReviewQueueTests(TestCase):
+    def setUp(self):
+        sign_in(self.client, role="OM")
+        self.reporter = User.objects.create(username="reporter").userprofile
+        self.tower, self.bridge = ProjectProfile.objects.bulk_create([
+            ProjectProfile(project_source="GC", project_name=name, project_type="COM", location="Manila")
+            for name in ("Tower", "Bridge")
+        ])
+        tasks = ProjectTask.objects.bulk_create([
+            ProjectTask(project=project, task_name=f"{project.project_name} task", start_date=date(2024, 8, 1),
+                        end_date=date(2024, 8, 9), weight=50)
+            for project in (self.tower, self.bridge)
+        ])
+        updates = ProgressUpdate.objects.bulk_create([
+            ProgressUpdate(task=tasks[i % 2], progress_percent=1, reported_by=self.reporter if i < 10 else None)
+            for i in range(120)
+        ])
+        ProgressFile.objects.bulk_create([ProgressFile(update=update, file=f"progress_proofs/{update.id}.jpg")
+                                          for update in updates])
+        # Equal timestamps, so pages must break ties on id
+        ProgressUpdate.objects.update(created_at=timezone.now() - timedelta(days=1))
+        ProgressUpdate.objects.filter(id__in=[u.id for u in updates[:30]]).update(
+            created_at=timezone.now() - timedelta(days=5)
+        )
+        self.ids = [u.id for u in updates[:30]] + [u.id for u in updates[30:]]
+
+    def page(self, **params):
+        response = self.client.get("/scheduling/progress/review/", params)
+        return [update.id for update in response.context["updates"]], response.context["next_cursor"]
+
+    def test_keyset_pages_cover_the_queue_once(self):
+        seen, cursor, queries = [], None, []
+        while True:
+            with CaptureQueriesContext(connection) as captured:
+                ids, cursor = self.page(**({"after": cursor} if cursor else {}))
+            seen += ids
+            queries.append(len(captured))
+            if not cursor:
+                break
+        self.assertEqual(seen, self.ids)
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(len(set(queries)), 1)  # 50, 50 and 20 rows alike
+
+    def test_filters(self):
+        self.assertEqual(self.page(project=self.bridge.id)[0], self.ids[1::2][:50])
+        self.assertEqual(self.page(reporter=self.reporter.id)[0], self.ids[:10])
+        self.assertEqual(self.page(min_age=3)[0], self.ids[:30])
+        self.assertEqual(self.page(after="garbage")[0], self.ids[:50])
+
+    def test_page_shows_related_rows(self):
+        response = self.client.get("/scheduling/progress/review/", {"reporter": self.reporter.id})
+        self.assertContains(response, "Tower task")
+        self.assertContains(response, f"progress_proofs/{self.ids[0]}.jpg")
+
+
+class PortfolioTests(TestCase):
+    def setUp(self):
+        self.project, self.empty = ProjectProfile.objects.bulk_create([
+            ProjectProfile(project_source="GC", project_name=name, project_type="COM", location="Manila")
+            for name in ("Tower", "Empty")
+        ])
+        ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name=name, start_date=date(2024, 8, 1),
+                        end_date=end, weight=weight, progress=progress)
+            for name, end, weight, progress in (
+                ("Excavation", date(2024, 8, 5), 30, 100),
+                ("Footing", date(2024, 8, 9), 30, 50),  # overdue
+                ("Columns", date(2024, 8, 20), 40, 0),
+                ("Roofing", date(2024, 8, 15), 0, 0),
+            )
+        ])
+
+    def test_annotations_in_one_query(self):
+        with self.assertNumQueries(1):
+            projects = {p.project_name: p for p in annotate_portfolio(ProjectProfile.objects.all(), date(2024, 8, 12))}
+
+        tower, empty = projects["Tower"], projects["Empty"]
+        self.assertAlmostEqual(tower.weighted_progress, 45)
+        self.assertEqual(tower.overdue_tasks, 1)
+        self.assertEqual((tower.next_milestone_name, tower.next_milestone_date), ("Roofing", date(2024, 8, 15)))
+        self.assertEqual((empty.weighted_progress, empty.overdue_tasks, empty.next_milestone_date), (0, 0, None))
+
+    def test_project_list(self):
+        token = sign_in(self.client, role="EG")
+        response = self.client.get(f"/projects/{token}/list/EG/")
+        self.assertContains(response, "45.0%")
+        self.assertEqual(response.context["projects"][0].overdue_tasks, 3)  # all due in 2024
+
+
+class ProgressSnapshotTests(TestCase):
+    def setUp(self):
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        self.a, self.b = ProjectTask.objects.bulk_create([
+            ProjectTask(project=self.project, task_name=name, start_date=date(2024, 8, 1),
+                        end_date=date(2024, 8, 9), weight=weight)
+            for name, weight in (("Excavation", 60), ("Footing", 40))
+        ])
+
+    def test_writes_only_changes(self):
+        self.assertEqual(take_snapshots(date(2024, 8, 1)), 2)
+        self.assertEqual(take_snapshots(date(2024, 8, 2)), 0)
+
+        ProjectTask.objects.filter(pk=self.a.pk).update(progress=50)
+        self.assertEqual(take_snapshots(date(2024, 8, 3)), 1)
+        ProjectTask.objects.filter(pk=self.a.pk).update(progress=80)
+        self.assertEqual(take_snapshots(date(2024, 8, 3)), 1)  # same day: overwritten
+
+        footing = self.b.id
+        self.b.delete()
+        out = io.StringIO()
+        call_command("snapshot_progress", "--date", "2024-08-05", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "1 snapshot(s) written")
+        self.assertEqual(
+            list(ProgressSnapshot.objects.order_by("date", "task_id").values_list("task_id", "date", "weight", "progress")),
+            [(self.a.id, date(2024, 8, 1), 60, 0), (footing, date(2024, 8, 1), 40, 0),
+             (self.a.id, date(2024, 8, 3), 60, 80), (footing, date(2024, 8, 5), 0, 0)],
+        )
+        self.assertEqual(take_snapshots(date(2024, 8, 6)), 0)
+
+    def test_trend(self):
+        take_snapshots(date(2024, 7, 1))  # before the window: the starting state
+        ProjectTask.objects.filter(pk=self.a.pk).update(progress=50)
+        take_snapshots(date(2024, 8, 2))
+        self.b.delete()
+        take_snapshots(date(2024, 8, 4))
+
+        with self.assertNumQueries(1):
+            data = progress_trend(self.project, end=date(2024, 8, 5), days=5)
+        self.assertEqual(data["dates"][0], date(2024, 8, 1))
+        self.assertEqual(data["progress"], [0, 30, 30, 50, 50])
+
+    def test_dashboard_endpoint(self):
+        take_snapshots()
+        sign_in(self.client)
+        response = self.client.get(f"/projects/{self.project.id}/dashboard/progress-trend/")
+        self.assertEqual(len(response.json()["progress"]), TREND_DAYS)
+
+
+class ScheduleRiskTests(TestCase):
+    def test_fixed_estimates_match_the_critical_path(self):
+        # 0 (3 days) and 1 (1 day) both precede 2 (2 days)
+        result = simulate_schedule([0, 0, 0], [3, 1, 2], [3, 1, 2], [3, 1, 2], [(0, 2), (1, 2)], 50)
+
+        self.assertEqual(set(result.finishes), {5.0})
+        self.assertEqual(list(result.criticality), [1.0, 0.0, 1.0])
+
+    def test_parallel_paths_share_criticality(self):
+        result = simulate_schedule(
+            [0, 0, 0], [2, 2, 1], [3, 3, 1], [6, 6, 1], [(0, 2), (1, 2)], 5000,
+            rng=np.random.default_rng(7), chunk_size=700,
+        )
+
+        self.assertTrue(((result.finishes >= 3) & (result.finishes <= 7)).all())
+        self.assertAlmostEqual(result.criticality[0] + result.criticality[1], 1.0)
+        self.assertAlmostEqual(result.criticality[0], 0.5, delta=0.05)
+        self.assertEqual(result.criticality[2], 1.0)
+
+    def test_project_percentiles(self):
+        token = sign_in(self.client)
+        project = ProjectProfile.objects.create(
+            project_source="GC", project_name="Test", project_type="COM", location="Manila"
+        )
+        # Monday Aug 5 to Wednesday Aug 7, then Thursday Aug 8 to Saturday Aug 10
+        a, b = ProjectTask.objects.bulk_create([
+            ProjectTask(project=project, task_name="Excavation", start_date=date(2024, 8, 5),
+                        end_date=date(2024, 8, 7), duration_days=3, pessimistic_days=6, weight=50),
+            ProjectTask(project=project, task_name="Footing", start_date=date(2024, 8, 8),
+                        end_date=date(2024, 8, 10), duration_days=3, weight=50),
+        ])
+        b.dependencies.add(a)
+        url = f"/scheduling/{project.id}/{token}/PM/tasks/risk/"
+
+        data = self.client.get(url, {"iterations": 2000, "seed": 1}).json()
+
+        self.assertEqual(data["deterministic_finish"], "2024-08-10")
+        self.assertLessEqual(data["percentiles"]["P50"], data["percentiles"]["P80"])
+        self.assertGreater(data["percentiles"]["P80"], "2024-08-10")
+        # Footing is always last; Excavation only drives it when it takes at least its likely 3 days
+        # (Footing can't start before Aug 8): P(triangular(2.4, 3, 6) >= 3) = 5/6
+        footing, excavation = data["tasks"]
+        self.assertEqual((footing["task_name"], footing["criticality"]), ("Footing", 1.0))
+        self.assertAlmostEqual(excavation["criticality"], 5 / 6, delta=0.03)
+        self.assertEqual(data, self.client.get(url, {"iterations": 2000, "seed": 1}).json())
+        self.assertEqual(self.client.get(url, {"iterations": 0}).status_code, 400)
+
+
+class ResourceLevelingTests(TestCase):
+    def test_shift_within_float_pushes_successors(self):
+        tasks = [
+            LevelingTask("fixed", "r", early_start=0, late_start=0, duration=2, daily_hours=8),
+            LevelingTask("a", "r", early_start=0, late_start=3, duration=1, daily_hours=8),
+            LevelingTask("b", None, early_start=1, late_start=4, duration=1, daily_hours=0),
+        ]
+        starts, overloads = level_resources(tasks, {"b": ["a"]}, capacity=8)
+
+        self.assertEqual(starts, {"fixed": 0, "a": 2, "b": 3})
+        self.assertEqual(overloads, [])
+
+    def test_no_room_is_reported(self):
+        tasks = [
+            LevelingTask("fixed", "r", early_start=0, late_start=0, duration=3, daily_hours=6),
+            LevelingTask("a", "r", early_start=0, late_start=1, duration=1, daily_hours=4),
+        ]
+        starts, overloads = level_resources(tasks, {}, capacity=8)
+
+        self.assertEqual(starts["a"], 0)
+        self.assertEqual(overloads, [("r", 0, 10.0)])
+
+    def test_levels_across_projects(self):
+        person = User.objects.create(username="engineer").userprofile
+        projects = {}
+        for name in ("One", "Two"):
+            project = ProjectProfile.objects.create(
+                project_source="GC", project_name=name, project_type="COM", location="Manila"
+            )
+            # An unassigned five-day task sets each project's finish
+            ProjectTask.objects.create(project=project, task_name="Span", start_date=date(2024, 8, 1),
+                                       end_date=date(2024, 8, 5), weight=1)
+            projects[name] = project
+        wiring = ProjectTask.objects.create(
+            project=projects["One"], task_name="Wiring", assigned_to=person, start_date=date(2024, 8, 1),
+            end_date=date(2024, 8, 3), manhours=24, weight=1,
+        )
+        flexible = ProjectTask.objects.create(
+            project=projects["Two"], task_name="Panels", assigned_to=person, start_date=date(2024, 8, 1),
+            end_date=date(2024, 8, 2), manhours=8, weight=1,
+        )
+
+        with self.assertNumQueries(2):
+            proposal = propose_leveling(capacity=10)
+
+        self.assertEqual([change["id"] for change in proposal["changes"]], [flexible.id])
+        self.assertEqual(proposal["changes"][0]["proposed_start"], date(2024, 8, 4))
+        self.assertEqual(proposal["resources"], [{
+            "assigned_to": person.id, "peak_before": 12.0, "peak_after": 8.0,
+            "overloaded_days_before": 2, "overloaded_days_after": 0,
+            "overtime_hours_before": 4.0, "overtime_hours_after": 0.0,
+        }])
+
+
+class ProgressWorkbookIngestTests(TestCase):
+    def setUp(self):
+        self.project = ProjectProfile.objects.create(
+            project_source="GC", project_code="P2408-1", project_name="Test", project_type="COM", location="Manila"
+        )
+
+    def daily_report(self, day, percent, *more):
+        """A workbook with one DAR sheet per ``(day, percent)``."""
+        workbook = Workbook()
+        workbook.remove(workbook.active)
+        days = [(day, percent), *zip(more[::2], more[1::2])]
+        for i, (day, percent) in enumerate(days, start=1):
+            sheet = workbook.create_sheet(f"DAR{i:02}")
+            sheet.append(["DAILY ACCOMPLISHMENT REPORT"])
+            sheet.append(["DATE:", None, datetime(2024, 8, day)])
+            sheet.append(["PROJ ID:", None, "P2408-1 SC 168DSC"])
+            sheet.append(["ACCOMPLISHED TODAY (MH)", None, 1500])
+            sheet.append(["ACCOMPLISHED TODAY %", None, percent])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def test_reingest_upserts_and_keeps_running_total(self):
+        ingest_progress_workbook(self.daily_report(15, 0.05))
+        ingest_progress_workbook(self.daily_report(16, 0.02))
+        ingest_progress_workbook(self.daily_report(16, 0.03))
+
+        reports = list(ProgressReport.objects.filter(project=self.project).order_by("report_date"))
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(reports[1].accomplished_this_period, Decimal("3"))
+        self.assertEqual(reports[1].accomplished_before, Decimal("5"))
+        self.assertEqual(reports[1].accomplished_to_date, Decimal("8"))
+
+    def test_repeated_date_keeps_the_last_sheet(self):
+        self.assertEqual(ingest_progress_workbook(self.daily_report(15, 0.05, 16, 0.02, 16, 0.03)), 2)
+
+        reports = ProgressReport.objects.filter(project=self.project).order_by("report_date")
+        self.assertEqual([r.accomplished_this_period for r in reports], [Decimal("5"), Decimal("3")])
+
+    def test_rewriting_an_earlier_day_updates_later_totals(self):
+        ingest_progress_workbook(self.daily_report(15, 0.05, 16, 0.02, 17, 0.01))
+        ingest_progress_workbook(self.daily_report(15, 0.04))
+
+        totals = ProgressReport.objects.filter(project=self.project).order_by("report_date").values_list(
+            "accomplished_before", "accomplished_to_date"
+        )
+        self.assertEqual(list(totals), [(0, 4), (4, 6), (6, 7)])
+
+    def test_unknown_project_code(self):
+        ProjectProfile.objects.filter(pk=self.project.pk).update(project_code="P9999")
+        with self.assertRaises(ValueError):
+            ingest_progress_workbook(self.daily_report(15, 0.05))
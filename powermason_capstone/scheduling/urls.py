@@ -4,16 +4,24 @@ from . import views
 urlpatterns = [
     path('<int:project_id>/<str:token>/<str:role>/tasks/', views.task_list, name='task_list'),
     path("<int:project_id>/<str:token>/<str:role>/tasks/add/", views.task_create, name="task_create"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/schedule/", views.task_schedule, name="task_schedule"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/gantt/", views.task_gantt, name="task_gantt"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/risk/", views.task_risk, name="task_risk"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/import/<int:job_id>/", views.import_job_result, name="import_job_result"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/import/<int:job_id>/status/", views.import_job_status, name="import_job_status"),
     path("<int:project_id>/<str:token>/<str:role>/tasks/save-imported/", views.save_imported_tasks, name="save_imported_tasks"),
     path("<int:project_id>/<str:token>/<str:role>/tasks/<int:task_id>/update/",views.task_update, name="task_update"),
     path("<int:project_id>/<str:token>/<str:role>/tasks/<int:task_id>/delete/",views.task_delete, name="task_delete"),
+    path("<int:project_id>/<str:token>/<str:role>/tasks/bulk-edit/", views.task_bulk_edit, name="task_bulk_edit"),
     path("<int:project_id>/<str:token>/<str:role>/tasks/bulk-delete/",views.task_bulk_delete,
     name="task_bulk_delete"),
   
+    path("<str:token>/<str:role>/resources/leveling/", views.resource_leveling, name="resource_leveling"),
     path("<str:token>/task/<int:task_id>/submit-progress/<str:role>/", views.submit_progress_update, name="submit_progress"),
 
     # OM/Engineer - Review pending updates
     path('progress/review/', views.review_updates, name='review_updates'),
+    path('progress/review/batch/', views.review_updates_batch, name='review_updates_batch'),
     path('progress/approve/<int:update_id>/', views.approve_update, name='approve_update'),
     path('progress/reject/<int:update_id>/', views.reject_update, name='reject_update'),
 ]
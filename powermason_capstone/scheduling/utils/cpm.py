@@ -0,0 +1,162 @@
+from collections import namedtuple
+from datetime import date
+
+
+class CycleError(ValueError):
+    """The dependency graph has a cycle, so there is no schedule order."""
+
+    def __init__(self, task_ids):
+        self.task_ids = task_ids
+        super().__init__(f"Circular dependencies between tasks {sorted(task_ids)}")
+
+
+TaskTiming = namedtuple(
+    "TaskTiming", "early_start early_finish late_start late_finish total_float critical"
+)
+
+
+def topological_order(count, successors):
+    """
+    Kahn's algorithm over nodes ``0..count-1``; ``successors[i]`` lists the
+    nodes that must come after ``i``. Raises CycleError (with node indexes)
+    when some nodes can't be ordered.
+    """
+    indegree = [0] * count
+    for nodes in successors:
+        for j in nodes:
+            indegree[j] += 1
+
+    order = [i for i in range(count) if indegree[i] == 0]
+    for i in order:  # grows while iterating
+        for j in successors[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                order.append(j)
+
+    if len(order) < count:
+        raise CycleError([i for i in range(count) if indegree[i] > 0])
+    return order
+
+
+class Schedule:
+    """
+    Result of a critical-path pass. Times are kept as day ordinals in
+    parallel lists; finishes are exclusive (a one-day task has
+    ``early_finish == early_start + 1``). Look up a task's dates with
+    ``schedule[task_id]`` or ``schedule.get(task_id)``.
+    """
+
+    def __init__(self, ids, order, successors, duration, es, ef, ls, lf):
+        self.ids = ids
+        self.index = {task_id: i for i, task_id in enumerate(ids)}
+        self.order = order
+        self.successors = successors
+        self.duration = duration
+        self.es, self.ef, self.ls, self.lf = es, ef, ls, lf
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, task_id):
+        return task_id in self.index
+
+    def __getitem__(self, task_id):
+        return self.timing(self.index[task_id])
+
+    def get(self, task_id, default=None):
+        i = self.index.get(task_id)
+        return default if i is None else self.timing(i)
+
+    def total_float(self, i):
+        return self.ls[i] - self.es[i]
+
+    def timing(self, i):
+        total_float = self.total_float(i)
+        return TaskTiming(
+            early_start=date.fromordinal(self.es[i]),
+            early_finish=date.fromordinal(self.ef[i] - 1),
+            late_start=date.fromordinal(self.ls[i]),
+            late_finish=date.fromordinal(self.lf[i] - 1),
+            total_float=total_float,
+            critical=total_float <= 0,
+        )
+
+    @property
+    def project_start(self):
+        return date.fromordinal(min(self.es)) if self.ids else None
+
+    @property
+    def project_finish(self):
+        return date.fromordinal(max(self.ef) - 1) if self.ids else None
+
+    @property
+    def critical_path(self):
+        """Ids of the zero-float tasks, in schedule (topological) order."""
+        return [self.ids[i] for i in self.order if self.total_float(i) <= 0]
+
+    def as_dict(self):
+        return {
+            "project_start": self.project_start,
+            "project_finish": self.project_finish,
+            "critical_path": self.critical_path,
+            "tasks": [
+                {"id": self.ids[i], **self.timing(i)._asdict()} for i in self.order
+            ],
+        }
+
+
+def compute_schedule(tasks, edges):
+    """
+    Run the CPM forward and backward passes in O(V + E).
+
+    ``tasks`` yields ``(id, start_date, end_date)``; a task's recorded
+    start is kept as a start-no-earlier-than constraint and its length is
+    the inclusive day count. ``edges`` yields ``(predecessor_id,
+    successor_id)`` finish-to-start links; edges to tasks not in ``tasks``
+    are ignored. Raises CycleError (with task ids) on circular links.
+    """
+    ids = []
+    index = {}
+    es = []
+    duration = []
+    for task_id, start, end in tasks:
+        index[task_id] = len(ids)
+        ids.append(task_id)
+        start = start.toordinal()
+        es.append(start)
+        duration.append(max(end.toordinal() - start, 0) + 1)
+
+    count = len(ids)
+    successors = [[] for _ in range(count)]
+    for predecessor, successor in edges:
+        i = index.get(predecessor)
+        j = index.get(successor)
+        if i is not None and j is not None:
+            successors[i].append(j)
+
+    try:
+        order = topological_order(count, successors)
+    except CycleError as e:
+        raise CycleError([ids[i] for i in e.task_ids]) from None
+
+    # Forward pass: a task starts once every predecessor has finished
+    ef = [0] * count
+    for i in order:
+        finish = ef[i] = es[i] + duration[i]
+        for j in successors[i]:
+            if finish > es[j]:
+                es[j] = finish
+
+    # Backward pass: a task must finish before any successor's late start
+    project_finish = max(ef, default=0)
+    ls = [0] * count
+    lf = [0] * count
+    for i in reversed(order):
+        late = project_finish
+        for j in successors[i]:
+            if ls[j] < late:
+                late = ls[j]
+        lf[i] = late
+        ls[i] = late - duration[i]
+
+    return Schedule(ids, order, successors, duration, es, ef, ls, lf)
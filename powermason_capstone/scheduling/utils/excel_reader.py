@@ -0,0 +1,108 @@
+from datetime import date, datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# Bump when parsing output changes so cached imports are invalidated
+PARSER_VERSION = "xlsx-4"
+
+# Sheet row of the first task row: the header is row 1
+FIRST_ROW = 2
+
+# Sheet header -> imported task field
+COLUMNS = {
+    "Task": "task_name",
+    "Start": "start_date",
+    "End": "end_date",
+    "Days": "duration_days",
+    "MH": "manhours",
+    "Scope": "scope",
+    "Predecessors": "predecessors",
+}
+DATE_FIELDS = ("start_date", "end_date")
+NUMBER_FIELDS = ("duration_days", "manhours")
+TEXT_FIELDS = ("task_name", "scope", "predecessors")
+
+
+def read_tasks(file):
+    """
+    Read the task columns of the first sheet in one vectorized pass.
+
+    Only the Task/Start/End/Days/MH/Scope/Predecessors columns are loaded
+    (Predecessors as text, so "3" stays a row number); dates become
+    ISO strings and numbers floats, column by column, so the result has the
+    same shape as the PDF importer's tasks. Rows without a task name are
+    dropped; every task keeps its sheet row as ``source_row``, which is
+    what row-number predecessors refer to.
+    """
+    df = pd.read_excel(file, usecols=lambda column: column in COLUMNS, dtype={"Predecessors": str})
+    df = df.rename(columns=COLUMNS).reindex(columns=list(COLUMNS.values()))
+    df["source_row"] = df.index + FIRST_ROW  # blank rows are kept as NaN rows until the filter below
+
+    for field in DATE_FIELDS:
+        df[field] = pd.to_datetime(df[field], errors="coerce").dt.strftime("%Y-%m-%d")
+    for field in NUMBER_FIELDS:
+        df[field] = pd.to_numeric(df[field], errors="coerce").astype(float)
+    for field in TEXT_FIELDS:
+        df[field] = df[field].astype("string").str.strip().replace("", pd.NA)
+
+    df = df[df["task_name"].notna()]
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _cell_date(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if value in (None, ""):
+        return None
+    parsed = pd.to_datetime(value, errors="coerce")
+    return None if pd.isna(parsed) else parsed.date().isoformat()
+
+
+def _cell_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _cell_text(value):
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def iter_tasks_streaming(file):
+    """
+    Yield tasks row by row from an .xlsx file using openpyxl's read-only mode.
+
+    Memory stays flat regardless of sheet size; meant for workbooks too big
+    to load into a DataFrame comfortably.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        positions = {
+            COLUMNS[name]: i for i, name in enumerate(header) if name in COLUMNS
+        }
+
+        for source_row, row in enumerate(rows, start=FIRST_ROW):
+            values = {field: row[i] if i < len(row) else None for field, i in positions.items()}
+            task_name = _cell_text(values.get("task_name"))
+            if not task_name:
+                continue
+            yield {
+                "task_name": task_name,
+                "start_date": _cell_date(values.get("start_date")),
+                "end_date": _cell_date(values.get("end_date")),
+                "duration_days": _cell_number(values.get("duration_days")),
+                "manhours": _cell_number(values.get("manhours")),
+                "scope": _cell_text(values.get("scope")),
+                "predecessors": _cell_text(values.get("predecessors")),
+                "source_row": source_row,
+            }
+    finally:
+        workbook.close()
@@ -0,0 +1,116 @@
+import heapq
+from collections import namedtuple
+
+import numpy as np
+
+# Times are day ordinals; ``late_start`` is the latest start that keeps the
+# project finish (early_start + total float).
+LevelingTask = namedtuple("LevelingTask", "id resource early_start late_start duration daily_hours")
+
+
+def _best_start(load, offset, earliest, latest, duration, hours, capacity):
+    """
+    Start in ``[earliest, latest]`` that adds the fewest hours over
+    ``capacity`` when ``hours`` per day are booked for ``duration`` days;
+    the earliest on ties, so a start that fits entirely wins when any does.
+    """
+    window = load[earliest - offset:latest - offset + duration]
+    # Overflow the task itself adds on each day, summed per start with a running total
+    added = np.maximum(window + hours - capacity, 0) - np.maximum(window - capacity, 0)
+    totals = np.concatenate(([0.0], np.cumsum(added)))
+    cost = np.round(totals[duration:] - totals[:-duration], 6)
+    return earliest + int(np.argmin(cost))
+
+
+def level_resources(tasks, predecessors, capacity):
+    """
+    Shift non-critical tasks within their float so each resource's daily
+    load fits ``capacity`` hours, without moving any project finish.
+
+    Zero-float tasks can't move, so their load is booked first. The rest
+    are placed by a serial schedule-generation pass: a task becomes ready
+    once its predecessors are placed, and the ready task with the earliest
+    late start (least room) is popped from a heap and put at the first
+    start in ``[max(early start, predecessors' finish), late start]``
+    where its resource has room. When nothing fits it goes where it adds
+    the fewest overtime hours, and its days are reported as overloaded.
+
+    ``tasks`` is a list of LevelingTask (a ``None`` resource or zero hours
+    means no load); ``predecessors`` maps a task id to the ids it follows.
+    Returns ``(starts, overloads)``: the proposed start per task id, and
+    ``(resource, day, hours)`` for every day still over capacity.
+    """
+    if not tasks:
+        return {}, []
+
+    offset = min(t.early_start for t in tasks)
+    horizon = max(max(t.late_start, t.early_start) + t.duration for t in tasks) - offset
+    loads = {}
+
+    def book(task, start):
+        if task.resource is not None and task.daily_hours > 0:
+            load = loads.setdefault(task.resource, np.zeros(horizon))
+            load[start - offset:start - offset + task.duration] += task.daily_hours
+
+    by_id = {t.id: t for t in tasks}
+    successors = {}
+    pending = {}
+    for t in tasks:
+        preds = [p for p in predecessors.get(t.id, ()) if p in by_id]
+        pending[t.id] = len(preds)
+        for p in preds:
+            successors.setdefault(p, []).append(t.id)
+
+    fixed = {t.id for t in tasks if t.late_start <= t.early_start}
+    for task_id in fixed:
+        book(by_id[task_id], by_id[task_id].early_start)
+
+    ready = [(t.late_start, t.early_start, t.id) for t in tasks if pending[t.id] == 0]
+    heapq.heapify(ready)
+    starts = {}
+    finish = {}
+    while ready:
+        _, _, task_id = heapq.heappop(ready)
+        task = by_id[task_id]
+        earliest = max([task.early_start] + [finish[p] for p in predecessors.get(task_id, ()) if p in finish])
+        start = earliest
+        if task_id not in fixed and task.resource is not None and task.daily_hours > 0:
+            latest = max(earliest, task.late_start)
+            load = loads.setdefault(task.resource, np.zeros(horizon))
+            start = _best_start(load, offset, earliest, latest, task.duration, task.daily_hours, capacity)
+            book(task, start)
+
+        starts[task_id] = start
+        finish[task_id] = start + task.duration
+        for successor in successors.get(task_id, ()):
+            pending[successor] -= 1
+            if pending[successor] == 0:
+                s = by_id[successor]
+                heapq.heappush(ready, (s.late_start, s.early_start, successor))
+
+    overloads = []
+    for resource, load in loads.items():
+        for day in np.flatnonzero(load > capacity + 1e-9):
+            overloads.append((resource, offset + int(day), float(load[day])))
+    return starts, overloads
+
+
+def daily_peaks(tasks, starts, capacity):
+    """Per resource: (peak daily hours, days over capacity, hours over capacity) with tasks at ``starts``."""
+    if not tasks:
+        return {}
+    offset = min(min(starts[t.id] for t in tasks), min(t.early_start for t in tasks))
+    horizon = max(starts[t.id] + t.duration for t in tasks) - offset
+    loads = {}
+    for t in tasks:
+        if t.resource is not None and t.daily_hours > 0:
+            load = loads.setdefault(t.resource, np.zeros(horizon))
+            load[starts[t.id] - offset:starts[t.id] - offset + t.duration] += t.daily_hours
+    return {
+        resource: (
+            float(load.max()),
+            int((load > capacity + 1e-9).sum()),
+            float(np.maximum(load - capacity, 0).sum()),
+        )
+        for resource, load in loads.items()
+    }
@@ -1,7 +1,32 @@
 import pdfplumber
+from bisect import bisect_right
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 import re
+import threading
 
+# Bump when parsing output changes so cached imports are invalidated
+PARSER_VERSION = "pdf-4"
+
+# Header fields in the order they are looked for on each line
+HEADER_PATTERNS = (
+    ("proj_id", re.compile(r"PROJ ID\s*[:\-]?\s*([A-Za-z0-9\-]+)")),
+    ("project", re.compile(r"PROJECT\s*[:\-]?\s*(.+)")),
+    ("location", re.compile(r"LOCATION\s*[:\-]?\s*(.+)")),
+    ("scope", re.compile(r"SCOPE\s*[:\-]?\s*(.+)")),
+)
+
+TASK_PATTERN = re.compile(
+    r"(?P<task>.+?)\s+"
+    r"(?P<start>\d{1,2}-[A-Za-z]{3}-\d{2,4})\s+"
+    r"(?P<end>\d{1,2}-[A-Za-z]{3}-\d{2,4})\s+"
+    r"(?P<duration>[\d\.]+)\s+"
+    r"(?P<MH>[\d\.]+)"
+)
+
+
+@lru_cache(maxsize=1024)
 def parse_date(date_str):
     for fmt in ("%d-%b-%y", "%d-%b-%Y"):
         try:
@@ -11,8 +36,13 @@ def parse_date(date_str):
     return None
 
 
-def extract_project_info(pdf_path):
-    project_info = {
+def _iso(date_str):
+    parsed = parse_date(date_str)
+    return parsed.isoformat() if parsed else None
+
+
+def new_project_info():
+    return {
         "proj_id": None,
         "project": None,
         "location": None,
@@ -20,75 +50,254 @@ def extract_project_info(pdf_path):
         "tasks": []
     }
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            words = page.extract_words()
-
-            # Group words by vertical position
-            lines = {}
-            for w in words:
-                top = round(w['top'])
-                lines.setdefault(top, []).append(w)
-
-            for line_words in lines.values():
-                line_words = sorted(line_words, key=lambda x: x['x0'])
-                new_line = []
-                buffer = ""
-                prev_x = None
-                for w in line_words:
-                    if prev_x is not None and w['text'].replace('.', '').isdigit() and buffer.replace('.', '').isdigit() and w['x0'] - prev_x < 3:
-                        buffer += w['text']
-                    else:
-                        if buffer:
-                            new_line.append(buffer)
-                        buffer = w['text']
-                    prev_x = w['x1']
-                if buffer:
-                    new_line.append(buffer)
-                line = " ".join(new_line)
-
-                # --- Extract project headers ---
-                if project_info["proj_id"] is None:
-                    match = re.search(r"PROJ ID\s*[:\-]?\s*([A-Za-z0-9\-]+)", line)
-                    if match:
-                        project_info["proj_id"] = match.group(1).strip()
-                        continue
-                if project_info["project"] is None:
-                    match = re.search(r"PROJECT\s*[:\-]?\s*(.+)", line)
-                    if match:
-                        project_info["project"] = match.group(1).strip()
-                        continue
-                if project_info["location"] is None:
-                    match = re.search(r"LOCATION\s*[:\-]?\s*(.+)", line)
-                    if match:
-                        project_info["location"] = match.group(1).strip()
-                        continue
-                if project_info["scope"] is None:
-                    match = re.search(r"SCOPE\s*[:\-]?\s*(.+)", line)
-                    if match:
-                        project_info["scope"] = match.group(1).strip()
-                        continue
-
-                # --- Extract tasks ---
-                task_match = re.match(
-                    r"(?P<task>.+?)\s+"
-                    r"(?P<start>\d{1,2}-[A-Za-z]{3}-\d{2,4})\s+"
-                    r"(?P<end>\d{1,2}-[A-Za-z]{3}-\d{2,4})\s+"
-                    r"(?P<duration>[\d\.]+)\s+"
-                    r"(?P<MH>[\d\.]+)",
-                    line
-                )
-                if task_match:
-                    project_info["tasks"].append({
-        "task_name": task_match.group("task").strip(),
-        "start_date": parse_date(task_match.group("start")).isoformat() if parse_date(task_match.group("start")) else None,
-        "end_date": parse_date(task_match.group("end")).isoformat() if parse_date(task_match.group("end")) else None,
-        "duration_days": float(task_match.group("duration")),
-        "manhours": float(task_match.group("MH")),
-        "scope": project_info.get("scope")  # default from header if available
-    })
+
+def page_rows(page):
+    """
+    Group the words of one page into rows of ``(x0, x1, text)``, top to
+    bottom and left to right. Plain tuples keep rows cheap to ship back
+    from worker processes.
+    """
+    rows = {}
+    for w in page.extract_words():
+        rows.setdefault(round(w['top']), []).append((w['x0'], w['x1'], w['text']))
+    return [sorted(words) for _, words in sorted(rows.items())]
+
+
+def join_row(words):
+    """
+    Rebuild a row as one text line, gluing digits that pdfplumber split
+    into separate words (e.g. "1" "20.0" -> "120.0").
+    """
+    new_line = []
+    buffer = ""
+    prev_x = None
+    for x0, x1, text in words:
+        if prev_x is not None and text.replace('.', '').isdigit() and buffer.replace('.', '').isdigit() and x0 - prev_x < 3:
+            buffer += text
+        else:
+            if buffer:
+                new_line.append(buffer)
+            buffer = text
+        prev_x = x1
+    if buffer:
+        new_line.append(buffer)
+    return " ".join(new_line)
+
+
+class ColumnLayout:
+    """
+    Column boundaries of a schedule table, taken from its header row.
+
+    ``cuts`` are the x positions splitting a row into the task cell and
+    one cell per value column (start, end, days, MH and, when the table
+    has one, predecessors); words are assigned to a cell by their centre.
+    Each value column reaches halfway to its neighbours' header centres,
+    since values are centred or right-aligned under headers narrower than
+    they are. The task cell starts right of the ITEM column (whatever is
+    left of it is the item number) and runs up to the first value column;
+    anything past the last one (the weekly bar chart) is ignored.
+    """
+
+    def __init__(self, header):
+        columns = sorted(
+            ((header[name][0] + header[name][1]) / 2, name)
+            for name in (*TABLE_COLUMNS[1:], *OPTIONAL_COLUMNS) if name in header
+        )
+        centres = [centre for centre, _ in columns]
+        halves = [(b - a) / 2 for a, b in zip(centres, centres[1:])]
+        item = header.get("ITEM")
+        self.fields = ("task_name", *(VALUE_FIELDS[name] for _, name in columns))
+        self.cuts = (
+            item[1] if item else 0.0,
+            centres[0] - halves[0],
+            *(c + h for c, h in zip(centres, halves)),
+            centres[-1] + halves[-1],
+        )
+
+    def cells(self, words):
+        cells = {field: [] for field in ("item", *self.fields)}
+        for x0, x1, text in words:
+            i = bisect_right(self.cuts, (x0 + x1) / 2) - 1
+            if i < 0:
+                cells["item"].append(text)
+            elif i < len(self.fields):
+                cells[self.fields[i]].append(text)
+        return cells
+
+    def task(self, words, scope):
+        """Slice a row into a task dict, or None if it is not a task row."""
+        cells = self.cells(words)
+        start_date = _iso("".join(cells["start_date"]))
+        end_date = _iso("".join(cells["end_date"]))
+        if not (cells["task_name"] and start_date and end_date):
+            return None
+        task = {
+            "task_name": " ".join(cells["task_name"]),
+            "start_date": start_date,
+            "end_date": end_date,
+            "duration_days": _number("".join(cells["duration_days"])),
+            "manhours": _number("".join(cells["manhours"])),
+            "scope": scope,
+        }
+        item = ITEM_NUMBER.fullmatch("".join(cells["item"]))
+        if item:
+            task["source_row"] = int(item.group(1))  # what row-number predecessors refer to
+        if "predecessors" in cells:
+            task["predecessors"] = " ".join(cells["predecessors"]) or None
+        return task
+
+
+# A whole ITEM number ("12" or "12.0"); sub-items like "1.1" have none
+ITEM_NUMBER = re.compile(r"(\d+)(?:\.0*)?")
+
+# Header words of the schedule table, task column first
+TABLE_COLUMNS = ("ACTIVITY", "START", "END", "DAYS", "MH")
+# Columns a table may add; header spellings are mapped to these names
+OPTIONAL_COLUMNS = ("PRED",)
+HEADER_ALIASES = {"PRED.": "PRED", "PREDECESSOR": "PRED", "PREDECESSORS": "PRED"}
+
+VALUE_FIELDS = {
+    "START": "start_date",
+    "END": "end_date",
+    "DAYS": "duration_days",
+    "MH": "manhours",
+    "PRED": "predecessors",
+}
+
+# Layouts already seen, keyed by header fingerprint (most recent last);
+# request threads share them, so reads and evictions hold the lock
+_layouts = OrderedDict()
+_layouts_lock = threading.Lock()
+MAX_LAYOUTS = 32
+
+# Header x positions are quantized so small rendering jitter between
+# exports of the same template still maps to one fingerprint
+FINGERPRINT_STEP = 4
 
 
+def _number(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
 
 
+def find_layout(words):
+    """
+    Return the ``ColumnLayout`` for a table header row, or None when
+    ``words`` is not one. Layouts are cached by fingerprint (the header
+    words and their quantized positions), so every later page and file
+    exported from the same template reuses the boundaries.
+    """
+    header = {}
+    for x0, x1, text in words:
+        name = text.upper()
+        header.setdefault(HEADER_ALIASES.get(name, name), (x0, x1))
+    if not all(name in header for name in TABLE_COLUMNS):
+        return None
+
+    fingerprint = tuple(
+        (name, round(header[name][0] / FINGERPRINT_STEP))
+        for name in ("ITEM", *TABLE_COLUMNS, *OPTIONAL_COLUMNS) if name in header
+    )
+    with _layouts_lock:
+        layout = _layouts.get(fingerprint)
+        if layout is None:
+            layout = _layouts[fingerprint] = ColumnLayout(header)
+            if len(_layouts) > MAX_LAYOUTS:
+                _layouts.popitem(last=False)
+        else:
+            _layouts.move_to_end(fingerprint)
+    return layout
+
+
+def _match_header(line, pending, project_info):
+    for i, (key, pattern) in enumerate(pending):
+        match = pattern.search(line)
+        if match:
+            project_info[key] = match.group(1).strip()
+            del pending[i]
+            return True
+    return False
+
+
+def iter_line_tasks(lines, project_info):
+    """
+    Match header and task rows over an iterable of lines.
+
+    Header values are written into ``project_info`` as they are found;
+    once every header is known, lines only go through the task pattern.
+    """
+    pending = [(key, pattern) for key, pattern in HEADER_PATTERNS if project_info.get(key) is None]
+
+    for line in lines:
+        # --- Extract project headers ---
+        if pending and _match_header(line, pending, project_info):
+            continue
+
+        # --- Extract tasks ---
+        task_match = TASK_PATTERN.match(line)
+        if task_match:
+            yield {
+                "task_name": task_match.group("task").strip(),
+                "start_date": _iso(task_match.group("start")),
+                "end_date": _iso(task_match.group("end")),
+                "duration_days": float(task_match.group("duration")),
+                "manhours": float(task_match.group("MH")),
+                "scope": project_info.get("scope")  # default from header if available
+            }
+
+
+def iter_row_tasks(pages, project_info):
+    """
+    Yield tasks from an iterable of pages, each a list of ``page_rows``.
+
+    Until the table header row is seen, rows go through the line matcher
+    (which also picks up the PROJ ID/PROJECT/... headers). From the header
+    on, including on later pages that do not repeat it, rows are sliced by
+    the cached column layout; rows that do not slice into a task (notes,
+    headers, oddly placed text) still fall back to the line matcher.
+    """
+    layout = None
+    for rows in pages:
+        for words in rows:
+            found = find_layout(words)
+            if found:
+                layout = found
+                continue
+            task = layout.task(words, project_info.get("scope")) if layout else None
+            if task:
+                yield task
+            else:
+                yield from iter_line_tasks((join_row(words),), project_info)
+
+
+def _iter_pages(pdf, on_page=None):
+    page_count = len(pdf.pages)
+    for number, page in enumerate(pdf.pages, start=1):
+        try:
+            yield page_rows(page)
+        finally:
+            page.close()
+        if on_page:
+            on_page(number, page_count)
+
+
+def iter_project_tasks(pdf_path, project_info, on_page=None):
+    """
+    Yield tasks page by page from a schedule PDF.
+
+    ``project_info`` receives the header fields as they are found. Each
+    page's layout cache is released once its rows are consumed, so memory
+    stays flat however many pages the file has. ``on_page(done, total)`` is
+    called after every page when given.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        yield from iter_row_tasks(_iter_pages(pdf, on_page), project_info)
+
+
+def extract_project_info(pdf_path):
+    """Parse a schedule PDF into header fields plus a ``tasks`` list."""
+    project_info = new_project_info()
+    project_info["tasks"].extend(iter_project_tasks(pdf_path, project_info))
     return project_info
@@ -0,0 +1,148 @@
+from datetime import date, datetime
+from itertools import chain
+
+from openpyxl import load_workbook
+
+DAILY_TITLE = "DAILY ACCOMPLISHMENT REPORT"
+WEEKLY_TITLE = "PROGRESS REPORT - WEEK"
+
+# How far down a sheet to look for its title before skipping it
+TITLE_SCAN_ROWS = 10
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return None
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+def _label(value):
+    return value.strip().rstrip(":").upper() if isinstance(value, str) else None
+
+
+def _value_after(row, index):
+    """First non-empty cell to the right of ``row[index]``."""
+    for value in row[index + 1:]:
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _proj_id(value):
+    # "P2401-1 SC 168DSC" -> "P2401-1"
+    return str(value).split()[0] if value not in (None, "") else None
+
+
+def _read_daily(rows):
+    labels = {}
+    for row in rows:
+        for i, value in enumerate(row):
+            label = _label(value)
+            if label in ("DATE", "PROJ ID", "ACCOMPLISHED TODAY %", "ACCOMPLISHED TODAY (MH)"):
+                labels.setdefault(label, _value_after(row, i))
+
+    report_date = _as_date(labels.get("DATE"))
+    percent = _as_number(labels.get("ACCOMPLISHED TODAY %"))
+    if report_date is None or percent is None:
+        return
+    yield {
+        "proj_id": _proj_id(labels.get("PROJ ID")),
+        "report_type": "D",
+        "report_date": report_date,
+        "accomplished_this_period": percent * 100,
+        "accomplished_amount": _as_number(labels.get("ACCOMPLISHED TODAY (MH)")),
+    }
+
+
+def _read_weekly(rows):
+    """
+    Sum each day column of a weekly progress sheet, one row at a time.
+
+    The "ITEM" header row carries a date per day column; the row under it
+    marks the contract "AMOUNT" column. Item rows (those with particulars
+    text) add their day amounts to the running totals; section sub-totals
+    and the summary block at the bottom have none and are skipped. The
+    "APPROVED CONTRACT" summary amount, when present, is the denominator
+    for the percentages, as on the sheet itself.
+    """
+    proj_id = None
+    day_columns = None
+    amount_column = None
+    day_totals = {}
+    contract_total = 0.0
+    approved_contract = None
+
+    for row in rows:
+        first = _label(row[0]) if row else None
+        if first == "PROJ ID":
+            proj_id = _proj_id(_value_after(row, 0))
+        elif first == "ITEM" and day_columns is None:
+            day_columns = {i: _as_date(v) for i, v in enumerate(row) if _as_date(v)}
+        elif day_columns is not None and amount_column is None:
+            amount_column = next((i for i, v in enumerate(row) if _label(v) == "AMOUNT"), None)
+        elif amount_column is not None and amount_column < len(row):
+            contract = _as_number(row[amount_column])
+            if contract is None:
+                continue
+            if first and first.startswith("APPROVED CONTRACT"):
+                approved_contract = contract
+            elif isinstance(row[1], str):
+                contract_total += contract
+                for i, day in day_columns.items():
+                    amount = _as_number(row[i]) if i < len(row) else None
+                    if amount:
+                        day_totals[day] = day_totals.get(day, 0.0) + amount
+
+    contract_total = approved_contract or contract_total
+    if not day_columns or not contract_total:
+        return
+    for day in sorted(day_columns.values()):
+        amount = day_totals.get(day, 0.0)
+        yield {
+            "proj_id": proj_id,
+            "report_type": "W",
+            "report_date": day,
+            "accomplished_this_period": amount * 100 / contract_total,
+            "accomplished_amount": amount,
+        }
+
+
+def iter_report_rows(file):
+    """
+    Yield one dict per reported day from a progress workbook.
+
+    Daily accomplishment sheets (DAR) give one row for their DATE. Weekly
+    progress sheets (PRW) give one row per day column, as a percent of the
+    approved contract amount. Other sheets (BOM, estimates, monthly
+    roll-ups) are skipped. Sheets are read in openpyxl's read-only mode, so
+    rows stream through without loading the workbook into memory.
+    """
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            head = []
+            reader = None
+            for row in rows:
+                head.append(row)
+                text = " ".join(v.upper() for v in row if isinstance(v, str))
+                if DAILY_TITLE in text:
+                    reader = _read_daily
+                elif WEEKLY_TITLE in text:
+                    reader = _read_weekly
+                if reader or len(head) >= TITLE_SCAN_ROWS:
+                    break
+            if reader:
+                yield from reader(chain(head, rows))
+    finally:
+        workbook.close()
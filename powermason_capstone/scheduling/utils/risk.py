@@ -0,0 +1,117 @@
+from collections import namedtuple
+
+import numpy as np
+
+from .cpm import topological_order
+
+# ``finishes``: project finish per iteration; ``criticality``: share of
+# iterations in which each task had no float
+Simulation = namedtuple("Simulation", "finishes criticality")
+
+# Float below this counts as zero (sampled durations are fractional)
+FLOAT_TOLERANCE = 1e-6
+
+
+def sample_durations(rng, optimistic, likely, pessimistic, size):
+    """
+    Triangular draws, one row per task and ``size`` columns. Drawn by
+    inverting the CDF, so a task whose three estimates are equal always
+    gets that duration (``Generator.triangular`` rejects zero width).
+    """
+    low, mode, high = (np.asarray(values, dtype=float)[:, None] for values in (optimistic, likely, pessimistic))
+    width = high - low
+    cut = np.divide(mode - low, width, out=np.zeros_like(width), where=width > 0)
+    u = rng.random((len(low), size))
+    return np.where(
+        u < cut,
+        low + np.sqrt(u * width * (mode - low)),
+        high - np.sqrt((1 - u) * width * (high - mode)),
+    )
+
+
+class Network:
+    """
+    A dependency graph split into levels for vectorized CPM passes.
+
+    Times are arrays with one row per task and one column per iteration.
+    Tasks of one level never depend on each other, so a whole level is
+    updated with one gather of its links' rows (incoming, or outgoing on
+    the backward pass) and one ``reduceat``, for every iteration at once.
+    Raises CycleError (with task indexes) on circular links.
+    """
+
+    def __init__(self, count, edges):
+        edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+        successors = [[] for _ in range(count)]
+        for predecessor, successor in edges.tolist():
+            successors[predecessor].append(successor)
+        rank = [0] * count
+        for i in topological_order(count, successors):
+            for j in successors[i]:
+                rank[j] = max(rank[j], rank[i] + 1)
+        rank = np.asarray(rank, dtype=int)
+
+        self.count = count
+        self.forward = self._levels(edges[:, 1], edges[:, 0], rank)
+        self.backward = self._levels(edges[:, 0], edges[:, 1], rank)[::-1]
+
+    @staticmethod
+    def _levels(targets, sources, rank):
+        """Per level of ``targets``: (targets, their sources, segment starts), in rank order."""
+        order = np.lexsort((targets, rank[targets]))
+        targets, sources = targets[order], sources[order]
+        levels = []
+        bounds = np.flatnonzero(np.diff(rank[targets])) + 1
+        for level_targets, level_sources in zip(np.split(targets, bounds), np.split(sources, bounds)):
+            if len(level_targets):
+                starts = np.flatnonzero(np.r_[True, level_targets[1:] != level_targets[:-1]])
+                levels.append((level_targets[starts], level_sources, starts))
+        return levels
+
+    def early_finishes(self, starts, durations):
+        """
+        Early starts and finishes of ``durations`` (one row per task, one
+        column per iteration); ``starts`` are no-earlier-than offsets.
+        """
+        es = np.repeat(starts[:, None], durations.shape[1], axis=1)
+        ef = es + durations
+        for targets, sources, segments in self.forward:
+            es[targets] = np.maximum(np.maximum.reduceat(ef[sources], segments), starts[targets, None])
+            ef[targets] = es[targets] + durations[targets]
+        return es, ef
+
+    def late_starts(self, finishes, durations):
+        """Late starts of ``durations`` (task rows, iteration columns), back from each iteration's finish."""
+        ls = finishes - durations
+        for targets, sources, segments in self.backward:
+            ls[targets] = np.minimum(np.minimum.reduceat(ls[sources], segments), finishes) - durations[targets]
+        return ls
+
+
+def simulate_schedule(starts, optimistic, likely, pessimistic, edges, iterations, rng=None, chunk_size=500):
+    """
+    Monte Carlo CPM: sample every task's duration from its three-point
+    (triangular) estimate and run the forward and backward passes,
+    vectorized across iterations, ``chunk_size`` iterations at a time to
+    bound memory.
+
+    Tasks are indexes ``0..n-1``; ``starts`` are start-no-earlier-than
+    offsets and durations are in the same unit (working days), and
+    ``edges`` are ``(predecessor, successor)`` index pairs. Returns a
+    Simulation. Raises CycleError (with indexes) on circular links.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    starts = np.asarray(starts, dtype=float)
+    network = Network(len(starts), edges)
+
+    finishes = np.empty(iterations)
+    critical = np.zeros(len(starts))
+    for offset in range(0, iterations, chunk_size):
+        size = min(chunk_size, iterations - offset)
+        durations = sample_durations(rng, optimistic, likely, pessimistic, size)
+        es, ef = network.early_finishes(starts, durations)
+        finish = ef.max(axis=0) if len(starts) else np.zeros(size)
+        ls = network.late_starts(finish, durations)
+        critical += (ls - es <= FLOAT_TOLERANCE).sum(axis=1)
+        finishes[offset:offset + size] = finish
+    return Simulation(finishes, critical / max(iterations, 1))
@@ -0,0 +1,34 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from scheduling.models import ProjectTask
+from scheduling.schedule import rank_new_dependency
+
+
+# --- Refuse circular dependencies and keep topo_rank valid on every .add()/.set() ---
+@receiver(m2m_changed, sender=ProjectTask.dependencies.through)
+def rank_dependencies(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != "pre_add" or not pk_set:
+        return
+    for pk in pk_set:
+        # Forward adds list the predecessors of `instance`, reverse adds its successors
+        if reverse:
+            rank_new_dependency(instance.pk, pk)
+        else:
+            rank_new_dependency(pk, instance.pk)
+
+
+# --- Links live in the through table, so mark their successors as changed ---
+@receiver(m2m_changed, sender=ProjectTask.dependencies.through)
+def touch_dependents(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove") and reverse:
+        successors = pk_set
+    elif action in ("post_add", "post_remove", "post_clear") and not reverse:
+        successors = {instance.pk}
+    elif action == "pre_clear" and reverse:
+        successors = set(instance.projecttask_set.values_list("pk", flat=True))
+    else:
+        return
+    if successors:
+        ProjectTask.objects.filter(pk__in=successors).update(updated_at=timezone.now())
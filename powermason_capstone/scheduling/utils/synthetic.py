@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+from openpyxl import Workbook
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+ROWS_PER_PAGE = 45
+COLUMNS = (40, 300, 370, 440, 500)  # task, start, end, days, MH
+HEADER = ("ACTIVITY", "START", "END", "DAYS", "MH")
+
+
+def synthetic_tasks(count, start=date(2024, 8, 1)):
+    """Yield (name, start, end, days, manhours) rows for a fake schedule."""
+    for i in range(count):
+        days = i % 5 + 1
+        task_start = start + timedelta(days=i % 120)
+        yield (
+            f"Task {i + 1} conduit and wiring",
+            task_start,
+            task_start + timedelta(days=days - 1),
+            float(days),
+            float(days * 8),
+        )
+
+
+def build_schedule_pdf(path, task_count):
+    """Write a schedule PDF in the layout ``pdf_reader`` understands."""
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    _, height = letter
+
+    y = height - 40
+    for line in ("POWERMASON CONSTRUCTION", "PROJ ID P0000-1", "PROJECT Synthetic Schedule",
+                 "LOCATION Manila", "SCOPE Electrical Works"):
+        pdf.drawString(COLUMNS[0], y, line)
+        y -= 14
+    for x, label in zip(COLUMNS, HEADER):
+        pdf.drawString(x, y, label)
+    y -= 14
+
+    row = 0
+    for name, start, end, days, manhours in synthetic_tasks(task_count):
+        if row == ROWS_PER_PAGE:
+            pdf.showPage()
+            y, row = height - 40, 0
+        values = (name, f"{start.day}-{start:%b-%y}", f"{end.day}-{end:%b-%y}", f"{days:.1f}", f"{manhours:.1f}")
+        for x, value in zip(COLUMNS, values):
+            pdf.drawString(x, y, value)
+        y -= 14
+        row += 1
+
+    pdf.save()
+    return path
+
+
+def build_schedule_xlsx(path, task_count):
+    """Write a task sheet with the Task/Start/End/Days/MH/Scope columns."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Schedule")
+    sheet.append(["Item", "Task", "Start", "End", "Days", "MH", "Scope", "Remarks"])
+    for i, (name, start, end, days, manhours) in enumerate(synthetic_tasks(task_count), start=1):
+        sheet.append([i, name, start, end, days, manhours, "Electrical Works", ""])
+    workbook.save(str(path))
+    return path
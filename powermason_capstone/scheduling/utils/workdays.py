@@ -0,0 +1,48 @@
+import numpy as np
+
+# Working days Monday..Sunday: sites work a six-day week
+DEFAULT_WEEKMASK = "1111110"
+
+
+def _days(values):
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+class WorkingCalendar:
+    """
+    A project's working days for numpy's ``busday_*`` functions. Every
+    method takes a whole column of dates at once; the scalar helpers are
+    for single form rows.
+    """
+
+    def __init__(self, weekmask=DEFAULT_WEEKMASK, holidays=()):
+        self.weekmask = weekmask
+        self.holidays = sorted(set(holidays))
+        self.busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=_days(self.holidays))
+
+    def durations(self, starts, ends):
+        """Working days from each start to its end, both inclusive."""
+        return np.busday_count(_days(starts), _days(ends) + 1, busdaycal=self.busdaycal)
+
+    def end_dates(self, starts, durations):
+        """
+        Last day of tasks running ``durations`` working days from
+        ``starts`` (a start on a day off moves to the next working day).
+        Partial days round up; anything under one day counts as one.
+        """
+        days = np.maximum(np.ceil(np.asarray(durations, dtype=float)), 1).astype(int)
+        ends = np.busday_offset(_days(starts), days - 1, roll="forward", busdaycal=self.busdaycal)
+        return ends.astype(object)  # datetime.date
+
+    def offsets(self, origin, days):
+        """
+        Working days from ``origin`` up to (not including) each of
+        ``days``; ``end_dates(origin, offsets)`` maps finishes back.
+        """
+        return np.busday_count(_days(origin), _days(days), busdaycal=self.busdaycal)
+
+    def duration(self, start, end):
+        return int(self.durations([start], [end])[0])
+
+    def end_date(self, start, duration):
+        return self.end_dates([start], [duration])[0]
@@ -1,22 +1,30 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import ProjectTask, ProgressFile, ProgressUpdate
-from .forms import ProjectTaskForm, ProgressUpdateForm
+from .models import ProjectTask, ProgressFile, ProgressUpdate, ScheduleImportJob
+from .forms import ProjectTaskForm, ProgressUpdateForm, ReviewQueueFilterForm, TaskBulkEditForm
+from .gantt import gantt_etag, gantt_payload
+from .imports import save_staged_tasks
+from .approvals import approve_updates, reject_updates, review_page
+from .rollup import adjust_project_totals, rebuild_project_totals, task_change, task_totals
+from .schedule import load_schedule, propose_leveling, recompute_schedule, repropagate, simulate_risk
+from .utils.cpm import CycleError
 from project_profiling.models import ProjectProfile
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse, HttpResponseForbidden
-from .utils.pdf_reader import extract_project_info
 from authentication.models import UserProfile
+from django.db import transaction
 from django.db.models import Q
 from authentication.utils.tokens import parse_dashboard_token, SignatureExpired, BadSignature
-import tempfile, os
-import pandas as pd
 import json
-from django.utils.dateparse import parse_date
 from authentication.utils.decorators import verified_email_required, role_required
 from django.contrib.auth.decorators import login_required
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
-from django.utils import timezone
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.gzip import gzip_page
+
+# Upper bound on ?iterations= for the risk simulation, so one request can't tie up a worker
+MAX_RISK_ITERATIONS = 100000
 
 @login_required
 def submit_progress_update(request, token, task_id, role):
@@ -53,45 +61,122 @@ def submit_progress_update(request, token, task_id, role):
 
 
 @login_required
+@verified_email_required
+@role_required("OM", "EG")
 def review_updates(request):
     """
-    Global view for OM/EG and superusers to see all pending updates.
+    Global view for OM/EG and superusers to see pending updates, oldest
+    first, one page at a time (``after`` is the next-page cursor). Every
+    relation the rows show is loaded with the page, so the query count
+    doesn't depend on the page size.
     """
-    pending_updates = ProgressUpdate.objects.filter(status="P")
+    form = ReviewQueueFilterForm(request.GET or None)
+    pending_updates = (
+        ProgressUpdate.objects.filter(status="P")
+        .select_related("task__project", "reported_by")
+        .prefetch_related("attachments")
+    )
+    if form.is_valid():
+        pending_updates = form.filter(pending_updates)
+    updates, next_cursor = review_page(pending_updates, request.GET.get("after"))
     context = {
-        "updates": pending_updates,
+        "updates": updates,
+        "form": form,
+        "next_cursor": next_cursor,
+        "paged": "after" in request.GET,
     }
     return render(request, "progress/review_updates.html", context)
 
 @login_required
+@verified_email_required
+@role_required("OM", "EG")
 def approve_update(request, update_id):
-    update = get_object_or_404(ProgressUpdate, id=update_id)
-    update.status = "A"
-    update.reviewed_by = request.user.userprofile
-    update.reviewed_at = timezone.now()
+    update = get_object_or_404(ProgressUpdate.objects.select_related("task"), id=update_id)
+    if request.method != "POST":
+        return redirect("review_updates")
 
-    task = update.task
-    task.progress = min(task.progress + update.progress_percent, 100)
-    task.save()
-    update.save()
-    messages.success(request, f"Progress update for '{task.task_name}' approved successfully.")
+    if approve_updates([update.id], request.user.userprofile):
+        messages.success(request, f"Progress update for '{update.task.task_name}' approved successfully.")
+    else:
+        messages.warning(request, f"Progress update for '{update.task.task_name}' was already reviewed.")
 
     return redirect("review_updates")
 
 
 @login_required
+@verified_email_required
+@role_required("OM", "EG")
 def reject_update(request, update_id):
-    update = get_object_or_404(ProgressUpdate, id=update_id)
-    update.status = "R"
-    update.reviewed_by = request.user.userprofile
-    update.reviewed_at = timezone.now()
-    update.save()
-    messages.warning(request, f"Progress update for '{update.task.task_name}' has been rejected.")
+    update = get_object_or_404(ProgressUpdate.objects.select_related("task"), id=update_id)
+    if request.method != "POST":
+        return redirect("review_updates")
+
+    if reject_updates([update.id], request.user.userprofile):
+        messages.warning(request, f"Progress update for '{update.task.task_name}' has been rejected.")
+    else:
+        messages.warning(request, f"Progress update for '{update.task.task_name}' was already reviewed.")
 
     return redirect("review_updates")
+
+
+@login_required
+@verified_email_required
+@role_required("OM", "EG")
+def review_updates_batch(request):
+    """
+    Approve or reject every selected pending update in one transaction
+    (``action`` is "approve" or "reject"). Answers JSON when the client
+    asks for it, otherwise redirects back to the review queue.
+    """
+    if request.method != "POST":
+        return redirect("review_updates")
+
+    wants_json = request.accepts("application/json") and not request.accepts("text/html")
+    action = request.POST.get("action")
+    try:
+        update_ids = [int(update_id) for update_id in _selected_ids(request, "update_ids")]
+    except ValueError:
+        update_ids = None
+
+    if action not in ("approve", "reject") or not update_ids:
+        error = "Select updates and an action." if update_ids is not None else "Invalid update ids."
+        if wants_json:
+            return JsonResponse({"error": error}, status=400)
+        messages.error(request, error)
+        return redirect("review_updates")
+
+    review = approve_updates if action == "approve" else reject_updates
+    reviewed = review(update_ids, request.user.userprofile)
+    skipped = len(set(update_ids)) - reviewed
+
+    if wants_json:
+        return JsonResponse({"action": action, "reviewed": reviewed, "skipped": skipped})
+    messages.success(request, f"{'Approved' if action == 'approve' else 'Rejected'} {reviewed} update(s).")
+    if skipped:
+        messages.warning(request, f"Skipped {skipped} update(s) that were already reviewed or don't exist.")
+    return redirect("review_updates")
+
+
 def get_project_managers():
     return UserProfile.objects.filter(role="PM")
 
+def _recompute_schedule(request, project):
+    """Refresh the stored critical-path fields after tasks or links were added or removed."""
+    try:
+        recompute_schedule(project)
+    except CycleError as e:
+        messages.warning(request, f"Schedule not updated: {e}")
+
+
+def _selected_ids(request, field):
+    """Checked ids, posted either one field per checkbox or as one comma-separated field."""
+    return [item for value in request.POST.getlist(field) for item in value.split(",") if item]
+
+
+def _selected_task_ids(request):
+    return _selected_ids(request, "task_ids")
+
+
 @login_required
 @verified_email_required
 @role_required("PM", "OM")
@@ -128,10 +213,22 @@ def task_list(request, project_id, token, role):
         return verified_profile
 
     project = get_object_or_404(ProjectProfile, id=project_id)
-    tasks = project.tasks.all()
+    tasks = project.tasks.order_by("topo_rank", "start_date", "id")
+
+    schedule = None
+    try:
+        schedule = load_schedule(project)
+    except CycleError as e:
+        messages.warning(request, f"Critical path unavailable: {e}")
+    else:
+        for task in tasks:
+            task.timing = schedule.get(task.id)
+
     return render(request, "scheduling/task_list.html", {
     "project": project,
     "tasks": tasks,
+    "schedule": schedule,
+    "project_managers": UserProfile.objects.filter(role="PM"),
     "token": token,
     "role": role,
 })
@@ -140,19 +237,81 @@ def task_list(request, project_id, token, role):
 @login_required
 @verified_email_required
 @role_required("PM", "OM")
-def parse_excel(file):
-    df = pd.read_excel(file)
-    tasks = []
-    for _, row in df.iterrows():
-        tasks.append({
-            "task_name": row.get("Task"),
-            "start_date": row.get("Start"),
-            "end_date": row.get("End"),
-            "duration_days": row.get("Days"),
-            "manhours": row.get("MH"),
-            "scope": row.get("Scope"),
-        })
-    return tasks
+def task_schedule(request, project_id, token, role):
+    verified_profile = verify_user_token(request, token, role)
+    if isinstance(verified_profile, HttpResponse):
+        return verified_profile
+
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    try:
+        schedule = load_schedule(project)
+    except CycleError as e:
+        return JsonResponse({"error": str(e), "task_ids": e.task_ids}, status=409)
+    return JsonResponse(schedule.as_dict())
+
+
+@login_required
+@verified_email_required
+@role_required("PM", "OM")
+def task_risk(request, project_id, token, role):
+    """Monte Carlo completion-date percentiles (e.g. P50/P80) and task criticality indexes."""
+    verified_profile = verify_user_token(request, token, role)
+    if isinstance(verified_profile, HttpResponse):
+        return verified_profile
+
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    try:
+        iterations = int(request.GET.get("iterations", settings.SCHEDULE_RISK_ITERATIONS))
+        seed = int(request.GET["seed"]) if request.GET.get("seed") else None
+    except ValueError:
+        return JsonResponse({"error": "iterations and seed must be whole numbers"}, status=400)
+    if not 1 <= iterations <= MAX_RISK_ITERATIONS:
+        return JsonResponse({"error": f"iterations must be between 1 and {MAX_RISK_ITERATIONS}"}, status=400)
+    try:
+        risk = simulate_risk(project, iterations, seed=seed)
+    except CycleError as e:
+        return JsonResponse({"error": str(e), "task_ids": e.task_ids}, status=409)
+    return JsonResponse(risk)
+
+
+@login_required
+@verified_email_required
+@role_required("PM", "OM")
+@gzip_page
+def task_gantt(request, project_id, token, role):
+    """Columnar Gantt data; answers 304 while the project's tasks are unchanged."""
+    verified_profile = verify_user_token(request, token, role)
+    if isinstance(verified_profile, HttpResponse):
+        return verified_profile
+
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    etag = gantt_etag(project)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(gantt_payload(project), json_dumps_params={"separators": (",", ":")})
+    response.headers["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+@verified_email_required
+@role_required("OM")
+def resource_leveling(request, token, role):
+    """Proposed date shifts that keep everyone's daily manhours under capacity, across projects."""
+    verified_profile = verify_user_token(request, token, role)
+    if isinstance(verified_profile, HttpResponse):
+        return verified_profile
+
+    try:
+        capacity = float(request.GET.get("capacity", settings.SCHEDULE_DAILY_CAPACITY_HOURS))
+        project_ids = [int(p) for p in request.GET.getlist("project")] or None
+    except ValueError:
+        return JsonResponse({"error": "capacity and project must be numbers"}, status=400)
+    if capacity <= 0:
+        return JsonResponse({"error": "capacity must be positive"}, status=400)
+    return JsonResponse(propose_leveling(capacity, project_ids))
+
 
 @login_required
 @verified_email_required
@@ -164,34 +323,34 @@ def task_create(request, project_id, token, role):
 
     project = get_object_or_404(ProjectProfile, id=project_id)
     imported_data = None
-    form = ProjectTaskForm()
+    form = ProjectTaskForm(project=project)
 
     if request.method == "POST":
         # --- Manual Save ---
         if "save_task" in request.POST:
-            form = ProjectTaskForm(request.POST)
+            form = ProjectTaskForm(request.POST, project=project)
             if form.is_valid():
                 task = form.save(commit=False)
                 task.project = project
-                task.save()
-                form.save_m2m()
+                with transaction.atomic():
+                    task.save()
+                    form.save_m2m()
+                    adjust_project_totals(project.id, **task_totals(task.weight, task.progress))
+                _recompute_schedule(request, project)
                 return redirect("task_list", project.id, token, role)
 
         # --- Import File ---
         elif "import_file" in request.POST and request.FILES.get("upload_file"):
             upload = request.FILES["upload_file"]
 
-            if upload.name.endswith(".pdf"):
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                    for chunk in upload.chunks():
-                        tmp.write(chunk)
-                    tmp_path = tmp.name
-
-                imported_data = extract_project_info(tmp_path)  # dict
-                os.remove(tmp_path)
-
-            elif upload.name.endswith((".xls", ".xlsx")):
-                imported_data = {"tasks": parse_excel(upload)}
+            # Parsing happens in the import worker; the form polls the job
+            job = ScheduleImportJob.objects.create(
+                project=project,
+                submitted_by=verified_profile,
+                file=upload,
+                file_name=upload.name,
+            )
+            return redirect("import_job_result", project.id, token, role, job.id)
 
     return render(request, "scheduling/task_form.html", {
     "form": form,
@@ -201,6 +360,50 @@ def task_create(request, project_id, token, role):
     "role": role,     
 })
 
+@login_required
+@verified_email_required
+@role_required("PM", "OM")
+def import_job_status(request, project_id, token, role, job_id):
+    verified_profile = verify_user_token(request, token, role)
+    if isinstance(verified_profile, HttpResponse):
+        return verified_profile
+
+    job = get_object_or_404(
+        ScheduleImportJob.objects.only("status", "progress", "task_count", "error"),
+        id=job_id, project_id=project_id,
+    )
+    return JsonResponse({
+        "status": job.get_status_display().lower(),
+        "progress": job.progress,
+        "task_count": job.task_count,
+        "error": job.error,
+    })
+
+
+@login_required
+@verified_email_required
+@role_required("PM", "OM")
+def import_job_result(request, project_id, token, role, job_id):
+    verified_profile = verify_user_token(request, token, role)
+    if isinstance(verified_profile, HttpResponse):
+        return verified_profile
+
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    job = get_object_or_404(ScheduleImportJob, id=job_id, project=project)
+
+    if job.status == "F":
+        messages.error(request, f"Could not import {job.file_name}: {job.error}")
+
+    return render(request, "scheduling/task_form.html", {
+        "form": ProjectTaskForm(project=project),
+        "project": project,
+        "import_job": job,
+        "imported_data": {**(job.result or {}), "tasks": job.staged_tasks.all()} if job.status == "D" else None,
+        "token": token,
+        "role": role,
+    })
+
+
 @login_required
 @verified_email_required
 @role_required("PM", "OM")
@@ -212,47 +415,20 @@ def save_imported_tasks(request, project_id, token, role):
     project = get_object_or_404(ProjectProfile, id=project_id)
 
     if request.method == "POST":
-        task_count = int(request.POST.get("task_count", 0))
-        imported_data = json.loads(request.POST.get("tasks_json", "[]"))
-
-        # Normalize global inputs (convert "" -> None)
-        global_scope = request.POST.get("global_scope") or None
-        assigned_to_id = request.POST.get("global_assigned_to") or None
-        assigned_user_global = (
-            UserProfile.objects.filter(id=assigned_to_id).first()
-            if assigned_to_id else None
-        )
-
-        task_objs = []
-        for i in range(task_count):
-            # Per-task scope first, fallback to global
-            scope_i = request.POST.get(f"scope_{i}") or None
-            scope = scope_i if scope_i else global_scope
-
-            # Per-task assigned_to first, fallback to global
-            assigned_to_id_i = request.POST.get(f"assigned_to_{i}") or None
-            assigned_user = (
-                UserProfile.objects.filter(id=assigned_to_id_i).first()
-                if assigned_to_id_i else assigned_user_global
+        job = get_object_or_404(ScheduleImportJob, id=request.POST.get("import_id"), project=project, status="D")
+        try:
+            # Only edited cells are posted; untouched rows keep their staged values
+            saved = save_staged_tasks(
+                job,
+                overrides=json.loads(request.POST.get("overrides") or "{}"),
+                removed=request.POST.get("removed_rows", "").split(","),
+                global_scope=request.POST.get("global_scope"),
+                global_assignee=request.POST.get("global_assigned_to"),
             )
-
-        
-            weight_str = request.POST.get(f"weight_{i}", "").strip()
-            weight = float(weight_str) if weight_str else 0.0  
-
-            task_objs.append(ProjectTask(
-                project=project,
-                task_name=imported_data[i].get("task_name"),
-                start_date=parse_date(imported_data[i].get("start_date")),
-                end_date=parse_date(imported_data[i].get("end_date")),
-                duration_days=imported_data[i].get("duration_days"),
-                manhours=imported_data[i].get("manhours"),
-                weight=weight,   
-                scope=scope,
-                assigned_to=assigned_user,
-            ))
-
-        ProjectTask.objects.bulk_create(task_objs)
+        except ValueError as e:  # bad JSON or rows missing dates
+            messages.error(request, str(e))
+            return redirect("import_job_result", project.id, token, role, job.id)
+        messages.success(request, f"Imported {saved} task(s).")
         return redirect("task_list", project.id, token, role)
 
     return redirect("task_create", project.id, token, role)
@@ -276,7 +452,23 @@ def task_update(request, project_id, token, role, task_id):
             task = form.save(commit=False)
             if assigned_to_id:
                 task.assigned_to = UserProfile.objects.filter(id=assigned_to_id).first()
-            task.save()
+            with transaction.atomic():
+                # Lock the row so an approval committing meanwhile isn't overwritten
+                # by the progress read before the form was posted
+                locked = ProjectTask.objects.select_for_update().only("weight", "progress").get(pk=task.pk)
+                before = (locked.weight, locked.progress)
+                task.progress = locked.progress  # not a form field
+                task.save()
+                form.save_m2m()
+                adjust_project_totals(project.id, **task_change(before, (task.weight, task.progress)))
+            if "dependencies" in form.changed_data:
+                # Removed links loosen tasks outside the successor subgraph too
+                _recompute_schedule(request, project)
+            elif {"start_date", "end_date"} & set(form.changed_data):
+                try:
+                    repropagate(task)
+                except CycleError as e:
+                    messages.warning(request, f"Schedule not updated: {e}")
             return redirect("task_list", project.id, token, role)
     else:
         form = ProjectTaskForm(instance=task)
@@ -291,6 +483,48 @@ def task_update(request, project_id, token, role, task_id):
     })
 
 
+@login_required
+@verified_email_required
+@role_required("PM", "OM")
+def task_bulk_edit(request, project_id, token, role):
+    """
+    Apply the same field changes to every selected task in one request.
+    Answers JSON (with the per-row error report) when the client asks for
+    it, otherwise redirects back to the task list with messages.
+    """
+    verified_profile = verify_user_token(request, token, role)
+    if isinstance(verified_profile, HttpResponse):
+        return verified_profile
+    if request.method != "POST":
+        return redirect("task_list", project_id, token, role)
+
+    project = get_object_or_404(ProjectProfile, id=project_id)
+    wants_json = request.accepts("application/json") and not request.accepts("text/html")
+    task_ids = _selected_task_ids(request)
+    form = TaskBulkEditForm(request.POST)
+
+    if not task_ids:
+        updated, errors = 0, [{"task_id": None, "task_name": None, "errors": {"task_ids": ["No tasks were selected."]}}]
+    elif not form.is_valid():
+        fields = {field: list(field_errors) for field, field_errors in form.errors.items()}
+        updated, errors = 0, [{"task_id": None, "task_name": None, "errors": fields}]
+    else:
+        updated, errors = form.save(project, task_ids)
+
+    if wants_json:
+        return JsonResponse({"updated": updated, "errors": errors}, status=400 if errors else 200)
+
+    if errors:
+        messages.error(request, f"No tasks were changed: {len(errors)} row(s) failed validation.")
+        for row in errors[:10]:
+            label = row["task_name"] or (f"Task {row['task_id']}" if row["task_id"] else "Bulk edit")
+            for field, field_errors in row["errors"].items():
+                messages.error(request, f"{label} ({field}): {' '.join(field_errors)}")
+    else:
+        messages.success(request, f"Updated {updated} task(s).")
+    return redirect("task_list", project.id, token, role)
+
+
 @login_required
 @verified_email_required
 @role_required("PM", "OM")  # adjust roles if needed
@@ -311,12 +545,15 @@ def task_bulk_delete(request, project_id, token, role):
     project = get_object_or_404(ProjectProfile, id=project_id)
 
     if request.method == "POST":
-        task_ids = request.POST.getlist("task_ids")  # all checked tasks
+        task_ids = _selected_task_ids(request)  # all checked tasks
         if task_ids:
-            deleted_count, _ = ProjectTask.objects.filter(
-                id__in=task_ids, project=project
-            ).delete()
+            with transaction.atomic():
+                deleted_count, _ = ProjectTask.objects.filter(
+                    id__in=task_ids, project=project
+                ).delete()
+                rebuild_project_totals([project.id])
             messages.success(request, f"Deleted {deleted_count} task(s).")
+            _recompute_schedule(request, project)
         else:
             messages.warning(request, "No tasks were selected.")
 
@@ -334,7 +571,10 @@ def task_delete(request, project_id, token, role, task_id):
     task = get_object_or_404(ProjectTask, id=task_id, project=project)
 
     if request.method == "POST":
-        task.delete()
+        with transaction.atomic():
+            task.delete()
+            adjust_project_totals(project.id, **task_totals(task.weight, task.progress, sign=-1))
+        _recompute_schedule(request, project)
         return redirect("task_list", project.id, token, role)
 
     return render(request, "scheduling/task_confirm_delete.html", {